@@ -41,6 +41,7 @@ class Configuration:
         self._db_password = str(config.get('protrend-db', 'password'))
         self._db_ip = str(config.get('protrend-db', 'ip'))
         self._db_port = str(config.get('protrend-db', 'port'))
+        self._db_backend = str(config.get('protrend-db', 'backend', fallback='neo4j'))
 
         self._secret_key = str(config.get('django-configuration', 'secret_key'))
         self._debug = parse_boolean_string(str(config.get('django-configuration', 'debug')))
@@ -92,6 +93,10 @@ class Configuration:
     def db_port(self):
         return self._db_port
 
+    @property
+    def db_backend(self) -> str:
+        return self._db_backend
+
     @property
     def bolt_url(self) -> str:
         return f'bolt://{self.db_user_name}:{self.db_password}@{self.db_ip}:{self.db_port}'
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
 
 
 class DataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'data'
+
+    def ready(self):
+        from domain.neo.cache import invalidate_node
+
+        # neomodel sends the django model signals if NEOMODEL_SIGNALS is set
+        post_save.connect(invalidate_node, dispatch_uid='protrend_query_cache_post_save')
+        post_delete.connect(invalidate_node, dispatch_uid='protrend_query_cache_post_delete')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from domain.neo import clear_query_cache
+
+
+class Command(BaseCommand):
+    help = 'Invalidates the cached query results of the ProTReND database (django query cache backend). ' \
+           'It should be called after loading data into the database.'
+
+    def handle(self, *args, **options):
+        clear_query_cache()
+        self.stdout.write(self.style.SUCCESS('ProTReND query cache cleared'))
@@ -0,0 +1,238 @@
+from typing import List, NamedTuple, Dict, Any, Tuple, Type, Union
+
+from django.core.management.base import BaseCommand
+from django_neomodel import DjangoNode
+
+from data.models import (Effector, Evidence, Gene, Motif, Operon, Organism, Pathway, Publication, Regulator,
+                         RegulatoryFamily, RegulatoryInteraction, Source, TFBS)
+from domain.dpi.identifiers import COUNTER_LABEL
+from domain.neo import NeoQuerySet, query_db
+from domain.neo.query import get_session, search_index_name
+
+
+MODELS = [Effector, Evidence, Gene, Motif, Operon, Organism, Pathway, Publication, Regulator, RegulatoryFamily,
+          RegulatoryInteraction, Source, TFBS]
+
+INDEX_SEEK_OPERATORS = ('IndexSeek', 'IndexScan', 'IndexContainsScan', 'IndexEndsWithScan')
+LABEL_SCAN_OPERATORS = ('NodeByLabelScan', 'AllNodesScan')
+
+
+class Index(NamedTuple):
+    model: Union[None, Type[DjangoNode]]
+    label: str
+    property: str
+    kind: str
+    reason: str
+
+    @property
+    def name(self) -> str:
+        # all searched properties of a label share the full-text index queried by the search lookup
+        if self.kind == 'fulltext':
+            return search_index_name(self.label)
+
+        return f'protrend_{self.label}_{self.property}_{self.kind}'.lower()
+
+
+def _unique_properties(model: Type[DjangoNode]) -> List[str]:
+    return [name for name, prop in model.defined_properties(aliases=False, rels=False).items()
+            if getattr(prop, 'unique_index', False)]
+
+
+def required_indexes() -> List[Index]:
+    """
+    It derives the indexes required by the ProTReND database from the model definitions and the views.
+    Unique properties (including the *_factor properties used by the duplicate validation and dpi filters)
+    require a uniqueness constraint, sorted fields require a range index
+    and searched fields require a full-text index of the label.
+    """
+    indexes = []
+
+    for model in MODELS:
+        label = model.__label__
+        unique_properties = _unique_properties(model)
+
+        for name, prop in model.defined_properties(aliases=False, rels=False).items():
+            if name in unique_properties:
+                indexes.append(Index(model, label, name, 'unique', 'unique_index'))
+
+            elif getattr(prop, 'index', False):
+                indexes.append(Index(model, label, name, 'range', 'index'))
+
+        for field in model.sortable_fields:
+            if field not in unique_properties:
+                indexes.append(Index(model, label, field, 'range', 'sort'))
+
+        for field in model.searchable_fields:
+            indexes.append(Index(model, label, field, 'fulltext', 'search'))
+
+    # the counter nodes of the protrend identifiers allocation (see domain.dpi.identifiers)
+    indexes.append(Index(None, COUNTER_LABEL, 'label', 'unique', 'id allocation'))
+    return indexes
+
+
+def _rows(query: str) -> List[Dict[str, Any]]:
+    results, meta = query_db(query, cache=False)
+    return [dict(zip(meta, row)) for row in results]
+
+
+def server_version() -> Tuple[int, int]:
+    rows = _rows('CALL dbms.components() YIELD versions RETURN versions')
+    major, minor, *_ = rows[0]['versions'][0].split('.')
+    return int(major), int(minor)
+
+
+def existing_indexes() -> List[Dict[str, Any]]:
+    indexes = []
+
+    for row in _rows('SHOW INDEXES'):
+        index_type = str(row.get('type', '')).upper()
+
+        # token lookup indexes do not index properties
+        if index_type == 'LOOKUP' or not row.get('labelsOrTypes') or not row.get('properties'):
+            continue
+
+        unique = row.get('uniqueness') == 'UNIQUE' or bool(row.get('owningConstraint'))
+
+        if index_type in ('TEXT', 'FULLTEXT'):
+            kind = index_type.lower()
+        elif unique:
+            kind = 'unique'
+        else:
+            kind = 'range'
+
+        indexes.append({'name': row.get('name'),
+                        'labels': list(row['labelsOrTypes']),
+                        'properties': list(row['properties']),
+                        'kind': kind})
+
+    return indexes
+
+
+def _satisfies(existing: Dict[str, Any], index: Index) -> bool:
+    if index.kind == 'fulltext':
+        return existing['kind'] == 'fulltext' and existing['name'] == index.name and \
+               index.property in existing['properties']
+
+    if existing['labels'] != [index.label] or existing['properties'] != [index.property]:
+        return False
+
+    if index.kind == 'unique':
+        return existing['kind'] == 'unique'
+
+    return existing['kind'] in ('unique', 'range')
+
+
+def create_statement(index: Index, version: Tuple[int, int]) -> str:
+    if index.kind == 'unique':
+        if version >= (5, 0):
+            return f'CREATE CONSTRAINT {index.name} IF NOT EXISTS ' \
+                   f'FOR (n:{index.label}) REQUIRE n.{index.property} IS UNIQUE'
+
+        return f'CREATE CONSTRAINT {index.name} IF NOT EXISTS ' \
+               f'ON (n:{index.label}) ASSERT n.{index.property} IS UNIQUE'
+
+    if index.kind == 'fulltext':
+        return create_fulltext_statement([index], version)
+
+    return f'CREATE INDEX {index.name} IF NOT EXISTS FOR (n:{index.label}) ON (n.{index.property})'
+
+
+def create_fulltext_statement(indexes: List[Index], version: Tuple[int, int]) -> str:
+    """
+    It creates the full-text index of a label covering the properties of all the given indexes
+    """
+    name = indexes[0].name
+    label = indexes[0].label
+    properties = [index.property for index in indexes]
+
+    if version >= (4, 3):
+        properties = ', '.join(f'n.{prop}' for prop in properties)
+        return f'CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR (n:{label}) ON EACH [{properties}]'
+
+    properties = ', '.join(f"'{prop}'" for prop in properties)
+    return f"CALL db.index.fulltext.createNodeIndex('{name}', ['{label}'], [{properties}])"
+
+
+def _plan_operators(plan: Dict[str, Any]) -> List[str]:
+    operators = [plan.get('operatorType', '')]
+
+    for child in plan.get('children', []):
+        operators.extend(_plan_operators(child))
+
+    return operators
+
+
+def explain(index: Index) -> Tuple[str, List[str]]:
+    """
+    It explains the query issued by the dpi filters for the indexed property and returns the plan operators
+    """
+    lookup = 'exact' if index.kind == 'unique' else 'startswith'
+    query_set = NeoQuerySet(source=index.model, fields=['protrend_id']).filter(**{f'{index.property}__{lookup}': 'a'})
+
+    with get_session() as session:
+        summary = session.run(f'EXPLAIN {query_set.query}', query_set.params).consume()
+
+    return query_set.query, _plan_operators(summary.plan or {})
+
+
+class Command(BaseCommand):
+    help = 'Creates and verifies the Neo4j indexes required by the filtered, sorted and searched fields ' \
+           'of the ProTReND database. By default, it only reports missing and unused indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--create', action='store_true', help='Create the missing indexes')
+        parser.add_argument('--explain', action='store_true',
+                            help='Verify with EXPLAIN that the filter queries use index seeks')
+
+    def handle(self, *args, **options):
+        version = server_version()
+        required = required_indexes()
+        existing = existing_indexes()
+
+        missing = [index for index in required
+                   if not any(_satisfies(existing_index, index) for existing_index in existing)]
+
+        unused = [existing_index for existing_index in existing
+                  if not any(_satisfies(existing_index, index) for index in required)]
+
+        self.stdout.write(f'Neo4j {version[0]}.{version[1]}: {len(required)} required indexes, '
+                          f'{len(missing)} missing, {len(unused)} unused')
+
+        statements = [(create_statement(index, version), index.reason)
+                      for index in missing if index.kind != 'fulltext']
+
+        fulltext_indexes = {index.name: index for index in missing if index.kind == 'fulltext'}
+        for name, index in fulltext_indexes.items():
+            if any(existing_index['name'] == name for existing_index in existing):
+                # full-text indexes cannot be altered, and thus the outdated index must be dropped beforehand
+                self.stdout.write(self.style.WARNING(f'Outdated full-text index {name}: drop it to create it again'))
+                continue
+
+            label_indexes = [required_index for required_index in required if required_index.name == name]
+            statements.append((create_fulltext_statement(label_indexes, version), index.reason))
+
+        for statement, reason in statements:
+            if options['create']:
+                query_db(statement, cache=False)
+                self.stdout.write(self.style.SUCCESS(f'Created: {statement}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'Missing ({reason}): {statement}'))
+
+        for existing_index in unused:
+            self.stdout.write(f'Unused: {existing_index["name"]} '
+                              f'{existing_index["labels"]} {existing_index["properties"]} ({existing_index["kind"]})')
+
+        if not options['explain']:
+            return
+
+        for index in required:
+            if index.kind == 'fulltext' or index.model is None:
+                continue
+
+            query, operators = explain(index)
+
+            if any(operator.startswith(LABEL_SCAN_OPERATORS) for operator in operators) or \
+                    not any(seek in operator for operator in operators for seek in INDEX_SEEK_OPERATORS):
+                self.stdout.write(self.style.ERROR(f'Label scan: {query} {operators}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Index seek: {index.label}.{index.property}'))
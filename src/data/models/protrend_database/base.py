@@ -12,6 +12,28 @@ class BaseNode(DjangoNode):
     created = DateTimeProperty(default_now=True, help_text=help_text.created)
     updated = DateTimeProperty(default_now=True, help_text=help_text.updated)
 
+    # properties sorted and searched by the views, which require a range or full-text index
+    # (see the protrend_indexes command)
+    sortable_fields = ()
+    searchable_fields = ()
+
+    def cypher(self, query, params=None):
+        """
+        neomodel runs the relationship writes of a node (connect, disconnect, reconnect and disconnect_all)
+        with this method, which do not send the save and delete signals.
+        Thus, the cached queries of the node label are invalidated after any write query.
+        The query sets match both ends of a relationship by label,
+        so that the cached queries depending on the relationship always match the label of this node.
+        """
+        from domain.neo.cache import invalidate_labels, is_read_query
+
+        results = super().cypher(query, params)
+
+        if not is_read_query(query):
+            invalidate_labels([self.__label__])
+
+        return results
+
     class Meta:
         app_label = 'data'
         order_by = ['protrend_id']
@@ -11,6 +11,9 @@ class Effector(BaseNode):
     name_factor = StringProperty(required=True, unique_index=True, max_length=250, help_text=help_text.effector_name)
     kegg_compounds = ArrayProperty(StringProperty(), help_text=help_text.kegg_compounds)
 
+    # views
+    searchable_fields = ('protrend_id', 'name')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     regulator = RelationshipTo('.regulator.Regulator', BASE_REL_TYPE, model=BaseRelationship)
@@ -11,6 +11,9 @@ class Evidence(BaseNode):
     name_factor = StringProperty(required=True, unique_index=True, max_length=250, help_text=help_text.evidence_name)
     description = StringProperty(help_text=help_text.evidence_description)
 
+    # views
+    searchable_fields = ('protrend_id', 'name')
+
     # relationships
     regulator = RelationshipTo('.regulator.Regulator', BASE_REL_TYPE, model=BaseRelationship)
     operon = RelationshipTo('.operon.Operon', BASE_REL_TYPE, model=BaseRelationship)
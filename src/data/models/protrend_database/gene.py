@@ -26,6 +26,9 @@ class Gene(BaseNode):
     start = IntegerProperty(help_text=help_text.start)
     stop = IntegerProperty(help_text=help_text.stop)
 
+    # views
+    searchable_fields = ('protrend_id', 'locus_tag', 'uniprot_accession', 'name')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     evidence = RelationshipTo('.evidence.Evidence', BASE_REL_TYPE, model=BaseRelationship)
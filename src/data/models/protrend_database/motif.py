@@ -16,6 +16,9 @@ class Motif(BaseNode):
     sequences = ArrayProperty(StringProperty(), help_text=help_text.aligned_sequences)
     consensus_sequence = StringProperty(help_text=help_text.consensus_sequence)
 
+    # views
+    searchable_fields = ('protrend_id', 'locus_tag')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, cardinality=ZeroOrOne, model=SourceRelationship)
     organism = RelationshipTo('.organism.Organism', BASE_REL_TYPE, cardinality=ZeroOrOne, model=BaseRelationship)
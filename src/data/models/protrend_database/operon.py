@@ -17,6 +17,9 @@ class Operon(BaseNode):
     start = IntegerProperty(help_text=help_text.start)
     stop = IntegerProperty(help_text=help_text.stop)
 
+    # views
+    searchable_fields = ('protrend_id', 'operon_db_id', 'name')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, cardinality=ZeroOrOne, model=SourceRelationship)
     evidence = RelationshipTo('.evidence.Evidence', BASE_REL_TYPE, cardinality=ZeroOrOne, model=BaseRelationship)
@@ -20,6 +20,9 @@ class Organism(BaseNode):
     ncbi_assembly = IntegerProperty(help_text=help_text.ncbi_assembly)
     assembly_accession = StringProperty(max_length=50, help_text=help_text.assembly_accession)
 
+    # views
+    searchable_fields = ('protrend_id', 'name', 'species', 'strain')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     operon = RelationshipTo('.operon.Operon', BASE_REL_TYPE, model=BaseRelationship)
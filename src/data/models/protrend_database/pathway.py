@@ -11,6 +11,9 @@ class Pathway(BaseNode):
     name_factor = StringProperty(required=True, unique_index=True, max_length=250, help_text=help_text.pathway_name)
     kegg_pathways = ArrayProperty(StringProperty(), help_text=help_text.kegg_pathways)
 
+    # views
+    searchable_fields = ('protrend_id', 'name')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     regulator = RelationshipTo('.regulator.Regulator', BASE_REL_TYPE, model=BaseRelationship)
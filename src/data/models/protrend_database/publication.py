@@ -14,6 +14,9 @@ class Publication(BaseNode):
     author = StringProperty(max_length=250, help_text=help_text.author)
     year = IntegerProperty(help_text=help_text.year)
 
+    # views
+    searchable_fields = ('protrend_id', 'doi', 'title', 'author')
+
     # relationships
     regulatory_family = RelationshipTo('.regulatory_family.RegulatoryFamily', BASE_REL_TYPE, model=BaseRelationship)
     regulator = RelationshipTo('.regulator.Regulator', BASE_REL_TYPE, model=BaseRelationship)
@@ -28,6 +28,10 @@ class Regulator(BaseNode):
     start = IntegerProperty(help_text=help_text.start)
     stop = IntegerProperty(help_text=help_text.stop)
 
+    # views
+    sortable_fields = ('protrend_id', 'locus_tag', 'name', 'mechanism')
+    searchable_fields = ('protrend_id', 'locus_tag', 'name', 'mechanism')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     evidence = RelationshipTo('.evidence.Evidence', BASE_REL_TYPE, model=BaseRelationship)
@@ -14,6 +14,9 @@ class RegulatoryFamily(BaseNode):
     rfam = StringProperty(max_length=100, help_text=help_text.rfam)
     description = StringProperty(help_text=help_text.rfam_description)
 
+    # views
+    searchable_fields = ('protrend_id', 'name', 'mechanism')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     publication = RelationshipTo('.publication.Publication', BASE_REL_TYPE, model=BaseRelationship)
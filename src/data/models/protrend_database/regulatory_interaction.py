@@ -17,6 +17,9 @@ class RegulatoryInteraction(BaseNode):
     regulatory_effect = StringProperty(required=True, choices=choices.regulatory_effect,
                                        help_text=help_text.regulatory_effect)
 
+    # views
+    searchable_fields = ('protrend_id', 'organism', 'regulator', 'gene')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     evidence = RelationshipTo('.evidence.Evidence', BASE_REL_TYPE, model=BaseRelationship)
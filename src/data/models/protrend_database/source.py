@@ -16,6 +16,9 @@ class Source(BaseNode):
     authors = ArrayProperty(StringProperty(), help_text=help_text.source_author)
     description = StringProperty(help_text=help_text.source_description)
 
+    # views
+    searchable_fields = ('protrend_id', 'name')
+
     # relationships
     organism = RelationshipTo('.organism.Organism', SOURCE_REL_TYPE, model=SourceRelationship)
     pathway = RelationshipTo('.pathway.Pathway', SOURCE_REL_TYPE, model=SourceRelationship)
@@ -16,6 +16,9 @@ class TFBS(BaseNode):
     stop = IntegerProperty(help_text=help_text.stop)
     length = IntegerProperty(required=True, help_text=help_text.tfbs_length)
 
+    # views
+    searchable_fields = ('protrend_id', 'organism', 'sequence')
+
     # relationships
     data_source = RelationshipTo('.source.Source', SOURCE_REL_TYPE, model=SourceRelationship)
     evidence = RelationshipTo('.evidence.Evidence', BASE_REL_TYPE, model=BaseRelationship)
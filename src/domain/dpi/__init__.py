@@ -6,5 +6,8 @@ from .queries import (
     get_last_object,
     get_object,
     get_objects,
+    get_objects_by_ids,
     get_query_set)
+from .bulk import (bulk_connect, bulk_create, bulk_update)
+from .identifiers import (allocate_protrend_ids, reserve_ids)
 from .utils import (protrend_id_decoder, protrend_id_encoder)
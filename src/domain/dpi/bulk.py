@@ -0,0 +1,202 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Type
+
+from django_neomodel import DjangoNode
+from neomodel import StructuredRel
+from rest_framework import status
+
+from exceptions import ProtrendException
+from .utils import raise_exception
+from ..neo import write_db
+from ..neo.query_set import get_target_label, get_relationship_pattern
+
+
+def _batches(rows: List[Dict[str, Any]], batch_size: int) -> Iterator[Dict[str, Any]]:
+    rows = iter(rows)
+
+    while True:
+        batch = list(islice(rows, batch_size))
+
+        if not batch:
+            return
+
+        yield {'rows': batch}
+
+
+def _validation_error(cls: type, i: int, detail: str) -> ProtrendException:
+    return ProtrendException(detail=f'Invalid {cls.__name__} entry at position {i}. {detail}',
+                             code='create or update error',
+                             status=status.HTTP_400_BAD_REQUEST)
+
+
+def _deflate(cls: type, properties: Dict[str, Any], i: int, row: Dict[str, Any], partial: bool) -> Dict[str, Any]:
+    unknown = set(row) - set(properties)
+    if unknown:
+        raise _validation_error(cls, i, f'Unknown properties: {sorted(unknown)}.')
+
+    values = {}
+    for name, prop in properties.items():
+
+        if partial and name not in row:
+            continue
+
+        value = row.get(name)
+
+        if value is None:
+            if partial:
+                # setting a property to null removes it from the node
+                values[name] = None
+                continue
+
+            if prop.has_default:
+                value = prop.default_value()
+
+            elif prop.required:
+                raise _validation_error(cls, i, f'The {name} property is required.')
+
+            else:
+                continue
+
+        try:
+            values[name] = prop.deflate(value)
+        except ValueError as exc:
+            raise _validation_error(cls, i, f'Invalid {name} value: {exc}.')
+
+    return values
+
+
+def deflate_node(cls: Type[DjangoNode], i: int, row: Dict[str, Any], partial: bool = False) -> Dict[str, Any]:
+    """
+    It validates a row against the model schema and converts its values into the database representation.
+    Missing properties having default values (e.g. uid, created and updated) are filled in,
+    unless the row is partial (that is, an update of an existing node).
+    """
+    properties = cls.defined_properties(aliases=False, rels=False)
+    return _deflate(cls, properties, i, row, partial)
+
+
+def deflate_relationship(model: Type[StructuredRel], i: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    properties = model.defined_properties(aliases=False)
+    return _deflate(model, properties, i, row, partial=False)
+
+
+@raise_exception
+def bulk_create(cls: Type[DjangoNode], rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+    """
+    It creates a node for each row in batches, rather than a neomodel save call per node.
+    All rows are validated against the model schema before writing any batch.
+    Each batch is written by a single UNWIND cypher query in its own write transaction, which is retried upon
+    transient errors.
+
+    Rows must already hold the protrend identifiers and the *_factor properties
+    (see the domain.dpi.validation module).
+    Note that neomodel save signals are not sent, but the cached queries of the model label are invalidated.
+
+    :type cls: Union[Type[DjangoNode], Type[NeoNode]]
+    :type rows: Iterable[Dict[str, Any]]
+    :type batch_size: int
+
+    :param cls: A neomodel structured node type available at the data model package
+    that represents a node in the Neo4j ProTReND database
+    :param rows: The property-value pairs of each node
+    :param batch_size: The number of nodes written per transaction
+
+    :return: It returns the number of created nodes
+    """
+    rows = [deflate_node(cls, i, row) for i, row in enumerate(rows)]
+
+    query = f'UNWIND $rows AS row CREATE (node:{":".join(cls.inherited_labels())}) SET node = row'
+    return write_db(query, _batches(rows, batch_size), origin='bulk_create')
+
+
+@raise_exception
+def bulk_update(cls: Type[DjangoNode],
+                rows: Iterable[Dict[str, Any]],
+                key: str = 'protrend_id',
+                batch_size: int = 1000) -> int:
+    """
+    It updates the nodes matched by the key property of each row in batches.
+    Only the properties present in a row are updated, and null values remove the property from the node.
+    As with bulk_create, all rows are validated before writing any batch,
+    and each batch is written in its own write transaction.
+
+    :type cls: Union[Type[DjangoNode], Type[NeoNode]]
+    :type rows: Iterable[Dict[str, Any]]
+    :type key: str
+    :type batch_size: int
+
+    :param cls: A neomodel structured node type available at the data model package
+    that represents a node in the Neo4j ProTReND database
+    :param rows: The property-value pairs of each node, including the key property
+    :param key: The unique property used to match the nodes
+    :param batch_size: The number of nodes written per transaction
+
+    :return: It returns the number of submitted rows
+    """
+    properties = cls.defined_properties(aliases=False, rels=False)
+
+    batch = []
+    for i, row in enumerate(rows):
+        if row.get(key) is None:
+            raise _validation_error(cls, i, f'The {key} property is required.')
+
+        row = dict(row)
+        if 'updated' in properties and 'updated' not in row:
+            row['updated'] = properties['updated'].default_value()
+
+        values = deflate_node(cls, i, row, partial=True)
+        batch.append({'key': values.pop(key), 'properties': values})
+
+    query = f'UNWIND $rows AS row ' \
+            f'MATCH (node:{cls.__label__} {{{key}: row.key}}) ' \
+            f'SET node += row.properties'
+    return write_db(query, _batches(batch, batch_size), origin='bulk_update')
+
+
+@raise_exception
+def bulk_connect(cls: Type[DjangoNode],
+                 target: str,
+                 rows: Iterable[Dict[str, Any]],
+                 batch_size: int = 1000) -> int:
+    """
+    It connects source and target nodes in batches according to the relationship definition in the model type.
+    Each row must hold the protrend identifiers of the source and target nodes (source and target keys),
+    whereas the remaining keys are validated against the relationship model.
+    Relationships are merged, so that connecting the same nodes twice does not create duplicated relationships.
+
+    :type cls: Union[Type[DjangoNode], Type[NeoNode]]
+    :type target: str
+    :type rows: Iterable[Dict[str, Any]]
+    :type batch_size: int
+
+    :param cls: A neomodel structured node type available at the data model package
+    that represents a node in the Neo4j ProTReND database
+    :param target: The relationship attribute name in the model type
+    :param rows: The source and target protrend identifiers and the relationship properties of each relationship
+    :param batch_size: The number of relationships written per transaction
+
+    :return: It returns the number of submitted rows
+    """
+    relationship = getattr(cls, target)
+    target_label = get_target_label(cls, target)
+    relationship_pattern = get_relationship_pattern(cls, target, 'relationship')
+    model = relationship.definition['model']
+
+    batch = []
+    for i, row in enumerate(rows):
+        row = dict(row)
+        source_id = row.pop('source', None)
+        target_id = row.pop('target', None)
+
+        if source_id is None or target_id is None:
+            raise _validation_error(cls, i, 'The source and target protrend identifiers are required.')
+
+        properties = deflate_relationship(model, i, row) if model is not None else {}
+        batch.append({'source': source_id, 'target': target_id, 'properties': properties})
+
+    query = f'UNWIND $rows AS row ' \
+            f'MATCH (source:{cls.__label__} {{protrend_id: row.source}}) ' \
+            f'MATCH (target:{target_label} {{protrend_id: row.target}}) ' \
+            f'MERGE (source){relationship_pattern}(target) ' \
+            f'ON CREATE SET relationship = row.properties'
+    return write_db(query, _batches(batch, batch_size), origin='bulk_connect')
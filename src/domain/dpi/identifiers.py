@@ -0,0 +1,72 @@
+from typing import Type, List
+
+from django_neomodel import DjangoNode
+
+from .utils import protrend_id_encoder
+from ..neo import query_db
+
+
+COUNTER_LABEL = 'ProtrendCounter'
+
+# the counter of a label is seeded with the last protrend identifier in the same query that creates the counter node,
+# so that concurrent first reservations do not read the seed before the counter exists.
+# Zero-padded protrend identifiers sort as their integers, and thus the last one is found by the protrend_id index.
+# The write lock of the counter node is taken (by setting the _lock property) before reading its value,
+# so that concurrent reservations of the same label are serialized by Neo4j and never reserve the same block.
+# The uniqueness constraint of the counter label (see the protrend_indexes command) prevents MERGE
+# from creating a counter node per concurrent transaction
+def _reserve_query(label: str) -> str:
+    return f'OPTIONAL MATCH (node:{label}) WHERE node.protrend_id IS NOT NULL ' \
+           f'WITH node.protrend_id AS last ORDER BY last DESC LIMIT 1 ' \
+           f'MERGE (counter:{COUNTER_LABEL} {{label: $label}}) ' \
+           f"ON CREATE SET counter.value = coalesce(toInteger(split(last, '.')[-1]), 0) " \
+           f'SET counter._lock = true ' \
+           f'WITH counter ' \
+           f'SET counter.value = counter.value + $size ' \
+           f'REMOVE counter._lock ' \
+           f'RETURN counter.value'
+
+
+def reserve_ids(cls: Type[DjangoNode], size: int = 1) -> range:
+    """
+    It reserves a block of consecutive protrend identifier integers for the model type.
+    The identifiers are allocated from a counter node per label, which is incremented in a single write transaction,
+    and thus the reservation takes constant time regardless of the number of nodes
+    and concurrent reservations never overlap.
+
+    :type cls: Union[Type[DjangoNode], Type[NeoNode]]
+    :type size: int
+
+    :param cls: A neomodel structured node type available at the data model package
+    that represents a node in the Neo4j ProTReND database
+    :param size: The number of identifiers to be reserved
+
+    :return: It returns the range of reserved integers
+    """
+    if size < 1:
+        return range(0)
+
+    results, _ = query_db(_reserve_query(cls.__label__), {'label': cls.__label__, 'size': size}, cache=False)
+    last = int(results[0][0])
+    return range(last - size + 1, last + 1)
+
+
+def allocate_protrend_ids(cls: Type[DjangoNode], header: str, entity: str, size: int = 1) -> List[str]:
+    """
+    It reserves a block of protrend identifiers for the model type (see reserve_ids)
+    and encodes them according to the header and entity (e.g. PRT.REG.0000001).
+
+    :type cls: Union[Type[DjangoNode], Type[NeoNode]]
+    :type header: str
+    :type entity: str
+    :type size: int
+
+    :param cls: A neomodel structured node type available at the data model package
+    that represents a node in the Neo4j ProTReND database
+    :param header: The protrend identifier header
+    :param entity: The protrend identifier entity
+    :param size: The number of identifiers to be reserved
+
+    :return: It returns the list of protrend identifiers
+    """
+    return [protrend_id_encoder(header=header, entity=entity, integer=i) for i in reserve_ids(cls, size=size)]
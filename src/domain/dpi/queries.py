@@ -1,9 +1,10 @@
-from typing import Union, Type, List, Dict
+from typing import Union, Type, List, Dict, Tuple
 
 from django_neomodel import DjangoNode
 
+from set_list import SetList
 from .utils import raise_exception
-from ..neo import NeoNode, NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet
+from ..neo import NeoNode, NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet, NeoMultiLinkedQuerySet
 from ..neo.query_set import add_query_sets
 
 
@@ -62,9 +63,11 @@ def get_query_set(cls: _model_type,
 def get_objects(cls: _model_type,
                 fields: List[str] = None,
                 targets: Dict[str, List[str]] = None,
-                relationships: Dict[str, List[str]] = None) -> Union[NeoQuerySet,
-                                                                     NeoLinkedQuerySet,
-                                                                     NeoHyperLinkedQuerySet]:
+                relationships: Dict[str, List[str]] = None,
+                compiled: bool = True) -> Union[NeoQuerySet,
+                                                NeoLinkedQuerySet,
+                                                NeoHyperLinkedQuerySet,
+                                                NeoMultiLinkedQuerySet]:
     """
     It builds a NeoQuerySet that retrieves all nodes from the database based on the model type.
     The model label will be used in the cypher query to the database.
@@ -92,6 +95,7 @@ def get_objects(cls: _model_type,
     :type fields: List[str]
     :type targets: Dict[str, List[str]]
     :type relationships: Dict[str, List[str]]
+    :type compiled: bool
 
     :param cls: A neomodel structured node type available at the data model package
     that represents a node in the Neo4j ProTReND database
@@ -100,6 +104,9 @@ def get_objects(cls: _model_type,
     and load them into NeoNodes instances
     :param relationships: A dictionary of relationship-fields pairs that will be used to fetch
     the connected relationships' properties and load them into NeoNodes instances
+    :param compiled: If True, multiple targets are fetched in a single cypher query using a NeoMultiLinkedQuerySet.
+    Otherwise, a query set is performed for each target, concurrently if PROTREND_QUERY_CONCURRENCY is enabled,
+    and the results are merged afterwards
 
     :return: It returns a NeoQuerySet, NeoLinkedQuerySet, or NeoHyperLinkedQuerySet based on the inputs,
     namely targets and relationships
@@ -115,6 +122,11 @@ def get_objects(cls: _model_type,
     if not targets and relationships:
         raise ValueError('Cannot fetch relationships without targets')
 
+    if compiled and len(targets) > 1:
+        query_set = NeoMultiLinkedQuerySet(source=cls, fields=fields, targets=targets, relationships=relationships)
+        query_set.all()
+        return query_set
+
     query_sets = []
     for target, target_fields in targets.items():
         relationship_fields = relationships.get(target)
@@ -131,9 +143,94 @@ def get_objects(cls: _model_type,
 
 
 @raise_exception
-def get_identifiers(cls: _model_type, targets: List[str] = None) -> Union[NeoQuerySet,
-                                                                          NeoLinkedQuerySet,
-                                                                          NeoHyperLinkedQuerySet]:
+def get_objects_by_ids(cls: _model_type,
+                       ids: List[str],
+                       fields: List[str] = None,
+                       targets: Dict[str, List[str]] = None,
+                       relationships: Dict[str, List[str]] = None,
+                       compiled: bool = True) -> Tuple[SetList, List[str]]:
+    """
+    It retrieves the nodes having the given protrend identifiers from the database based on the model type.
+    The model label will be used in the cypher query to the database.
+
+    Rather than a query per identifier, the nodes are matched in a single cypher query
+    that unwinds the list of identifiers and looks up each identifier in the protrend_id index.
+
+    As with the get_objects method, the connected nodes and relationships objects are collected
+    when submitting targets and relationships.
+
+    :type cls: Union[Type[DjangoNode], Type[NeoNode]]
+    :type ids: List[str]
+    :type fields: List[str]
+    :type targets: Dict[str, List[str]]
+    :type relationships: Dict[str, List[str]]
+    :type compiled: bool
+
+    :param cls: A neomodel structured node type available at the data model package
+    that represents a node in the Neo4j ProTReND database
+    :param ids: A list of protrend identifiers
+    :param fields: A list of fields that will be used to fetch the node properties and load them into a NeoNode instance
+    :param targets: A dictionary of target-fields pairs that will be used to fetch the connected nodes' properties
+    and load them into NeoNodes instances
+    :param relationships: A dictionary of relationship-fields pairs that will be used to fetch
+    the connected relationships' properties and load them into NeoNodes instances
+    :param compiled: If True, multiple targets are fetched in a single cypher query using a NeoMultiLinkedQuerySet.
+    Otherwise, a query set is performed for each target, concurrently if PROTREND_QUERY_CONCURRENCY is enabled,
+    and the results are merged afterwards
+
+    :return: It returns the nodes in the order of the identifiers (repeated identifiers are returned once)
+    and the identifiers missing in the database
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return SetList(), []
+
+    if not targets:
+        query_set = get_query_set(cls=cls, fields=fields)
+        query_set.unwind(ids)
+
+    else:
+        if not relationships:
+            relationships = {}
+
+        if compiled and len(targets) > 1:
+            query_set = NeoMultiLinkedQuerySet(source=cls, fields=fields, targets=targets,
+                                               relationships=relationships)
+            query_set.unwind(ids)
+
+        else:
+            query_sets = []
+            for target, target_fields in targets.items():
+                relationship_fields = relationships.get(target)
+                query_set = get_query_set(cls=cls, fields=fields, target=target, target_fields=target_fields,
+                                          relationship_fields=relationship_fields)
+                query_set.unwind(ids)
+                query_sets.append(query_set)
+
+            query_set = add_query_sets(*query_sets)
+
+    nodes = SetList(query_set.data)
+
+    objects = SetList()
+    missing = []
+    for protrend_id in ids:
+        node = nodes.get(protrend_id)
+
+        if node is None:
+            missing.append(protrend_id)
+        else:
+            objects.append(node)
+
+    return objects, missing
+
+
+@raise_exception
+def get_identifiers(cls: _model_type,
+                    targets: List[str] = None,
+                    compiled: bool = True) -> Union[NeoQuerySet,
+                                                    NeoLinkedQuerySet,
+                                                    NeoHyperLinkedQuerySet,
+                                                    NeoMultiLinkedQuerySet]:
     """
     It builds a NeoQuerySet that retrieves all nodes from the database based on the model type.
     The model label will be used in the cypher query to the database.
@@ -148,11 +245,15 @@ def get_identifiers(cls: _model_type, targets: List[str] = None) -> Union[NeoQue
 
     :type cls: Union[Type[DjangoNode], Type[NeoNode]]
     :type targets: List[str]
+    :type compiled: bool
 
     :param cls: A neomodel structured node type available at the data model package
     that represents a node in the Neo4j ProTReND database
     :param targets: A list of targets that will be used to fetch the connected nodes
     and load their protrend identifiers into NeoNodes instances
+    :param compiled: If True, multiple targets are fetched in a single cypher query using a NeoMultiLinkedQuerySet.
+    Otherwise, a query set is performed for each target, concurrently if PROTREND_QUERY_CONCURRENCY is enabled,
+    and the results are merged afterwards
 
     :return: It returns a NeoQuerySet, NeoLinkedQuerySet, or NeoHyperLinkedQuerySet based on the inputs,
     namely targets and relationships
@@ -162,6 +263,13 @@ def get_identifiers(cls: _model_type, targets: List[str] = None) -> Union[NeoQue
         query_set.all()
         return query_set
 
+    if compiled and len(targets) > 1:
+        query_set = NeoMultiLinkedQuerySet(source=cls,
+                                           fields=['protrend_id'],
+                                           targets={target: ['protrend_id'] for target in targets})
+        query_set.all()
+        return query_set
+
     query_sets = []
     for target in targets:
         query_set = get_query_set(cls=cls,
@@ -212,7 +320,11 @@ def filter_objects(cls: _model_type,
                    fields: List[str] = None,
                    targets: Dict[str, List[str]] = None,
                    relationships: Dict[str, List[str]] = None,
-                   **kwargs) -> Union[NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet]:
+                   compiled: bool = True,
+                   **kwargs) -> Union[NeoQuerySet,
+                                      NeoLinkedQuerySet,
+                                      NeoHyperLinkedQuerySet,
+                                      NeoMultiLinkedQuerySet]:
     """
     It builds a NeoQuerySet that filters nodes from the database based on the model type and query filters.
     The model label will be used in the cypher query to the database.
@@ -240,6 +352,7 @@ def filter_objects(cls: _model_type,
     :type fields: List[str]
     :type targets: Dict[str, List[str]]
     :type relationships: Dict[str, List[str]]
+    :type compiled: bool
     :type kwargs: Dict[str, str]
 
     :param cls: A neomodel structured node type available at the data model package
@@ -249,7 +362,11 @@ def filter_objects(cls: _model_type,
     and load them into NeoNodes instances
     :param relationships: A dictionary of relationship-fields pairs that will be used to fetch
     the connected relationships' properties and load them into NeoNodes instances
-    :param kwargs: A dictionary of query filters
+    :param compiled: If True, multiple targets are fetched in a single cypher query using a NeoMultiLinkedQuerySet.
+    Otherwise, a query set is performed for each target, concurrently if PROTREND_QUERY_CONCURRENCY is enabled,
+    and the results are merged afterwards
+    :param kwargs: A dictionary of query filters. The search filter performs a full-text search of the nodes
+    (e.g. search='lexa repressor'), whereas the contains filters are case-insensitive
 
     :return: It returns a NeoQuerySet, NeoLinkedQuerySet, or NeoHyperLinkedQuerySet based on the inputs,
     namely targets and relationships
@@ -265,6 +382,11 @@ def filter_objects(cls: _model_type,
     if not targets and relationships:
         raise ValueError('Cannot fetch relationships without targets')
 
+    if compiled and len(targets) > 1:
+        query_set = NeoMultiLinkedQuerySet(source=cls, fields=fields, targets=targets, relationships=relationships)
+        query_set.filter(**kwargs)
+        return query_set
+
     query_sets = []
     for target, target_fields in targets.items():
         relationship_fields = relationships.get(target)
@@ -288,9 +410,11 @@ def get_object(cls: _model_type,
                fields: List[str] = None,
                targets: Dict[str, List[str]] = None,
                relationships: Dict[str, List[str]] = None,
+               compiled: bool = True,
                **kwargs) -> Union[NeoQuerySet,
                                   NeoLinkedQuerySet,
-                                  NeoHyperLinkedQuerySet]:
+                                  NeoHyperLinkedQuerySet,
+                                  NeoMultiLinkedQuerySet]:
     """
     It builds a NeoQuerySet that retrieves a single node from the database based on the model type
     and the unique identifier provided in the query filter.
@@ -319,6 +443,7 @@ def get_object(cls: _model_type,
     :type fields: List[str]
     :type targets: Dict[str, List[str]]
     :type relationships: Dict[str, List[str]]
+    :type compiled: bool
 
     :param cls: A neomodel structured node type available at the data model package
     that represents a node in the Neo4j ProTReND database
@@ -327,6 +452,9 @@ def get_object(cls: _model_type,
     and load them into NeoNodes instances
     :param relationships: A dictionary of relationship-fields pairs that will be used to fetch
     the connected relationships' properties and load them into NeoNodes instances
+    :param compiled: If True, multiple targets are fetched in a single cypher query using a NeoMultiLinkedQuerySet.
+    Otherwise, a query set is performed for each target, concurrently if PROTREND_QUERY_CONCURRENCY is enabled,
+    and the results are merged afterwards
     :param kwargs: A dictionary of node property and value pairs
 
     :return: It returns a NeoQuerySet, NeoLinkedQuerySet, or NeoHyperLinkedQuerySet based on the inputs,
@@ -343,6 +471,11 @@ def get_object(cls: _model_type,
     if not targets and relationships:
         raise ValueError('Cannot fetch relationships without targets')
 
+    if compiled and len(targets) > 1:
+        query_set = NeoMultiLinkedQuerySet(source=cls, fields=fields, targets=targets, relationships=relationships)
+        query_set.get(**kwargs)
+        return query_set
+
     query_sets = []
     for target, target_fields in targets.items():
         relationship_fields = relationships.get(target)
@@ -407,9 +540,10 @@ def get_last_object(cls: _model_type,
 
     :return: It returns the last node as a NeoNode instance
     """
+    # protrend identifiers are zero-padded, so that the last node is the first in descending order
     query_set = get_query_set(cls=cls, fields=fields)
-    count = query_set.count()
+    query_set.order_by('protrend_id', ascending=False)
     try:
-        return query_set[count]
+        return query_set[0]
     except IndexError:
         return
@@ -1,21 +1,12 @@
-from typing import Callable, List, Type, Union
+from typing import Any, Callable, Dict, List, Type, Union
 
 from django_neomodel import DjangoNode
 from rest_framework import status
 
 from exceptions import ProtrendException
 from transformers import apply_transformers, to_int, to_str, lower, rstrip, lstrip, protrend_hash
-from domain.dpi.queries import get_last_object, get_object
-from domain.dpi.utils import protrend_id_decoder, protrend_id_encoder
-
-
-def _get_last_idx(node_cls: Type[DjangoNode]) -> int:
-    last_obj = get_last_object(node_cls)
-
-    if last_obj:
-        return protrend_id_decoder(last_obj.protrend_id)
-    else:
-        return 0
+from domain.dpi.identifiers import allocate_protrend_ids
+from domain.dpi.queries import get_query_set
 
 
 def _transform_factor(value: str, transformers: List[Callable]):
@@ -47,32 +38,58 @@ def _build_site_hash(kwargs: dict) -> str:
 # ------------------------------------------------
 # VALIDATION OF THE DATABASE UNIQUE CONSTRAINS
 # ------------------------------------------------
-def duplicate_validation(value: str, transformers: List[Callable], node_cls: Type[DjangoNode], key: str):
-    value = apply_transformers(value, *transformers)
-    objects = list(get_object(node_cls, **{key: value}))
-    if objects:
+def find_duplicates(values: List[Any],
+                    transformers: List[Callable],
+                    node_cls: Type[DjangoNode],
+                    key: str) -> Dict[Any, List[str]]:
+    """
+    It looks up all transformed values in the key property of the nodes in a single cypher query
+    and returns the protrend identifiers of the existing nodes per conflicting value
+    """
+    values = [apply_transformers(value, *transformers) for value in values]
+    if not values:
+        return {}
+
+    query_set = get_query_set(cls=node_cls, fields=['protrend_id', key])
+    query_set.unwind(values, key=key)
+
+    duplicates = {}
+    for obj in query_set:
+        duplicates.setdefault(getattr(obj, key), []).append(obj.protrend_id)
+
+    # conflicting values are reported in the order they were submitted
+    return {value: duplicates[value] for value in values if value in duplicates}
+
+
+def duplicates_validation(values: List[Any], transformers: List[Callable], node_cls: Type[DjangoNode], key: str):
+    duplicates = find_duplicates(values=values, transformers=transformers, node_cls=node_cls, key=key)
+
+    if duplicates:
+        # the first conflicting value is reported
+        value, protrend_ids = next(iter(duplicates.items()))
         raise ProtrendException(detail=f'Duplicated issue. There is a similar entry in the database with this {value} '
                                        f'value. '
                                        f'Please check the following ids: '
-                                       f'{[obj.protrend_id for obj in objects]}.',
+                                       f'{protrend_ids}.',
                                 code='create or update error',
                                 status=status.HTTP_400_BAD_REQUEST)
 
 
+def duplicate_validation(value: str, transformers: List[Callable], node_cls: Type[DjangoNode], key: str):
+    duplicates_validation(values=[value], transformers=transformers, node_cls=node_cls, key=key)
+
+
 # ------------------------------------------------
 # VALIDATION OF UNIQUENESS BY LOWER AND STRIP
 # ------------------------------------------------
 def lower_strip_validation(values: tuple, factor: str, node_cls: Type[DjangoNode], header: str, entity: str):
-    for value in values:
-        duplicate_validation(value=value[factor],
-                             transformers=[to_str, lower, rstrip, lstrip],
-                             node_cls=node_cls,
-                             key=f'{factor}_factor')
-
-    idx = _get_last_idx(node_cls) + 1
-    for i, value in enumerate(values):
-        i = idx + i
-        new_id = protrend_id_encoder(header=header, entity=entity, integer=i)
+    duplicates_validation(values=[value[factor] for value in values],
+                          transformers=[to_str, lower, rstrip, lstrip],
+                          node_cls=node_cls,
+                          key=f'{factor}_factor')
+
+    new_ids = allocate_protrend_ids(node_cls, header=header, entity=entity, size=len(values))
+    for value, new_id in zip(values, new_ids):
         value['protrend_id'] = new_id
 
         new_factor = _transform_factor(value=value[factor], transformers=[to_str, lower, rstrip, lstrip])
@@ -90,16 +107,13 @@ def hash_validation(args: tuple,
                     node_cls: Type[DjangoNode],
                     header: str,
                     entity: str):
-    for arg, value in zip(args, values):
-        duplicate_validation(value=value,
-                             transformers=[to_str, lower, rstrip, lstrip],
-                             node_cls=node_cls,
-                             key=f'{factor}_factor')
-
-    idx = _get_last_idx(node_cls) + 1
-    for i, (arg, value) in enumerate(zip(args, values)):
-        i = idx + i
-        new_id = protrend_id_encoder(header=header, entity=entity, integer=i)
+    duplicates_validation(values=list(values),
+                          transformers=[to_str, lower, rstrip, lstrip],
+                          node_cls=node_cls,
+                          key=f'{factor}_factor')
+
+    new_ids = allocate_protrend_ids(node_cls, header=header, entity=entity, size=len(args))
+    for arg, value, new_id in zip(args, values, new_ids):
         arg['protrend_id'] = new_id
 
         arg[factor] = value
@@ -149,14 +163,10 @@ def uniprot_accession_validation(values: Union[tuple, dict], node_cls: Type[Djan
     else:
         values = tuple(values)
 
-    for arg in values:
-        if 'uniprot_accession' not in arg:
-            continue
-
-        duplicate_validation(value=arg['uniprot_accession'],
-                             transformers=[to_str, lower, rstrip, lstrip],
-                             node_cls=node_cls,
-                             key='uniprot_accession_factor')
+    duplicates_validation(values=[arg['uniprot_accession'] for arg in values if 'uniprot_accession' in arg],
+                          transformers=[to_str, lower, rstrip, lstrip],
+                          node_cls=node_cls,
+                          key='uniprot_accession_factor')
 
     for arg in values:
         if 'uniprot_accession' not in arg:
@@ -193,14 +203,10 @@ def ncbi_taxonomy_validation(values: Union[tuple, dict], node_cls: Type[DjangoNo
     else:
         values = tuple(values)
 
-    for value in values:
-        if 'ncbi_taxonomy' not in value:
-            continue
-
-        duplicate_validation(value=value['ncbi_taxonomy'],
-                             transformers=[to_int, to_str, lower, rstrip, lstrip],
-                             node_cls=node_cls,
-                             key='ncbi_taxonomy_factor')
+    duplicates_validation(values=[value['ncbi_taxonomy'] for value in values if 'ncbi_taxonomy' in value],
+                          transformers=[to_int, to_str, lower, rstrip, lstrip],
+                          node_cls=node_cls,
+                          key='ncbi_taxonomy_factor')
 
     for value in values:
         if 'ncbi_taxonomy' not in value:
@@ -224,16 +230,13 @@ def pmid_validation(values: Union[tuple, dict], node_cls: Type[DjangoNode], head
     else:
         values = tuple(values)
 
-    for arg in values:
-        duplicate_validation(value=arg['pmid'],
-                             transformers=[to_int, to_str, lower, rstrip, lstrip],
-                             node_cls=node_cls,
-                             key='pmid_factor')
-
-    idx = _get_last_idx(node_cls) + 1
-    for i, arg in enumerate(values):
-        i = idx + i
-        new_id = protrend_id_encoder(header=header, entity=entity, integer=i)
+    duplicates_validation(values=[arg['pmid'] for arg in values],
+                          transformers=[to_int, to_str, lower, rstrip, lstrip],
+                          node_cls=node_cls,
+                          key='pmid_factor')
+
+    new_ids = allocate_protrend_ids(node_cls, header=header, entity=entity, size=len(values))
+    for arg, new_id in zip(values, new_ids):
         arg['protrend_id'] = new_id
 
         new_factor = _transform_factor(value=arg['pmid'], transformers=[to_int, to_str, lower, rstrip, lstrip])
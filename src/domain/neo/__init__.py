@@ -1,3 +1,6 @@
-from .query_set import NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet
+from .query_set import NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet, NeoMultiLinkedQuerySet
 from .node import NeoNode, node_factory
-from .query import query_db
+from .query import query_db, write_db, get_backend, Count, Collect, Min, Max, Sum, Avg
+from .cache import clear_query_cache, invalidate_labels
+from .memory import MemoryGraph, get_memory_graph
+from .recording import record_queries, replay_queries, QueryReplayError
@@ -0,0 +1,298 @@
+import hashlib
+import pickle
+import re
+import time
+import zlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Tuple, Set, Union, Hashable
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# node patterns, such as (regulator:Regulator), and label predicates of full-text searches, such as
+# YIELD node AS regulator WHERE regulator:Regulator
+_LABEL_PATTERN = re.compile(r'(?:\(\s*\w*\s*|\bWHERE\s+\w+\s*):\s*`?(\w+)`?')
+_WRITE_PATTERN = re.compile(r'\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|CALL(?!\s+db\.index\.fulltext\.query))\b',
+                            re.IGNORECASE)
+
+
+def query_labels(query: str) -> Set[str]:
+    """
+    It returns the node labels matched by a cypher query
+    """
+    return set(_LABEL_PATTERN.findall(query))
+
+
+def is_read_query(query: str) -> bool:
+    """
+    It returns whether the cypher query only reads from the database.
+    Procedure calls are not considered read queries, as they can write to the database,
+    except for the full-text index queries issued by the search lookup
+    """
+    return _WRITE_PATTERN.search(query) is None
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(val) for val in value)
+
+    return value
+
+
+def cache_key(query: str, params: Dict[str, Any] = None) -> Tuple[str, Hashable]:
+    if not params:
+        return query, ()
+
+    return query, _freeze(params)
+
+
+class BaseQueryCache:
+    """
+    The query cache interface. The cache key is built once per lookup, before running the query,
+    so that results of a query that runs concurrently with an invalidation are never stored under a valid key.
+    """
+
+    def make_key(self, query: str, params: Dict[str, Any] = None) -> Hashable:
+        raise NotImplementedError
+
+    def get(self, key: Hashable) -> Union[None, Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any):
+        raise NotImplementedError
+
+    def invalidate(self, *labels: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class QueryCache(BaseQueryCache):
+
+    def __init__(self, ttl: float = 300, max_size: int = 1024):
+        """
+        The QueryCache stores the results of read cypher queries, keyed by the compiled query and its parameters.
+        Entries expire after the time-to-live (in seconds) and the least recently used entries are evicted
+        once the cache reaches its maximum size.
+
+        Entries are indexed by the node labels matched by the query, so that all entries of a label can be
+        invalidated when a node of that label is saved or deleted.
+
+        :param ttl: The time-to-live of the cache entries in seconds
+        :param max_size: The maximum number of cache entries
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._entries: 'OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]' = OrderedDict()
+        self._labels: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: Tuple[str, Hashable]):
+        self._entries.pop(key, None)
+
+        for label in query_labels(key[0]):
+            keys = self._labels.get(label)
+
+            if keys is not None:
+                keys.discard(key)
+
+                if not keys:
+                    del self._labels[label]
+
+    def make_key(self, query: str, params: Dict[str, Any] = None) -> Tuple[str, Hashable]:
+        return cache_key(query, params)
+
+    def get(self, key: Tuple[str, Hashable]) -> Union[None, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return
+
+            expires, value = entry
+            if expires < time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple[str, Hashable], value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            for label in query_labels(key[0]):
+                self._labels.setdefault(label, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate(self, *labels: str):
+        with self._lock:
+            for label in labels:
+                for key in list(self._labels.get(label, ())):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._labels.clear()
+
+
+class DjangoQueryCache(BaseQueryCache):
+
+    def __init__(self, alias: str = 'default', ttl: float = 300, prefix: str = 'protrend:query'):
+        """
+        The DjangoQueryCache stores the results of read cypher queries in a Django cache backend,
+        so that the cached results are shared by all workers and survive worker restarts.
+
+        Results are compressed pickles of the result rows and keys.
+        Cache keys embed the global dataset version and the versions of the labels matched by the query.
+        Invalidating a label or the whole dataset only bumps the corresponding version,
+        so that previous entries are no longer reachable and expire on their own.
+
+        :param alias: The alias of the Django cache backend in the CACHES settings
+        :param ttl: The time-to-live of the cache entries in seconds
+        :param prefix: The prefix of the cache keys
+        """
+        self.alias = alias
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self) -> str:
+        return f'{self.prefix}:version'
+
+    def label_key(self, label: str) -> str:
+        return f'{self.prefix}:label:{label}'
+
+    def _versions(self, keys: List[str]) -> Dict[str, int]:
+        cache = self.cache
+        versions = cache.get_many(keys)
+
+        for key in keys:
+            if key not in versions:
+                # versions start at a timestamp rather than zero,
+                # so that entries of an evicted version are never reused
+                cache.add(key, time.time_ns(), timeout=None)
+                versions[key] = cache.get(key)
+
+        return versions
+
+    def _bump(self, key: str):
+        cache = self.cache
+
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+    def make_key(self, query: str, params: Dict[str, Any] = None) -> str:
+        keys = [self.version_key] + [self.label_key(label) for label in sorted(query_labels(query))]
+        versions = self._versions(keys)
+
+        version = ':'.join(str(versions[key]) for key in keys)
+        digest = hashlib.sha1(repr((version, cache_key(query, params))).encode()).hexdigest()
+        return f'{self.prefix}:{digest}'
+
+    def get(self, key: str) -> Union[None, Any]:
+        value = self.cache.get(key)
+
+        if value is None:
+            return
+
+        return pickle.loads(zlib.decompress(value))
+
+    def set(self, key: str, value: Any):
+        value = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        self.cache.set(key, value, timeout=self.ttl)
+
+    def invalidate(self, *labels: str):
+        for label in labels:
+            self._bump(self.label_key(label))
+
+    def clear(self):
+        self._bump(self.version_key)
+
+
+_query_cache = None
+
+
+def get_query_cache() -> Union[None, BaseQueryCache]:
+    """
+    It returns the process-wide query cache according to the PROTREND_QUERY_CACHE settings,
+    or None if the query cache is disabled.
+    The local backend keeps the results in the worker memory,
+    whereas the django backend keeps the results in a Django cache shared by all workers.
+    """
+    global _query_cache
+
+    options = getattr(settings, 'PROTREND_QUERY_CACHE', {})
+    if not options.get('ENABLED', False):
+        return
+
+    if _query_cache is None:
+        backend = options.get('BACKEND', 'local')
+        ttl = options.get('TTL', 300)
+
+        if backend == 'django':
+            _query_cache = DjangoQueryCache(alias=options.get('ALIAS', 'default'), ttl=ttl)
+
+        elif backend == 'local':
+            _query_cache = QueryCache(ttl=ttl, max_size=options.get('MAX_SIZE', 1024))
+
+        else:
+            raise ValueError(f'Unknown query cache backend {backend}')
+
+    return _query_cache
+
+
+def invalidate_labels(labels: List[str]):
+    cache = get_query_cache()
+
+    if cache is not None:
+        cache.invalidate(*labels)
+
+
+def clear_query_cache():
+    """
+    It invalidates all cached queries. For the django backend, it bumps the global dataset version
+    """
+    cache = get_query_cache()
+
+    if cache is not None:
+        cache.clear()
+
+
+# noinspection PyUnusedLocal
+def invalidate_node(sender, instance=None, **kwargs):
+    """
+    Receiver of the neomodel save and delete signals.
+    It invalidates the cached queries matching the label of the saved or deleted node.
+    """
+    label = getattr(sender, '__label__', None)
+
+    if label:
+        invalidate_labels([label])
@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+from neomodel import BooleanProperty, FloatProperty, IntegerProperty
+
+
+def column_dtype(prop: Any) -> Union[None, str]:
+    """
+    It returns the pandas dtype of a node property column.
+    Nullable dtypes are used, as most node properties are optional
+    """
+    if isinstance(prop, IntegerProperty):
+        return 'Int64'
+
+    if isinstance(prop, FloatProperty):
+        return 'Float64'
+
+    if isinstance(prop, BooleanProperty):
+        return 'boolean'
+
+    return
+
+
+def to_columns(rows: List[List[Any]], keys: List[str], dtypes: Dict[str, str] = None) -> Dict[str, Any]:
+    """
+    It decodes the result rows into a column array per key.
+    Columns of typed properties are pandas nullable arrays, whereas the remaining columns are numpy object arrays.
+
+    :param rows: The result rows
+    :param keys: The result keys
+    :param dtypes: The pandas dtype of each key, if any
+    :return: A dictionary of key-column pairs
+    """
+    if dtypes is None:
+        dtypes = {}
+
+    columns = zip(*rows) if rows else ([] for _ in keys)
+
+    arrays = {}
+    for key, column in zip(keys, columns):
+        dtype = dtypes.get(key)
+
+        if dtype is None:
+            array = np.empty(len(rows), dtype=object)
+            array[:] = column
+            arrays[key] = array
+
+        else:
+            arrays[key] = pd.array(column, dtype=dtype)
+
+    return arrays
+
+
+def rows_to_frame(rows: List[List[Any]], keys: List[str], dtypes: Dict[str, str] = None) -> pd.DataFrame:
+    return pd.DataFrame(to_columns(rows, keys, dtypes), columns=keys)
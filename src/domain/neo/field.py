@@ -1,69 +1,9 @@
 # -----------------------------------------------
 # NeoNode DESCRIPTORS
 # -----------------------------------------------
-class DefaultField:
-
-    def __init__(self, name, default=None):
-        """
-        Default field stores a default value for the NeoNode instance attribute lookup.
-        At the first lookup if the attribute value is not present in the instance dict, the default field adds the
-        default value received upon instantiation and class formulation
-
-        :param name:
-        :param default:
-        """
-        self.name = name
-        self.default = default
-
-    def __set_name__(self, owner, name):
-        self.name = name
-
-    def __get__(self, instance, owner):
-        if instance is None:
-            return self
-
-        if self.name not in instance.__dict__:
-            default = list(self.default)
-            instance.__dict__[self.name] = default
-
-        return instance.__dict__[self.name]
-
-    def __set__(self, instance, value):
-        if instance is None:
-            return self
-
-        instance.__dict__[self.name] = value
-
-
-class NodeField:
-
-    def __init__(self, name):
-        """
-        It is a simple data-descriptor that will retrieve NeoNode instance attributes, namely the NeoNode fields
-
-        :param name:
-        """
-        self.name = name
-
-    def __set_name__(self, owner, name):
-        self.name = name
-
-    def __get__(self, instance, owner):
-        if instance is None:
-            return self
-
-        return instance.__dict__.get(self.name)
-
-    def __set__(self, instance, value):
-        if instance is None:
-            return self
-
-        instance.__dict__[self.name] = value
-
-
 class NodeLinkField:
 
-    def __init__(self, name, target_cls):
+    def __init__(self, name, target_cls, slot):
         """
         It is simple data-descriptor that will retrieve the NeoNode instance relationships.
         Each relationship is composed of a list of other NeoNode instances
@@ -72,11 +12,16 @@ class NodeLinkField:
         The data-descriptor is instantiated with the target NeoNode class formulation. This class can be used to create
         the NeoNode instances of the connected nodes upon setting the node attribute.
 
+        NeoNode classes do not have an instance dict. The NeoNode instances are stored in the slot received upon
+        instantiation and class formulation
+
         :param name:
         :param target_cls:
+        :param slot:
         """
         self.name = name
         self.target_cls = target_cls
+        self.slot = slot
 
     def __set_name__(self, owner, name):
         self.name = name
@@ -85,7 +30,10 @@ class NodeLinkField:
         if instance is None:
             return self
 
-        return instance.__dict__.get(self.name)
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            return None
 
     def __set__(self, instance, value):
         if instance is None:
@@ -94,13 +42,14 @@ class NodeLinkField:
         if not value:
             value = []
 
-        values = [self.target_cls(**kwargs) for kwargs in value]
-        instance.__dict__[self.name] = values
+        target_cls = self.target_cls
+        values = [target_cls(**kwargs) for kwargs in value]
+        self.slot.__set__(instance, values)
 
 
 class NodeRelationshipField:
 
-    def __init__(self, name, relationship_cls):
+    def __init__(self, name, relationship_cls, slot):
         """
         It is a simple data-descriptor but for relationships. It is similar to the NodeLinkFields,
         but this data-descriptor is used to register the relationship attribute in the NeoNode instances of the
@@ -108,9 +57,11 @@ class NodeRelationshipField:
         This data-descriptor is responsible for getting and setting the properties of the relationships
         :param name:
         :param relationship_cls:
+        :param slot:
         """
         self.name = name
         self.relationship_cls = relationship_cls
+        self.slot = slot
 
     def __set_name__(self, owner, name):
         self.name = name
@@ -119,7 +70,10 @@ class NodeRelationshipField:
         if instance is None:
             return self
 
-        return instance.__dict__.get(self.name)
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            return None
 
     def __set__(self, instance, value):
         if instance is None:
@@ -129,4 +83,4 @@ class NodeRelationshipField:
             value = {}
 
         value = self.relationship_cls(**value)
-        instance.__dict__[self.name] = value
+        self.slot.__set__(instance, value)
@@ -0,0 +1,108 @@
+import logging
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, NamedTuple, Union
+
+from django.conf import settings
+
+
+logger = logging.getLogger('protrend.queries')
+
+
+class QueryRecord(NamedTuple):
+    query: str
+    params: Dict[str, Any]
+    duration: float
+    rows: int
+    origin: str
+    cached: bool
+
+
+class QueryLog:
+
+    def __init__(self):
+        """
+        The QueryLog holds the records of the cypher queries issued within a context, usually a Django request
+        """
+        self.records: List[QueryRecord] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        return sum(record.duration for record in self.records)
+
+    def by_origin(self) -> Dict[str, int]:
+        origins = {}
+        for record in self.records:
+            origins[record.origin] = origins.get(record.origin, 0) + 1
+        return origins
+
+
+_query_log: ContextVar[Union[None, QueryLog]] = ContextVar('protrend_query_log', default=None)
+
+
+def start_query_log() -> Token:
+    """
+    It starts recording the cypher queries issued in the current context
+    """
+    return _query_log.set(QueryLog())
+
+
+def get_query_log() -> Union[None, QueryLog]:
+    return _query_log.get()
+
+
+def stop_query_log(token: Token) -> Union[None, QueryLog]:
+    """
+    It stops recording the cypher queries issued in the current context and returns the query log
+    """
+    query_log = _query_log.get()
+    _query_log.reset(token)
+    return query_log
+
+
+def slow_query_threshold() -> Union[None, float]:
+    options = getattr(settings, 'PROTREND_QUERY_INSTRUMENTATION', {})
+    return options.get('SLOW_QUERY_THRESHOLD')
+
+
+def record_query(query: str,
+                 params: Dict[str, Any],
+                 start: float,
+                 rows: int,
+                 origin: str = None,
+                 cached: bool = False):
+    """
+    It records the wall time and the number of rows of a cypher query in the query log of the current context,
+    and it writes the query to the slow query log if it took longer than the configured threshold.
+
+    :param query: The cypher query
+    :param params: The cypher query parameters
+    :param start: The query start time, as given by time.perf_counter
+    :param rows: The number of rows returned by the query
+    :param origin: The name of the query set class or function that issued the query
+    :param cached: Whether the query was served from the query cache
+    """
+    duration = time.perf_counter() - start
+
+    if origin is None:
+        origin = 'query_db'
+
+    query_log = _query_log.get()
+    if query_log is not None:
+        query_log.records.append(QueryRecord(query=query,
+                                             params=params,
+                                             duration=duration,
+                                             rows=rows,
+                                             origin=origin,
+                                             cached=cached))
+
+    threshold = slow_query_threshold()
+    if threshold is not None and duration >= threshold:
+        logger.warning('Slow query (%.3f s, %d rows, %s): %s %s', duration, rows, origin, query, params or {})
@@ -0,0 +1,1585 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Iterable, Iterator, Union
+
+
+class MemoryGraphError(Exception):
+    pass
+
+
+class MemoryNode:
+    __slots__ = ('id', 'labels', 'properties')
+
+    def __init__(self, id_: int, labels: Iterable[str], properties: Dict[str, Any]):
+        self.id = id_
+        self.labels = set(labels)
+        self.properties = properties
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.properties.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.properties[key]
+
+    def keys(self):
+        return self.properties.keys()
+
+    def values(self):
+        return self.properties.values()
+
+    def items(self):
+        return self.properties.items()
+
+    def __repr__(self):
+        return f'<MemoryNode id={self.id} labels={sorted(self.labels)} properties={self.properties}>'
+
+
+class MemoryRelationship:
+    __slots__ = ('id', 'type', 'start_node', 'end_node', 'properties')
+
+    def __init__(self, id_: int, type_: str, start_node: MemoryNode, end_node: MemoryNode, properties: Dict[str, Any]):
+        self.id = id_
+        self.type = type_
+        self.start_node = start_node
+        self.end_node = end_node
+        self.properties = properties
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.properties.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.properties[key]
+
+    def keys(self):
+        return self.properties.keys()
+
+    def values(self):
+        return self.properties.values()
+
+    def items(self):
+        return self.properties.items()
+
+    def __repr__(self):
+        return f'<MemoryRelationship id={self.id} type={self.type} ' \
+               f'start={self.start_node.id} end={self.end_node.id} properties={self.properties}>'
+
+
+# -----------------------------------------------
+# CYPHER PARSER
+# -----------------------------------------------
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+    |(?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    |(?P<num>\d+\.\d+|\d+)
+    |(?P<param>\$\w+)
+    |(?P<name>`[^`]+`|[A-Za-z_]\w*)
+    |(?P<sym><-|->|<>|<=|>=|=~|\+=|[()\[\]{},.:=<>\-+*/%|])
+""", re.VERBOSE)
+
+_ESCAPE_PATTERN = re.compile(r'\\(.)')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+
+_AGGREGATES = ('count', 'collect', 'min', 'max', 'sum', 'avg')
+
+_CLAUSE_KEYWORDS = ('MATCH', 'OPTIONAL', 'UNWIND', 'CALL', 'WITH', 'RETURN', 'CREATE', 'MERGE', 'SET', 'REMOVE',
+                    'DELETE', 'DETACH', 'WHERE', 'ORDER', 'SKIP', 'LIMIT', 'ON', 'YIELD', 'AS', 'UNION')
+
+
+def _unescape(value: str) -> str:
+    return _ESCAPE_PATTERN.sub(lambda match: _ESCAPES.get(match.group(1), match.group(1)), value)
+
+
+def _tokenize(query: str) -> List[Tuple[str, Any, int, int]]:
+    tokens = []
+    position = 0
+    while position < len(query):
+        match = _TOKEN_PATTERN.match(query, position)
+        if match is None:
+            raise MemoryGraphError(f'Invalid cypher syntax at position {position}: {query}')
+
+        kind = match.lastgroup
+        value = match.group()
+        start, position = match.span()
+
+        if kind == 'space':
+            continue
+
+        if kind == 'str':
+            value = _unescape(value[1:-1])
+
+        elif kind == 'num':
+            value = float(value) if '.' in value else int(value)
+
+        elif kind == 'param':
+            value = value[1:]
+
+        elif kind == 'name' and value.startswith('`'):
+            value = value[1:-1]
+
+        tokens.append((kind, value, start, position))
+
+    tokens.append(('eof', None, len(query), len(query)))
+    return tokens
+
+
+class _Parser:
+
+    def __init__(self, query: str):
+        """
+        A recursive descent parser of the cypher subset emitted by the query sets and the dpi write functions.
+        Clauses and expressions are parsed into tuples, which are interpreted by the MemoryGraph.
+        """
+        self.query = query
+        self.tokens = _tokenize(query)
+        self.i = 0
+
+    # -------------------------------------------------------------
+    # TOKENS
+    # -------------------------------------------------------------
+    def peek(self, offset: int = 0) -> Tuple[str, Any, int, int]:
+        return self.tokens[min(self.i + offset, len(self.tokens) - 1)]
+
+    def next(self) -> Tuple[str, Any, int, int]:
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def error(self, message: str):
+        position = self.peek()[2]
+        return MemoryGraphError(f'{message} at position {position}: {self.query}')
+
+    def is_keyword(self, keyword: str, offset: int = 0) -> bool:
+        kind, value, *_ = self.peek(offset)
+        return kind == 'name' and value.upper() == keyword
+
+    def accept_keyword(self, keyword: str) -> bool:
+        if self.is_keyword(keyword):
+            self.i += 1
+            return True
+        return False
+
+    def expect_keyword(self, keyword: str):
+        if not self.accept_keyword(keyword):
+            raise self.error(f'Expecting {keyword}')
+
+    def is_symbol(self, symbol: str) -> bool:
+        kind, value, *_ = self.peek()
+        return kind == 'sym' and value == symbol
+
+    def accept_symbol(self, symbol: str) -> bool:
+        if self.is_symbol(symbol):
+            self.i += 1
+            return True
+        return False
+
+    def expect_symbol(self, symbol: str):
+        if not self.accept_symbol(symbol):
+            raise self.error(f'Expecting {symbol}')
+
+    def name(self) -> str:
+        kind, value, *_ = self.peek()
+        if kind != 'name':
+            raise self.error('Expecting a name')
+
+        self.i += 1
+        return value
+
+    def is_variable(self) -> bool:
+        kind, value, *_ = self.peek()
+        return kind == 'name' and value.upper() not in _CLAUSE_KEYWORDS
+
+    # -------------------------------------------------------------
+    # CLAUSES
+    # -------------------------------------------------------------
+    def parse(self) -> List[tuple]:
+        clauses = []
+        while self.peek()[0] != 'eof':
+            clauses.append(self.clause())
+
+        return clauses
+
+    def clause(self) -> tuple:
+        if self.accept_keyword('MATCH'):
+            return self.match(optional=False)
+
+        if self.accept_keyword('OPTIONAL'):
+            self.expect_keyword('MATCH')
+            return self.match(optional=True)
+
+        if self.accept_keyword('UNWIND'):
+            expression = self.expression()
+            self.expect_keyword('AS')
+            return 'unwind', expression, self.name()
+
+        if self.accept_keyword('CALL'):
+            return self.call()
+
+        if self.accept_keyword('WHERE'):
+            return 'where', self.expression()
+
+        if self.accept_keyword('WITH'):
+            return self.projection('with')
+
+        if self.accept_keyword('RETURN'):
+            return self.projection('return')
+
+        if self.accept_keyword('CREATE'):
+            return 'create', self.patterns()
+
+        if self.accept_keyword('MERGE'):
+            return self.merge()
+
+        if self.accept_keyword('SET'):
+            return 'set', self.set_items()
+
+        if self.accept_keyword('REMOVE'):
+            return 'remove', self.remove_items()
+
+        if self.accept_keyword('DETACH'):
+            self.expect_keyword('DELETE')
+            return 'delete', self.expressions(), True
+
+        if self.accept_keyword('DELETE'):
+            return 'delete', self.expressions(), False
+
+        raise self.error('Unsupported cypher clause')
+
+    def match(self, optional: bool) -> tuple:
+        patterns = self.patterns()
+
+        where = None
+        if self.accept_keyword('WHERE'):
+            where = self.expression()
+
+        return 'match', patterns, where, optional
+
+    def call(self) -> tuple:
+        procedure = [self.name()]
+        while self.accept_symbol('.'):
+            procedure.append(self.name())
+
+        procedure = '.'.join(procedure)
+        if procedure != 'db.index.fulltext.queryNodes':
+            raise self.error(f'Unsupported procedure {procedure}')
+
+        self.expect_symbol('(')
+        arguments = self.expressions()
+        self.expect_symbol(')')
+
+        yields = {}
+        self.expect_keyword('YIELD')
+        while True:
+            column = self.name()
+            yields[column] = self.name() if self.accept_keyword('AS') else column
+
+            if not self.accept_symbol(','):
+                break
+
+        return 'fulltext', arguments, yields
+
+    def projection(self, keyword: str) -> tuple:
+        distinct = self.accept_keyword('DISTINCT')
+
+        items = []
+        while True:
+            start = self.peek()[2]
+            expression = self.expression()
+            text = self.query[start:self.tokens[self.i - 1][3]].strip()
+            alias = self.name() if self.accept_keyword('AS') else text
+            items.append((expression, alias))
+
+            if not self.accept_symbol(','):
+                break
+
+        order = []
+        if self.accept_keyword('ORDER'):
+            self.expect_keyword('BY')
+
+            while True:
+                expression = self.expression()
+                descending = False
+                if self.accept_keyword('DESC') or self.accept_keyword('DESCENDING'):
+                    descending = True
+                elif not self.accept_keyword('ASC'):
+                    self.accept_keyword('ASCENDING')
+
+                order.append((expression, descending))
+
+                if not self.accept_symbol(','):
+                    break
+
+        skip = self.expression() if self.accept_keyword('SKIP') else None
+        limit = self.expression() if self.accept_keyword('LIMIT') else None
+
+        return keyword, items, distinct, order, skip, limit
+
+    def merge(self) -> tuple:
+        pattern = self.pattern()
+
+        on_create = []
+        on_match = []
+        while self.is_keyword('ON'):
+            self.next()
+            if self.accept_keyword('CREATE'):
+                self.expect_keyword('SET')
+                on_create.extend(self.set_items())
+            else:
+                self.expect_keyword('MATCH')
+                self.expect_keyword('SET')
+                on_match.extend(self.set_items())
+
+        return 'merge', pattern, on_create, on_match
+
+    def set_items(self) -> List[tuple]:
+        items = []
+        while True:
+            variable = self.name()
+
+            if self.accept_symbol('.'):
+                key = self.name()
+                self.expect_symbol('=')
+                items.append(('property', variable, key, self.expression()))
+
+            elif self.accept_symbol('='):
+                items.append(('replace', variable, self.expression()))
+
+            elif self.accept_symbol('+='):
+                items.append(('merge', variable, self.expression()))
+
+            elif self.is_symbol(':'):
+                items.append(('labels', variable, self.labels()))
+
+            else:
+                raise self.error('Invalid SET item')
+
+            if not self.accept_symbol(','):
+                return items
+
+    def remove_items(self) -> List[tuple]:
+        items = []
+        while True:
+            variable = self.name()
+
+            if self.accept_symbol('.'):
+                items.append(('property', variable, self.name(), ('literal', None)))
+
+            elif self.is_symbol(':'):
+                items.append(('remove_labels', variable, self.labels()))
+
+            else:
+                raise self.error('Invalid REMOVE item')
+
+            if not self.accept_symbol(','):
+                return items
+
+    # -------------------------------------------------------------
+    # PATTERNS
+    # -------------------------------------------------------------
+    def patterns(self) -> List[tuple]:
+        patterns = [self.pattern()]
+        while self.accept_symbol(','):
+            patterns.append(self.pattern())
+
+        return patterns
+
+    def pattern(self) -> tuple:
+        nodes = [self.node_pattern()]
+        relationships = []
+        while self.is_symbol('-') or self.is_symbol('<-'):
+            relationships.append(self.relationship_pattern())
+            nodes.append(self.node_pattern())
+
+        return nodes, relationships
+
+    def labels(self) -> List[str]:
+        labels = []
+        while self.accept_symbol(':'):
+            labels.append(self.name())
+
+        return labels
+
+    def node_pattern(self) -> tuple:
+        self.expect_symbol('(')
+
+        variable = self.name() if self.is_variable() else None
+        labels = self.labels()
+        properties = self.map_literal() if self.is_symbol('{') else None
+
+        self.expect_symbol(')')
+        return variable, labels, properties
+
+    def relationship_pattern(self) -> tuple:
+        incoming = self.accept_symbol('<-')
+        if not incoming:
+            self.expect_symbol('-')
+
+        variable = None
+        types = []
+        properties = None
+        if self.accept_symbol('['):
+            variable = self.name() if self.is_variable() else None
+
+            if self.accept_symbol(':'):
+                types.append(self.name())
+                while self.accept_symbol('|'):
+                    self.accept_symbol(':')
+                    types.append(self.name())
+
+            properties = self.map_literal() if self.is_symbol('{') else None
+            self.expect_symbol(']')
+
+        outgoing = self.accept_symbol('->')
+        if not outgoing:
+            self.expect_symbol('-')
+
+        if outgoing and not incoming:
+            direction = 1
+        elif incoming and not outgoing:
+            direction = -1
+        else:
+            direction = 0
+
+        return variable, types, properties, direction
+
+    # -------------------------------------------------------------
+    # EXPRESSIONS
+    # -------------------------------------------------------------
+    def expressions(self) -> List[tuple]:
+        expressions = [self.expression()]
+        while self.accept_symbol(','):
+            expressions.append(self.expression())
+
+        return expressions
+
+    def expression(self) -> tuple:
+        return self.or_expression()
+
+    def or_expression(self) -> tuple:
+        left = self.xor_expression()
+        while self.accept_keyword('OR'):
+            left = ('or', left, self.xor_expression())
+        return left
+
+    def xor_expression(self) -> tuple:
+        left = self.and_expression()
+        while self.accept_keyword('XOR'):
+            left = ('xor', left, self.and_expression())
+        return left
+
+    def and_expression(self) -> tuple:
+        left = self.not_expression()
+        while self.accept_keyword('AND'):
+            left = ('and', left, self.not_expression())
+        return left
+
+    def not_expression(self) -> tuple:
+        if self.accept_keyword('NOT'):
+            return 'not', self.not_expression()
+
+        return self.comparison()
+
+    def comparison(self) -> tuple:
+        left = self.additive()
+
+        while True:
+            kind, value, *_ = self.peek()
+
+            if kind == 'sym' and value in ('=', '<>', '<', '>', '<=', '>=', '=~'):
+                self.next()
+                left = ('compare', value, left, self.additive())
+
+            elif self.accept_keyword('IN'):
+                left = ('compare', 'IN', left, self.additive())
+
+            elif self.accept_keyword('CONTAINS'):
+                left = ('compare', 'CONTAINS', left, self.additive())
+
+            elif self.is_keyword('STARTS') and self.is_keyword('WITH', offset=1):
+                self.i += 2
+                left = ('compare', 'STARTS WITH', left, self.additive())
+
+            elif self.is_keyword('ENDS') and self.is_keyword('WITH', offset=1):
+                self.i += 2
+                left = ('compare', 'ENDS WITH', left, self.additive())
+
+            elif self.accept_keyword('IS'):
+                negated = self.accept_keyword('NOT')
+                self.expect_keyword('NULL')
+                left = ('is_null', left, negated)
+
+            else:
+                return left
+
+    def additive(self) -> tuple:
+        left = self.multiplicative()
+        while self.is_symbol('+') or self.is_symbol('-'):
+            operator = self.next()[1]
+            left = ('arithmetic', operator, left, self.multiplicative())
+        return left
+
+    def multiplicative(self) -> tuple:
+        left = self.unary()
+        while self.is_symbol('*') or self.is_symbol('/') or self.is_symbol('%'):
+            operator = self.next()[1]
+            left = ('arithmetic', operator, left, self.unary())
+        return left
+
+    def unary(self) -> tuple:
+        if self.accept_symbol('-'):
+            return 'negative', self.unary()
+
+        return self.postfix()
+
+    def postfix(self) -> tuple:
+        expression = self.atom()
+
+        while True:
+            if self.accept_symbol('.'):
+                expression = ('property', expression, self.name())
+
+            elif self.is_symbol(':'):
+                expression = ('has_labels', expression, self.labels())
+
+            elif self.accept_symbol('['):
+                index = self.expression()
+                self.expect_symbol(']')
+                expression = ('index', expression, index)
+
+            elif self.is_symbol('{') and expression[0] == 'variable':
+                expression = ('projection', expression, self.map_projection())
+
+            else:
+                return expression
+
+    def atom(self) -> tuple:
+        kind, value, *_ = self.peek()
+
+        if kind in ('str', 'num'):
+            self.next()
+            return 'literal', value
+
+        if kind == 'param':
+            self.next()
+            return 'parameter', value
+
+        if self.accept_symbol('('):
+            expression = self.expression()
+            self.expect_symbol(')')
+            return expression
+
+        if self.accept_symbol('['):
+            items = [] if self.is_symbol(']') else self.expressions()
+            self.expect_symbol(']')
+            return 'list', items
+
+        if self.is_symbol('{'):
+            return self.map_literal()
+
+        if kind == 'name':
+            self.next()
+
+            keyword = value.upper()
+            if keyword == 'TRUE':
+                return 'literal', True
+            if keyword == 'FALSE':
+                return 'literal', False
+            if keyword == 'NULL':
+                return 'literal', None
+
+            if self.accept_symbol('('):
+                return self.function(value.lower())
+
+            return 'variable', value
+
+        raise self.error('Invalid expression')
+
+    def function(self, name: str) -> tuple:
+        if name == 'count' and self.accept_symbol('*'):
+            self.expect_symbol(')')
+            return 'count_all',
+
+        distinct = self.accept_keyword('DISTINCT')
+        arguments = [] if self.is_symbol(')') else self.expressions()
+        self.expect_symbol(')')
+        return 'function', name, arguments, distinct
+
+    def map_literal(self) -> tuple:
+        self.expect_symbol('{')
+
+        entries = []
+        while not self.accept_symbol('}'):
+            key = self.name()
+            self.expect_symbol(':')
+            entries.append((key, self.expression()))
+            self.accept_symbol(',')
+
+        return 'map', entries
+
+    def map_projection(self) -> List[tuple]:
+        self.expect_symbol('{')
+
+        items = []
+        while not self.accept_symbol('}'):
+            if self.accept_symbol('.'):
+                if self.accept_symbol('*'):
+                    items.append(('all',))
+                else:
+                    items.append(('property', self.name()))
+
+            else:
+                key = self.name()
+                if self.accept_symbol(':'):
+                    items.append(('entry', key, self.expression()))
+                else:
+                    items.append(('entry', key, ('variable', key)))
+
+            self.accept_symbol(',')
+
+        return items
+
+
+@lru_cache(maxsize=1024)
+def parse_cypher(query: str) -> List[tuple]:
+    """
+    It parses the cypher query into a list of clauses, which can be interpreted by the MemoryGraph
+    """
+    return _Parser(query).parse()
+
+
+# -----------------------------------------------
+# EXPRESSIONS
+# -----------------------------------------------
+def _freeze(value: Any) -> Any:
+    # hashable representation of values used for grouping and DISTINCT
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+
+    return value
+
+
+def _sort_key(value: Any) -> tuple:
+    # values of different types are ordered as in Neo4j, and nulls are placed last in ascending order
+    if value is None:
+        return 1, 0, 0
+
+    if isinstance(value, bool):
+        return 0, 5, value
+
+    if isinstance(value, (int, float)):
+        return 0, 6, value
+
+    if isinstance(value, str):
+        return 0, 4, value
+
+    if isinstance(value, (list, tuple)):
+        return 0, 3, tuple(_sort_key(item) for item in value)
+
+    if isinstance(value, MemoryNode):
+        return 0, 1, value.id
+
+    if isinstance(value, MemoryRelationship):
+        return 0, 2, value.id
+
+    if isinstance(value, dict):
+        return 0, 0, tuple(sorted((key, _sort_key(item)) for key, item in value.items()))
+
+    return 0, 7, str(value)
+
+
+def _get_property(value: Any, key: str) -> Any:
+    if value is None:
+        return
+
+    if isinstance(value, (MemoryNode, MemoryRelationship)):
+        return value.properties.get(key)
+
+    if isinstance(value, dict):
+        return value.get(key)
+
+    raise MemoryGraphError(f'Type mismatch: expected a map, node or relationship but was {value!r}')
+
+
+def _to_string(value: Any) -> Union[None, str]:
+    if value is None:
+        return
+
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    return str(value)
+
+
+def _to_integer(value: Any) -> Union[None, int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return
+
+
+def _to_float(value: Any) -> Union[None, float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return
+
+
+def _null_safe(function):
+    def wrapper(value):
+        if value is None:
+            return
+        return function(value)
+
+    return wrapper
+
+
+_FUNCTIONS = {'tolower': _null_safe(lambda value: str(value).lower()),
+              'toupper': _null_safe(lambda value: str(value).upper()),
+              'trim': _null_safe(lambda value: str(value).strip()),
+              'split': lambda value, delimiter: None if value is None or delimiter is None else
+              str(value).split(delimiter),
+              'tostring': _to_string,
+              'tointeger': _to_integer,
+              'tofloat': _to_float,
+              'size': _null_safe(len),
+              'id': _null_safe(lambda value: value.id),
+              'labels': _null_safe(lambda value: sorted(value.labels)),
+              'type': _null_safe(lambda value: value.type),
+              'keys': _null_safe(lambda value: list(value.keys())),
+              'properties': _null_safe(lambda value: dict(value.items()))}
+
+
+def _compare(operator: str, left: Any, right: Any) -> Union[None, bool]:
+    if operator == 'IN':
+        if right is None:
+            return
+        if left is None:
+            return None if right else False
+        return left in right
+
+    if left is None or right is None:
+        return
+
+    if operator == '=':
+        return left == right
+
+    if operator == '<>':
+        return left != right
+
+    if operator in ('CONTAINS', 'STARTS WITH', 'ENDS WITH', '=~'):
+        if not isinstance(left, str) or not isinstance(right, str):
+            return
+
+        if operator == 'CONTAINS':
+            return right in left
+
+        if operator == 'STARTS WITH':
+            return left.startswith(right)
+
+        if operator == 'ENDS WITH':
+            return left.endswith(right)
+
+        return re.fullmatch(right, left, re.DOTALL) is not None
+
+    try:
+        if operator == '<':
+            return left < right
+        if operator == '>':
+            return left > right
+        if operator == '<=':
+            return left <= right
+        return left >= right
+
+    except TypeError:
+        return
+
+
+def _arithmetic(operator: str, left: Any, right: Any) -> Any:
+    if left is None or right is None:
+        return
+
+    if operator == '+':
+        return left + right
+    if operator == '-':
+        return left - right
+    if operator == '*':
+        return left * right
+    if operator == '/':
+        if isinstance(left, int) and isinstance(right, int):
+            return int(left / right)
+        return left / right
+    return left % right
+
+
+def evaluate(expression: tuple, row: Dict[str, Any], params: Dict[str, Any]) -> Any:
+    """
+    It evaluates an expression tree for a row of variable bindings, according to the cypher null semantics
+    """
+    kind = expression[0]
+
+    if kind == 'literal':
+        return expression[1]
+
+    if kind == 'parameter':
+        if expression[1] not in params:
+            raise MemoryGraphError(f'Expected parameter: {expression[1]}')
+        return params[expression[1]]
+
+    if kind == 'variable':
+        if expression[1] not in row:
+            raise MemoryGraphError(f'Variable {expression[1]} not defined')
+        return row[expression[1]]
+
+    if kind == 'property':
+        return _get_property(evaluate(expression[1], row, params), expression[2])
+
+    if kind == 'compare':
+        return _compare(expression[1],
+                        evaluate(expression[2], row, params),
+                        evaluate(expression[3], row, params))
+
+    if kind == 'and':
+        left = evaluate(expression[1], row, params)
+        if left is False:
+            return False
+        right = evaluate(expression[2], row, params)
+        if right is False:
+            return False
+        if left is None or right is None:
+            return
+        return True
+
+    if kind == 'or':
+        left = evaluate(expression[1], row, params)
+        if left is True:
+            return True
+        right = evaluate(expression[2], row, params)
+        if right is True:
+            return True
+        if left is None or right is None:
+            return
+        return False
+
+    if kind == 'xor':
+        left = evaluate(expression[1], row, params)
+        right = evaluate(expression[2], row, params)
+        if left is None or right is None:
+            return
+        return left != right
+
+    if kind == 'not':
+        value = evaluate(expression[1], row, params)
+        if value is None:
+            return
+        return not value
+
+    if kind == 'is_null':
+        is_null = evaluate(expression[1], row, params) is None
+        return not is_null if expression[2] else is_null
+
+    if kind == 'has_labels':
+        value = evaluate(expression[1], row, params)
+        if value is None:
+            return
+        return all(label in value.labels for label in expression[2])
+
+    if kind == 'function':
+        name, arguments = expression[1], expression[2]
+
+        if name in _AGGREGATES:
+            raise MemoryGraphError(f'The {name} aggregation is only supported as a WITH or RETURN item')
+
+        values = [evaluate(argument, row, params) for argument in arguments]
+
+        if name == 'coalesce':
+            return next((value for value in values if value is not None), None)
+
+        if name not in _FUNCTIONS:
+            raise MemoryGraphError(f'Unsupported function {name}')
+
+        return _FUNCTIONS[name](*values)
+
+    if kind == 'projection':
+        value = evaluate(expression[1], row, params)
+        if value is None:
+            return
+
+        projection = {}
+        for item in expression[2]:
+            if item[0] == 'property':
+                projection[item[1]] = _get_property(value, item[1])
+            elif item[0] == 'all':
+                projection.update(value.items())
+            else:
+                projection[item[1]] = evaluate(item[2], row, params)
+
+        return projection
+
+    if kind == 'map':
+        return {key: evaluate(item, row, params) for key, item in expression[1]}
+
+    if kind == 'list':
+        return [evaluate(item, row, params) for item in expression[1]]
+
+    if kind == 'index':
+        value = evaluate(expression[1], row, params)
+        index = evaluate(expression[2], row, params)
+        if value is None or index is None:
+            return
+        if isinstance(value, list):
+            return value[index] if -len(value) <= index < len(value) else None
+        return _get_property(value, index)
+
+    if kind == 'arithmetic':
+        return _arithmetic(expression[1],
+                           evaluate(expression[2], row, params),
+                           evaluate(expression[3], row, params))
+
+    if kind == 'negative':
+        value = evaluate(expression[1], row, params)
+        return None if value is None else -value
+
+    if kind == 'count_all':
+        raise MemoryGraphError('The count aggregation is only supported as a WITH or RETURN item')
+
+    raise MemoryGraphError(f'Unsupported expression {kind}')
+
+
+def _is_aggregate(expression: tuple) -> bool:
+    return expression[0] == 'count_all' or (expression[0] == 'function' and expression[1] in _AGGREGATES)
+
+
+def _distinct(values: List[Any]) -> List[Any]:
+    return list({_freeze(value): value for value in values}.values())
+
+
+def _aggregate(expression: tuple, values: List[Any]) -> Any:
+    if expression[0] == 'count_all':
+        return len(values)
+
+    name, distinct = expression[1], expression[3]
+
+    values = [value for value in values if value is not None]
+    if distinct:
+        values = _distinct(values)
+
+    if name == 'count':
+        return len(values)
+
+    if name == 'collect':
+        return values
+
+    if name == 'sum':
+        return sum(values)
+
+    if not values:
+        return
+
+    if name == 'min':
+        return min(values, key=_sort_key)
+
+    if name == 'max':
+        return max(values, key=_sort_key)
+
+    return sum(values) / len(values)
+
+
+def _fulltext_terms(query: str) -> List[Tuple[str, bool]]:
+    terms = []
+    for term in re.split(r'\s+AND\s+', query.strip()):
+        prefix = term.endswith('*') and not term.endswith('\\*')
+        if prefix:
+            term = term[:-1]
+
+        terms.append((_unescape(term).lower(), prefix))
+
+    return terms
+
+
+# -----------------------------------------------
+# GRAPH
+# -----------------------------------------------
+class MemoryGraph:
+
+    def __init__(self):
+        """
+        An in-memory property graph that runs the cypher subset emitted by the query sets and the dpi functions:
+        MATCH and OPTIONAL MATCH of node and relationship patterns, WHERE, WITH and RETURN projections
+        (including DISTINCT, map projections and the count, collect, min, max, sum and avg aggregations),
+        ORDER BY, SKIP and LIMIT, UNWIND, full-text index lookups, CREATE, MERGE, SET, REMOVE and DELETE.
+
+        The graph can replace the Neo4j server (see the PROTREND_DB_BACKEND setting) to profile the query sets,
+        serializers and views without a server. It is not a database though: there are no transactions,
+        constraints or query planning, and neomodel save or connect calls still require Neo4j.
+        The graph is populated with the dpi bulk functions or with create_node and create_relationship.
+        """
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._ids = 0
+            self._nodes: Dict[int, MemoryNode] = {}
+            self._relationships: Dict[int, MemoryRelationship] = {}
+            self._labels: Dict[str, Dict[int, MemoryNode]] = {}
+            self._outgoing: Dict[int, Dict[int, MemoryRelationship]] = {}
+            self._incoming: Dict[int, Dict[int, MemoryRelationship]] = {}
+            self._indexes: Dict[Tuple[str, str], Dict[Any, Dict[int, MemoryNode]]] = {}
+            self._fulltext_indexes: Dict[str, Tuple[str, List[str]]] = {}
+
+    # -------------------------------------------------------------
+    # GRAPH API
+    # -------------------------------------------------------------
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def relationship_count(self) -> int:
+        return len(self._relationships)
+
+    def nodes(self, label: str = None) -> List[MemoryNode]:
+        if label is None:
+            return list(self._nodes.values())
+
+        return list(self._labels.get(label, {}).values())
+
+    def _next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    def create_node(self, labels: Iterable[str], properties: Dict[str, Any] = None) -> MemoryNode:
+        """
+        It creates a node having the labels and the properties. Null properties are not stored.
+        """
+        with self._lock:
+            properties = {key: value for key, value in (properties or {}).items() if value is not None}
+            node = MemoryNode(self._next_id(), labels, properties)
+
+            self._nodes[node.id] = node
+            self._outgoing[node.id] = {}
+            self._incoming[node.id] = {}
+            for label in node.labels:
+                self._labels.setdefault(label, {})[node.id] = node
+
+            self._index_node(node)
+            return node
+
+    def create_relationship(self,
+                            start_node: MemoryNode,
+                            type_: str,
+                            end_node: MemoryNode,
+                            properties: Dict[str, Any] = None) -> MemoryRelationship:
+        """
+        It creates a relationship of the type from the start node to the end node
+        """
+        with self._lock:
+            properties = {key: value for key, value in (properties or {}).items() if value is not None}
+            relationship = MemoryRelationship(self._next_id(), type_, start_node, end_node, properties)
+
+            self._relationships[relationship.id] = relationship
+            self._outgoing[start_node.id][relationship.id] = relationship
+            self._incoming[end_node.id][relationship.id] = relationship
+            return relationship
+
+    def delete(self, entity: Union[MemoryNode, MemoryRelationship], detach: bool = False):
+        with self._lock:
+            if isinstance(entity, MemoryRelationship):
+                self._relationships.pop(entity.id, None)
+                self._outgoing[entity.start_node.id].pop(entity.id, None)
+                self._incoming[entity.end_node.id].pop(entity.id, None)
+                return
+
+            if entity.id not in self._nodes:
+                return
+
+            relationships = list(self._outgoing[entity.id].values()) + list(self._incoming[entity.id].values())
+            if relationships and not detach:
+                raise MemoryGraphError(f'Cannot delete node {entity.id}, because it still has relationships')
+
+            for relationship in relationships:
+                self.delete(relationship)
+
+            self._unindex_node(entity)
+            for label in entity.labels:
+                self._labels[label].pop(entity.id, None)
+
+            del self._nodes[entity.id]
+            del self._outgoing[entity.id]
+            del self._incoming[entity.id]
+
+    def update(self, entity: Union[MemoryNode, MemoryRelationship], properties: Dict[str, Any], replace: bool = False):
+        """
+        It updates the properties of a node or relationship. Null values remove the properties.
+        """
+        with self._lock:
+            is_node = isinstance(entity, MemoryNode)
+            if is_node:
+                self._unindex_node(entity)
+
+            if replace:
+                entity.properties.clear()
+
+            for key, value in properties.items():
+                if value is None:
+                    entity.properties.pop(key, None)
+                else:
+                    entity.properties[key] = value
+
+            if is_node:
+                self._index_node(entity)
+
+    def set_labels(self, node: MemoryNode, labels: Iterable[str], remove: bool = False):
+        with self._lock:
+            self._unindex_node(node)
+
+            for label in labels:
+                if remove:
+                    node.labels.discard(label)
+                    self._labels.get(label, {}).pop(node.id, None)
+                else:
+                    node.labels.add(label)
+                    self._labels.setdefault(label, {})[node.id] = node
+
+            self._index_node(node)
+
+    def create_fulltext_index(self, name: str, label: str, properties: List[str]):
+        """
+        It registers the full-text index of the label properties.
+        Lookups of unregistered indexes search all string properties of all nodes.
+        """
+        self._fulltext_indexes[name] = (label, list(properties))
+
+    # -------------------------------------------------------------
+    # INDEXES
+    # -------------------------------------------------------------
+    def _index_node(self, node: MemoryNode):
+        for (label, key), index in self._indexes.items():
+            if label in node.labels and key in node.properties:
+                index.setdefault(_freeze(node.properties[key]), {})[node.id] = node
+
+    def _unindex_node(self, node: MemoryNode):
+        for (label, key), index in self._indexes.items():
+            if label in node.labels and key in node.properties:
+                index.get(_freeze(node.properties[key]), {}).pop(node.id, None)
+
+    def _lookup(self, label: str, key: str, value: Any) -> Iterable[MemoryNode]:
+        # property indexes are built upon the first lookup and maintained by every write afterwards
+        index = self._indexes.get((label, key))
+
+        if index is None:
+            index = {}
+            for node in self._labels.get(label, {}).values():
+                if key in node.properties:
+                    index.setdefault(_freeze(node.properties[key]), {})[node.id] = node
+
+            self._indexes[(label, key)] = index
+
+        return list(index.get(_freeze(value), {}).values())
+
+    def fulltext(self, name: str, query: str) -> List[MemoryNode]:
+        """
+        It looks up the nodes having all terms of the full-text (lucene) query, which are matched as whole words
+        or as word prefixes (terms ending with *) of the indexed properties
+        """
+        terms = _fulltext_terms(query)
+
+        if name in self._fulltext_indexes:
+            label, properties = self._fulltext_indexes[name]
+            nodes = self._labels.get(label, {}).values()
+        else:
+            properties = None
+            nodes = self._nodes.values()
+
+        results = []
+        for node in nodes:
+            values = node.properties.values() if properties is None else \
+                (node.properties.get(key) for key in properties)
+
+            words = set()
+            for value in values:
+                if isinstance(value, str):
+                    words.update(re.findall(r'\w+', value.lower()))
+
+            if all(any(word.startswith(term) if prefix else word == term for word in words)
+                   for term, prefix in terms):
+                results.append(node)
+
+        return results
+
+    # -------------------------------------------------------------
+    # CYPHER
+    # -------------------------------------------------------------
+    def cypher_query(self, query: str, params: Dict[str, Any] = None, **kwargs) -> Tuple[List[List[Any]], List[str]]:
+        """
+        It runs the cypher query in the graph and returns the result rows and the result keys,
+        exactly like the neomodel cypher_query.
+
+        :param query: The cypher query
+        :param params: The cypher query parameters
+        :return: The result rows and the result keys
+        """
+        clauses = parse_cypher(query)
+
+        with self._lock:
+            return self._run(clauses, params or {})
+
+    def _run(self, clauses: List[tuple], params: Dict[str, Any]) -> Tuple[List[List[Any]], List[str]]:
+        rows = [{}]
+
+        for clause in clauses:
+            kind = clause[0]
+
+            if kind == 'match':
+                _, patterns, where, optional = clause
+                rows = [new_row for row in rows for new_row in self._match(row, patterns, where, optional, params)]
+
+            elif kind == 'where':
+                rows = [row for row in rows if evaluate(clause[1], row, params) is True]
+
+            elif kind == 'unwind':
+                _, expression, variable = clause
+                new_rows = []
+                for row in rows:
+                    values = evaluate(expression, row, params)
+                    if values is None:
+                        continue
+                    if not isinstance(values, (list, tuple)):
+                        values = [values]
+                    new_rows.extend({**row, variable: value} for value in values)
+                rows = new_rows
+
+            elif kind == 'fulltext':
+                _, (name, query), yields = clause
+                new_rows = []
+                for row in rows:
+                    for node in self.fulltext(evaluate(name, row, params), evaluate(query, row, params)):
+                        columns = {'node': node, 'score': 1.0}
+                        new_rows.append({**row, **{variable: columns[column] for column, variable in yields.items()}})
+                rows = new_rows
+
+            elif kind == 'with':
+                rows, _ = self._project(rows, clause, params)
+
+            elif kind == 'return':
+                projected, aliases = self._project(rows, clause, params)
+                return [[row[alias] for alias in aliases] for row in projected], aliases
+
+            elif kind == 'create':
+                rows = [self._create(row, clause[1], params) for row in rows]
+
+            elif kind == 'merge':
+                _, pattern, on_create, on_match = clause
+                rows = [new_row for row in rows for new_row in self._merge(row, pattern, on_create, on_match, params)]
+
+            elif kind in ('set', 'remove'):
+                for row in rows:
+                    self._set(row, clause[1], params)
+
+            elif kind == 'delete':
+                _, expressions, detach = clause
+                for row in rows:
+                    for expression in expressions:
+                        entity = evaluate(expression, row, params)
+                        if entity is not None:
+                            self.delete(entity, detach=detach)
+
+        return [], []
+
+    # -------------------------------------------------------------
+    # PATTERN MATCHING
+    # -------------------------------------------------------------
+    @staticmethod
+    def _pattern_variables(patterns: List[tuple]) -> List[str]:
+        variables = []
+        for nodes, relationships in patterns:
+            variables.extend(variable for variable, *_ in nodes if variable)
+            variables.extend(variable for variable, *_ in relationships if variable)
+
+        return variables
+
+    @staticmethod
+    def _has_properties(entity: Union[MemoryNode, MemoryRelationship], properties: Dict[str, Any]) -> bool:
+        for key, value in properties.items():
+            if value is None or entity.properties.get(key) != value:
+                return False
+
+        return True
+
+    def _node_candidates(self, row: Dict[str, Any], pattern: tuple, params: Dict[str, Any]) -> Iterable[MemoryNode]:
+        variable, labels, properties = pattern
+        properties = evaluate(properties, row, params) if properties else {}
+
+        if variable in row:
+            node = row[variable]
+            candidates = [] if node is None else [node]
+
+        elif labels and properties:
+            key = next(iter(properties))
+            candidates = self._lookup(labels[0], key, properties[key])
+
+        elif labels:
+            candidates = list(self._labels.get(labels[0], {}).values())
+
+        else:
+            candidates = list(self._nodes.values())
+
+        return [node for node in candidates
+                if all(label in node.labels for label in labels) and self._has_properties(node, properties)]
+
+    def _neighbours(self,
+                    node: MemoryNode,
+                    direction: int) -> Iterator[Tuple[MemoryRelationship, MemoryNode]]:
+        if direction >= 0:
+            for relationship in self._outgoing[node.id].values():
+                yield relationship, relationship.end_node
+
+        if direction <= 0:
+            for relationship in self._incoming[node.id].values():
+                yield relationship, relationship.start_node
+
+    def _walk(self,
+              row: Dict[str, Any],
+              node: MemoryNode,
+              pattern: tuple,
+              i: int,
+              params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        nodes, relationships = pattern
+        if i == len(relationships):
+            yield row
+            return
+
+        variable, types, properties, direction = relationships[i]
+        properties = evaluate(properties, row, params) if properties else {}
+
+        node_variable, labels, node_properties = nodes[i + 1]
+        node_properties = evaluate(node_properties, row, params) if node_properties else {}
+
+        for relationship, other in self._neighbours(node, direction):
+            if types and relationship.type not in types:
+                continue
+
+            if variable in row and row[variable] is not relationship:
+                continue
+
+            if node_variable in row and row[node_variable] is not other:
+                continue
+
+            if not self._has_properties(relationship, properties):
+                continue
+
+            if not all(label in other.labels for label in labels) or not self._has_properties(other, node_properties):
+                continue
+
+            new_row = dict(row)
+            if variable:
+                new_row[variable] = relationship
+            if node_variable:
+                new_row[node_variable] = other
+
+            yield from self._walk(new_row, other, pattern, i + 1, params)
+
+    def _match_pattern(self, row: Dict[str, Any], pattern: tuple, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        nodes, _ = pattern
+        variable = nodes[0][0]
+
+        for node in self._node_candidates(row, nodes[0], params):
+            new_row = row
+            if variable and variable not in row:
+                new_row = {**row, variable: node}
+
+            yield from self._walk(new_row, node, pattern, 0, params)
+
+    def _match_patterns(self,
+                        row: Dict[str, Any],
+                        patterns: List[tuple],
+                        params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        if not patterns:
+            yield row
+            return
+
+        for new_row in self._match_pattern(row, patterns[0], params):
+            yield from self._match_patterns(new_row, patterns[1:], params)
+
+    def _match(self,
+               row: Dict[str, Any],
+               patterns: List[tuple],
+               where: Union[None, tuple],
+               optional: bool,
+               params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        matches = [new_row for new_row in self._match_patterns(row, patterns, params)
+                   if where is None or evaluate(where, new_row, params) is True]
+
+        if matches or not optional:
+            return matches
+
+        # the new variables of an optional match are null if there are no matches
+        return [{**row, **{variable: None for variable in self._pattern_variables(patterns) if variable not in row}}]
+
+    # -------------------------------------------------------------
+    # WRITES
+    # -------------------------------------------------------------
+    def _create(self, row: Dict[str, Any], patterns: List[tuple], params: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(row)
+
+        for nodes, relationships in patterns:
+            pattern_nodes = []
+            for variable, labels, properties in nodes:
+                if variable in row:
+                    node = row[variable]
+                    if node is None:
+                        raise MemoryGraphError(f'Failed to create relationship, because {variable} is null')
+                else:
+                    properties = evaluate(properties, row, params) if properties else {}
+                    node = self.create_node(labels, properties)
+
+                    if variable:
+                        row[variable] = node
+
+                pattern_nodes.append(node)
+
+            for i, (variable, types, properties, direction) in enumerate(relationships):
+                if len(types) != 1:
+                    raise MemoryGraphError('A single relationship type must be specified for CREATE or MERGE')
+
+                start_node, end_node = pattern_nodes[i], pattern_nodes[i + 1]
+                if direction < 0:
+                    start_node, end_node = end_node, start_node
+
+                properties = evaluate(properties, row, params) if properties else {}
+                relationship = self.create_relationship(start_node, types[0], end_node, properties)
+
+                if variable:
+                    row[variable] = relationship
+
+        return row
+
+    def _merge(self,
+               row: Dict[str, Any],
+               pattern: tuple,
+               on_create: List[tuple],
+               on_match: List[tuple],
+               params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        matches = list(self._match_pattern(row, pattern, params))
+
+        if not matches:
+            new_row = self._create(row, [pattern], params)
+            self._set(new_row, on_create, params)
+            return [new_row]
+
+        for new_row in matches:
+            self._set(new_row, on_match, params)
+
+        return matches
+
+    def _set(self, row: Dict[str, Any], items: List[tuple], params: Dict[str, Any]):
+        for item in items:
+            kind, variable = item[0], item[1]
+
+            entity = row.get(variable)
+            if entity is None:
+                continue
+
+            if kind == 'property':
+                self.update(entity, {item[2]: evaluate(item[3], row, params)})
+
+            elif kind in ('replace', 'merge'):
+                properties = evaluate(item[2], row, params)
+                if isinstance(properties, (MemoryNode, MemoryRelationship)):
+                    properties = dict(properties.items())
+
+                self.update(entity, properties or {}, replace=kind == 'replace')
+
+            elif kind == 'labels':
+                self.set_labels(entity, item[2])
+
+            elif kind == 'remove_labels':
+                self.set_labels(entity, item[2], remove=True)
+
+    # -------------------------------------------------------------
+    # PROJECTIONS
+    # -------------------------------------------------------------
+    def _project(self,
+                 rows: List[Dict[str, Any]],
+                 clause: tuple,
+                 params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        _, items, distinct, order, skip, limit = clause
+        aliases = [alias for _, alias in items]
+
+        if any(_is_aggregate(expression) for expression, _ in items):
+            projected = self._group(rows, items, params)
+            scopes = projected
+
+        else:
+            projected = [{alias: evaluate(expression, row, params) for expression, alias in items} for row in rows]
+
+            if distinct:
+                projected = _distinct(projected)
+                scopes = projected
+            else:
+                # the sorting items can refer to the variables preceding the projection
+                scopes = [{**row, **values} for row, values in zip(rows, projected)]
+
+        positions = list(range(len(projected)))
+        for expression, descending in reversed(order):
+            keys = [_sort_key(evaluate(expression, scope, params)) for scope in scopes]
+            positions.sort(key=keys.__getitem__, reverse=descending)
+
+        start = evaluate(skip, {}, params) if skip is not None else 0
+        stop = start + evaluate(limit, {}, params) if limit is not None else None
+
+        return [projected[position] for position in positions[start:stop]], aliases
+
+    @staticmethod
+    def _group(rows: List[Dict[str, Any]], items: List[tuple], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        keys = [(expression, alias) for expression, alias in items if not _is_aggregate(expression)]
+        aggregates = [(expression, alias) for expression, alias in items if _is_aggregate(expression)]
+
+        groups = {}
+        for row in rows:
+            key_values = {alias: evaluate(expression, row, params) for expression, alias in keys}
+
+            group_key = _freeze(list(key_values.values()))
+            if group_key not in groups:
+                groups[group_key] = (key_values, [[] for _ in aggregates])
+
+            for (expression, _), values in zip(aggregates, groups[group_key][1]):
+                if expression[0] == 'count_all':
+                    values.append(True)
+                else:
+                    values.append(evaluate(expression[2][0], row, params))
+
+        # aggregations without grouping keys return a single row even if there are no rows
+        if not groups and not keys:
+            groups[()] = ({}, [[] for _ in aggregates])
+
+        projected = []
+        for key_values, aggregate_values in groups.values():
+            values = dict(key_values)
+            for (expression, alias), aggregate_value in zip(aggregates, aggregate_values):
+                values[alias] = _aggregate(expression, aggregate_value)
+
+            projected.append({alias: values[alias] for _, alias in items})
+
+        return projected
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_memory_graph() -> MemoryGraph:
+    """
+    It returns the in-memory graph of the memory backend, which is shared by all threads
+    """
+    global _graph
+
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = MemoryGraph()
+
+    return _graph
@@ -1,6 +1,7 @@
-from typing import List, Type, Union
+from threading import Lock
+from typing import List, Type, Union, Dict, Tuple
 
-from .field import NodeField, NodeRelationshipField, NodeLinkField, DefaultField
+from .field import NodeRelationshipField, NodeLinkField
 
 
 class NeoNodeMeta(type):
@@ -10,57 +11,47 @@ class NeoNodeMeta(type):
     according to the requested fields, targets and relationships.
     NeoNode classes can then be used to hold nodes' properties, nodes' properties and connected nodes' properties, and
     nodes' properties, connected nodes' properties and connected relationships' properties
+
+    NeoNode classes are built with __slots__, so that NeoNode instances do not carry an instance dict.
+    Nodes' properties are stored directly in the slots,
+    whereas connected nodes and relationships are stored in private slots managed by data descriptors.
     """
     def __new__(mcs,
                 name,
                 bases,
                 namespace,
-                fields: List[str] = None,
-                target: str = None,
-                target_fields: List[str] = None,
-                relationship_fields: List[str] = None):
-        # Creating the new NeoNode class
-        cls = super(NeoNodeMeta, mcs).__new__(mcs, name, bases, namespace)
-
-        # Adding NeoNode data descriptors based on the requested fields which can load the nodes' properties
-        if fields:
-            for field in fields:
-                setattr(cls, field, NodeField(field))
-            setattr(cls, 'fields_', DefaultField('fields_', fields))
-
-        if target:
-            # Creating the new target NeoNode class
-            target_cls = super(NeoNodeMeta, mcs).__new__(mcs, name, bases, namespace)
+                fields: Tuple[str, ...] = None,
+                targets: Dict[str, Type['NeoNode']] = None,
+                relationship: Type['NeoNode'] = None):
+        if not fields:
+            fields = ()
 
-            # Adding NeoNode data descriptors based on the requested target
-            # which can load the new target NeoNode instance
-            setattr(cls, target, NodeLinkField(target, target_cls))
-            setattr(cls, 'targets_', DefaultField('targets_', [target]))
+        if not targets:
+            targets = {}
 
-            # Creating the new relationship NeoNode class
-            relationship_cls = super(NeoNodeMeta, mcs).__new__(mcs, name, bases, namespace)
+        slots = tuple(fields) + tuple(f'_{target}' for target in targets)
+        if relationship is not None:
+            slots += ('_relationship_',)
 
-            # Adding NeoNode data descriptors to the target NeoNode class based on the requested relationship
-            # which can load the new relationship NeoNode instance
-            setattr(target_cls, 'relationship_', NodeRelationshipField('relationship_', relationship_cls))
+        namespace = dict(namespace)
+        namespace['__slots__'] = slots
+        namespace['fields_'] = tuple(fields)
+        namespace['targets_'] = tuple(targets)
 
-            # Adding NeoNode data descriptors to the target NeoNode class based on the requested target fields
-            # which can load the connected nodes' properties
-            if target_fields:
-
-                for field in target_fields:
-                    setattr(target_cls, field, NodeField(field))
-
-                setattr(target_cls, 'fields_', DefaultField('fields_', target_fields))
-
-            # Adding NeoNode data descriptors to the relationship NeoNode class
-            # based on the requested relationship fields which can load the connected relationship' properties
-            if relationship_fields:
+        # Creating the new NeoNode class
+        cls = super(NeoNodeMeta, mcs).__new__(mcs, name, bases, namespace)
 
-                for field in relationship_fields:
-                    setattr(relationship_cls, field, NodeField(field))
+        # Adding NeoNode data descriptors based on the requested targets
+        # which can load the new target NeoNode instances
+        for target, target_cls in targets.items():
+            setattr(cls, target, NodeLinkField(target, target_cls, cls.__dict__[f'_{target}']))
 
-                setattr(relationship_cls, 'fields_', DefaultField('fields_', relationship_fields))
+        # Adding NeoNode data descriptors based on the requested relationship
+        # which can load the new relationship NeoNode instance
+        if relationship is not None:
+            setattr(cls, 'relationship_', NodeRelationshipField('relationship_',
+                                                                relationship,
+                                                                cls.__dict__['_relationship_']))
 
         return cls
 
@@ -69,17 +60,21 @@ class NeoNodeMeta(type):
 
 
 class NeoNode:
+    __slots__ = ()
+
+    fields_ = ()
+    targets_ = ()
 
     def __init__(self, **kwargs):
         """
         The NeoNode object is generated dynamically by the NeoNodeMeta metaclass.
         Hence, NeoNode classes can actually be very different from each other, as these are tailor-made NeoNode classes.
 
-        A NeoNode instance uses the data-descriptors added to the NeoNode class upon class generation in the metaclass.
-        Hence, NeoNode instances have different attributes from each other.
+        A NeoNode instance uses the slots and data-descriptors added to the NeoNode class upon class generation
+        in the metaclass. Hence, NeoNode instances have different attributes from each other.
 
         A NeoNode can be instantiated with a dictionary of attribute name to attribute value pairs.
-        These attributes will be dynamically loaded into the NeoNode instance using the data descriptors
+        These attributes will be dynamically loaded into the NeoNode instance using the slots and data descriptors
 
         :param kwargs: A dictionary of attribute name and attribute value pairs
         """
@@ -87,7 +82,7 @@ class NeoNode:
             setattr(self, attr, kwarg)
 
     def __str__(self):
-        if hasattr(self, 'fields_'):
+        if self.fields_:
             fields = ', '.join(f'{field}: {getattr(self, field)}' for field in self.fields_)
             return f'{{{fields}}}'
 
@@ -97,39 +92,99 @@ class NeoNode:
         return self.__str__()
 
     def __getattr__(self, item):
+        # fields that were not loaded into the slots default to None
+        if item in self.fields_:
+            return None
+
         raise AttributeError(f'{item} attribute not found in NeoNode')
 
     def add(self, other):
         """
         NeoNode instances can be merged/concatenated with other NeoNodes.
         Fields, targets and relationships available in the other NeoNode instance
-        but not present in this NeoNode instance will be loaded into this instance.
+        but not present in this NeoNode instance will be loaded into the merged instance.
 
-        Note that, this method does not yield a new NeoNode instance.
+        Note that, this method yields a new NeoNode instance of the merged NeoNode class,
+        unless the other NeoNode instance does not add any field or target to this NeoNode instance.
 
         :param other: Other NeoNode instance
-        :return: This NeoNode instance
+        :return: The merged NeoNode instance
         """
-        if hasattr(self, 'fields_') and hasattr(other, 'fields_'):
+        cls = _merge_node_classes(type(self), type(other))
+        if cls is type(self):
+            return self
+
+        self_slots = set(type(self).__slots__)
+
+        node = cls.__new__(cls)
+        for slot in cls.__slots__:
+            source = self if slot in self_slots else other
+
+            try:
+                value = object.__getattribute__(source, slot)
+            except AttributeError:
+                continue
+
+            object.__setattr__(node, slot, value)
+
+        return node
+
 
-            for field in other.fields_:
-                if field not in self.fields_:
-                    value = getattr(other, field)
-                    setattr(self, field, value)
-                    self.fields_.append(field)
+# -----------------------------------------------
+# NeoNode CLASSES REGISTRY
+# -----------------------------------------------
+# NeoNode classes are interned by signature, so that the same class is shared across query sets and requests
+_NODE_CLASSES: Dict[tuple, Type[NeoNode]] = {}
+_NODE_CLASSES_LOCK = Lock()
 
-        if hasattr(other, 'targets_'):
 
-            if not hasattr(self, 'targets_'):
-                setattr(self, 'targets_', [])
+def _freeze(fields: List[str] = None) -> Tuple[str, ...]:
+    if not fields:
+        return ()
 
-            for target in other.targets_:
-                if target not in self.targets_:
-                    value = getattr(other, target)
-                    setattr(self, target, value)
-                    self.targets_.append(target)
+    # removing duplicated fields while keeping the order
+    return tuple(dict.fromkeys(fields))
 
-        return self
+
+def _node_class(fields: Tuple[str, ...] = (),
+                targets: Tuple[Tuple[str, Type[NeoNode]], ...] = (),
+                relationship: Type[NeoNode] = None) -> Union[type, Type[NeoNode]]:
+    signature = (fields, targets, relationship)
+
+    cls = _NODE_CLASSES.get(signature)
+    if cls is not None:
+        return cls
+
+    with _NODE_CLASSES_LOCK:
+        cls = _NODE_CLASSES.get(signature)
+        if cls is None:
+            cls = NeoNodeMeta(name='Node',
+                              bases=(NeoNode,),
+                              namespace={},
+                              fields=fields,
+                              targets=dict(targets),
+                              relationship=relationship)
+            _NODE_CLASSES[signature] = cls
+
+    return cls
+
+
+def _merge_node_classes(cls: Type[NeoNode], other: Type[NeoNode]) -> Union[type, Type[NeoNode]]:
+    if cls is other:
+        return cls
+
+    fields = cls.fields_ + tuple(field for field in other.fields_ if field not in cls.fields_)
+
+    targets = {target: getattr(cls, target).target_cls for target in cls.targets_}
+    for target in other.targets_:
+        if target not in targets:
+            targets[target] = getattr(other, target).target_cls
+
+    relationship = getattr(cls, 'relationship_', None) or getattr(other, 'relationship_', None)
+    if relationship is not None:
+        relationship = relationship.relationship_cls
+
+    return _node_class(fields=fields, targets=tuple(targets.items()), relationship=relationship)
 
 
 def node_factory(fields: List[str] = None,
@@ -156,14 +211,17 @@ def node_factory(fields: List[str] = None,
     :param relationship_fields: A list of fields that will be used to fetch the connected relationships' properties
     and load them into a NeoNode instances
 
-    :return: It returns a new NeoNode class
+    :return: It returns a NeoNode class. NeoNode classes are interned, so the same requested fields, target,
+    target fields and relationship fields always yield the same NeoNode class
     """
 
-    cls = NeoNodeMeta(name='Node',
-                      bases=(NeoNode, ),
-                      namespace={},
-                      fields=fields,
-                      target=target,
-                      target_fields=target_fields,
-                      relationship_fields=relationship_fields)
-    return cls
+    if not target:
+        return _node_class(fields=_freeze(fields))
+
+    # Creating the new relationship NeoNode class which can load the connected relationship' properties
+    relationship_cls = _node_class(fields=_freeze(relationship_fields))
+
+    # Creating the new target NeoNode class which can load the connected nodes' properties and the relationship
+    target_cls = _node_class(fields=_freeze(target_fields), relationship=relationship_cls)
+
+    return _node_class(fields=_freeze(fields), targets=((target, target_cls),))
@@ -1,40 +1,715 @@
-from typing import List, Tuple
+import re
+import time
+from contextlib import nullcontext, contextmanager
+from threading import Lock
+from typing import List, Tuple, Dict, Any, Iterator, Iterable, Union, Callable
 
-from neomodel import db
+from django.conf import settings
+from neo4j import READ_ACCESS
+from neomodel import db, config
 
+from .cache import get_query_cache, is_read_query, query_labels, invalidate_labels
+from .instrumentation import record_query
+from .memory import MemoryGraph, get_memory_graph
+from .recording import QueryReplayer, get_query_recorder, get_query_replayer
 
-def cypher_closure(operator, quotation=False, takes_operand=True, case_insensitive=False):
 
-    def wrapper(left_operand=None, right_operand=None):
+def cypher_closure(operator, takes_operand=True, transformer=None):
+
+    def wrapper(left_operand=None, right_operand=None, parameter=None) -> Tuple[str, Dict[str, Any]]:
         if not takes_operand:
-            return f"{left_operand} {operator}"
+            return f"{left_operand} {operator}", {}
+
+        if transformer is not None:
+            right_operand = transformer(right_operand)
+
+        return f"{left_operand} {operator} ${parameter}", {parameter: right_operand}
+
+    return wrapper
+
 
-        if quotation:
-            if case_insensitive:
-                return f"{left_operand} {operator} '(?i).*{right_operand}.*'"
+def factor(value: Any) -> str:
+    # the same transformation applied to the *_factor properties upon validation
+    return str(value).lower().rstrip().lstrip()
 
-            return f"{left_operand} {operator} '{right_operand}'"
 
-        return f"{left_operand} {operator} {right_operand}"
+def lower_closure(operator, transformer=None):
+
+    def wrapper(left_operand=None, right_operand=None, parameter=None) -> Tuple[str, Dict[str, Any]]:
+        if transformer is not None:
+            right_operand = transformer(right_operand)
+
+        return f"toLower(toString({left_operand})) {operator} ${parameter}", {parameter: right_operand}
 
     return wrapper
 
 
-CYPHER_OPERATORS = {'exact': cypher_closure(operator='=', quotation=True),
-                    'ne': cypher_closure(operator='!=', quotation=True),
+# The contains and icontains lookups are case-insensitive.
+# Query sets rewrite them to the factor_contains lookup of the *_factor property if the node has one,
+# as the *_factor properties are lower-cased and indexed, so that CONTAINS can be served by the index.
+# Otherwise, CONTAINS is evaluated on the lower-cased property.
+CYPHER_OPERATORS = {'exact': cypher_closure(operator='='),
+                    'ne': cypher_closure(operator='<>'),
                     'lt': cypher_closure(operator='<'),
                     'gt': cypher_closure(operator='>'),
                     'lte': cypher_closure(operator='<='),
                     'gte': cypher_closure(operator='>='),
-                    'in': cypher_closure(operator='in'),
+                    'in': cypher_closure(operator='IN', transformer=list),
                     'isnull': cypher_closure(operator='IS NULL', takes_operand=False),
-                    'contains': cypher_closure(operator='=~', quotation=True, case_insensitive=True),
-                    'startswith': cypher_closure(operator='STARTS WITH', quotation=True),
-                    'endswith': cypher_closure(operator='ENDS WITH', quotation=True)}
+                    'contains': lower_closure(operator='CONTAINS', transformer=factor),
+                    'icontains': lower_closure(operator='CONTAINS', transformer=factor),
+                    'factor_contains': cypher_closure(operator='CONTAINS', transformer=factor),
+                    'startswith': cypher_closure(operator='STARTS WITH', transformer=str),
+                    'endswith': cypher_closure(operator='ENDS WITH', transformer=str)}
+
+CASE_INSENSITIVE_OPERATORS = ('contains', 'icontains')
+
+_FULLTEXT_SPECIAL_CHARACTERS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def search_index_name(label: str) -> str:
+    """
+    The name of the full-text index of a node label, which is used by the search lookup
+    """
+    return f'{label.lower()}_search'
+
+
+_FULLTEXT_INDEXES_TTL = 60
+_fulltext_indexes: Dict[str, Any] = {'expires': 0.0, 'names': frozenset()}
+_fulltext_indexes_lock = Lock()
+
+
+def fulltext_index_exists(name: str) -> bool:
+    """
+    It returns whether the full-text index exists in the database, so that searches can fall back to contains
+    lookups if the index was not created yet (see the protrend_indexes command).
+    The index names are kept for a minute, so that SHOW INDEXES is not run per search.
+    The in-memory graph serves any full-text lookup.
+    """
+    if is_memory_backend():
+        return True
+
+    with _fulltext_indexes_lock:
+        if _fulltext_indexes['expires'] < time.monotonic():
+            results, meta = query_db('SHOW INDEXES', cache=False, origin='fulltext_index_exists')
+            rows = [dict(zip(meta, row)) for row in results]
+
+            _fulltext_indexes['names'] = frozenset(row.get('name') for row in rows
+                                                   if str(row.get('type', '')).upper() == 'FULLTEXT')
+            _fulltext_indexes['expires'] = time.monotonic() + _FULLTEXT_INDEXES_TTL
+
+        return name in _fulltext_indexes['names']
+
+
+def fulltext_query(value: Any) -> str:
+    """
+    It builds a full-text (lucene) query that matches nodes having all terms of the value as word prefixes
+    """
+    terms = [_FULLTEXT_SPECIAL_CHARACTERS.sub(r'\\\1', term) for term in str(value).split()]
+    return ' AND '.join(f'{term}*' for term in terms)
+
+
+# -----------------------------------------------
+# CYPHER QUERY TREE
+# -----------------------------------------------
+class Clause:
+    """
+    A node of the cypher query tree. Each clause compiles to a cypher string or to an empty string if it is void.
+    """
+
+    def compile(self) -> str:
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.compile()
+
+
+class RawClause(Clause):
+
+    def __init__(self, clause: str = ''):
+        self.clause = clause
+
+    def compile(self) -> str:
+        return self.clause
+
+
+class MatchClause(Clause):
+
+    def __init__(self, pattern: str, optional: bool = False):
+        self.pattern = pattern
+        self.optional = optional
+
+    def compile(self) -> str:
+        if self.optional:
+            return f'OPTIONAL MATCH {self.pattern}'
+
+        return f'MATCH {self.pattern}'
+
+
+class WhereClause(Clause):
+
+    def __init__(self, conditions: List[str] = None):
+        self.conditions = conditions or []
+
+    def compile(self) -> str:
+        if not self.conditions:
+            return ''
+
+        return f'WHERE {" AND ".join(self.conditions)}'
+
+
+class OrderClause(Clause):
+
+    def __init__(self, items: List[str] = None):
+        self.items = items or []
+
+    def compile(self) -> str:
+        if not self.items:
+            return ''
+
+        return f'ORDER BY {", ".join(self.items)}'
+
+
+class PageClause(Clause):
+
+    def __init__(self, skip: bool = False, limit: bool = False):
+        self.skip = skip
+        self.limit = limit
+
+    def compile(self) -> str:
+        clauses = []
+        if self.skip:
+            clauses.append('SKIP $skip')
+
+        if self.limit:
+            clauses.append('LIMIT $limit')
+
+        return ' '.join(clauses)
+
+
+class ProjectionClause(Clause):
+
+    def __init__(self,
+                 keyword: str,
+                 projection: str,
+                 order: OrderClause = None,
+                 page: PageClause = None):
+        self.keyword = keyword
+        self.projection = projection
+        self.order = order or OrderClause()
+        self.page = page or PageClause()
+
+    def compile(self) -> str:
+        return ' '.join(clause for clause in (f'{self.keyword} {self.projection}',
+                                              self.order.compile(),
+                                              self.page.compile()) if clause)
+
+
+class Aggregate:
+    function = ''
+
+    def __init__(self, field: str = None, distinct: bool = False):
+        """
+        An aggregation function of a query set field computed by Neo4j (see NeoQuerySet.aggregate and annotate).
+        The field can be a source node property (e.g. name), a linked target (e.g. gene)
+        or a property of a linked target (e.g. gene__locus_tag).
+
+        :param field: The field to be aggregated
+        :param distinct: Whether only distinct values are aggregated
+        """
+        self.field = field
+        self.distinct = distinct
+
+    def compile(self, expression: str) -> str:
+        if self.distinct:
+            expression = f'DISTINCT {expression}'
+
+        return f'{self.function}({expression})'
+
+
+class Count(Aggregate):
+    function = 'count'
+
+    def compile(self, expression: str = None) -> str:
+        if expression is None:
+            return 'count(*)'
+
+        return super().compile(expression)
+
+
+class Collect(Aggregate):
+    function = 'collect'
+
+
+class Min(Aggregate):
+    function = 'min'
+
+
+class Max(Aggregate):
+    function = 'max'
+
+
+class Sum(Aggregate):
+    function = 'sum'
+
+
+class Avg(Aggregate):
+    function = 'avg'
+
+
+class CypherQuery(Clause):
+
+    def __init__(self, clauses: List[Clause] = None):
+        self.clauses = clauses or []
+
+    def compile(self) -> str:
+        return ' '.join(clause for clause in (clause.compile() for clause in self.clauses) if clause)
+
+
+class QueryBuilder:
+
+    def __init__(self):
+        """
+        The QueryBuilder accumulates the filters, sorting and paging requested to a query set,
+        so that chained calls can be composed lazily and compiled into a single cypher query only when data is needed.
+
+        Paging is applied to the source nodes before matching the connected nodes,
+        so that a page always holds the requested number of source nodes.
+        """
+        self.conditions: List[str] = []
+        self.params: Dict[str, Any] = {}
+        self.order: List[str] = []
+        self.skip: Union[None, int] = None
+        self.limit: Union[None, int] = None
+        self.search_index: Union[None, str] = None
+        self.unwind_key: Union[None, str] = None
+
+    def copy(self) -> 'QueryBuilder':
+        builder = self.__class__()
+        builder.search_index = self.search_index
+        builder.unwind_key = self.unwind_key
+        builder.conditions = list(self.conditions)
+        builder.params = dict(self.params)
+        builder.order = list(self.order)
+        builder.skip = self.skip
+        builder.limit = self.limit
+        return builder
+
+    def parameter(self, name: str, reserved: Iterable[str] = ()) -> str:
+        """
+        It returns a parameter name that is not taken yet by the builder parameters
+        """
+        reserved = set(reserved)
+
+        parameter = name
+        i = 1
+        while parameter in self.params or parameter in reserved:
+            parameter = f'{name}_{i}'
+            i += 1
+
+        return parameter
+
+    def where(self, conditions: List[str], params: Dict[str, Any]) -> 'QueryBuilder':
+        self.conditions.extend(conditions)
+        self.params.update(params)
+        return self
+
+    def search(self, index: str, value: Any) -> 'QueryBuilder':
+        """
+        The source nodes are looked up in the full-text index rather than matched by label
+        """
+        self.search_index = index
+        self.params['search_index'] = index
+        self.params['search'] = fulltext_query(value)
+        return self
+
+    def unwind(self, values: Iterable[Any], key: str = 'protrend_id') -> 'QueryBuilder':
+        """
+        The source nodes are matched by the key property for each value of the list,
+        so that a node lookup per value is resolved in a single query using the key index
+        """
+        self.unwind_key = key
+        # repeated values would match the same node more than once
+        self.params['ids'] = list(dict.fromkeys(values))
+        return self
+
+    def order_by(self, items: List[str]) -> 'QueryBuilder':
+        self.order = list(items)
+        return self
+
+    def slice(self, skip: int = None, limit: int = None) -> 'QueryBuilder':
+        # slicing a sliced query narrows the previous page
+        if skip:
+            self.skip = (self.skip or 0) + int(skip)
+
+            if self.limit is not None:
+                self.limit = max(self.limit - int(skip), 0)
+
+        if limit is not None:
+            limit = int(limit)
+            self.limit = limit if self.limit is None else min(self.limit, limit)
+
+        return self
+
+    @property
+    def query_params(self) -> Dict[str, Any]:
+        params = dict(self.params)
+
+        if self.skip:
+            params['skip'] = self.skip
+
+        if self.limit is not None:
+            params['limit'] = self.limit
+
+        return params
+
+    def _source_clauses(self, source_clause: str, source_variable: str, source_label: str = None) -> List[Clause]:
+        if self.search_index is None and self.unwind_key is None:
+            return [MatchClause(source_clause), WhereClause(self.conditions)]
+
+        if self.search_index is None:
+            return [RawClause('UNWIND $ids AS id'),
+                    MatchClause(f'({source_variable}:{source_label} {{{self.unwind_key}: id}})'),
+                    WhereClause(self.conditions)]
+
+        conditions = [f'{source_variable}:{source_label}'] + self.conditions
+        if self.unwind_key is not None:
+            conditions.append(f'{source_variable}.{self.unwind_key} IN $ids')
+        return [RawClause(f'CALL db.index.fulltext.queryNodes($search_index, $search) '
+                          f'YIELD node AS {source_variable}'),
+                WhereClause(conditions)]
+
+    def build_count(self,
+                    source_clause: str,
+                    source_variable: str,
+                    count_clause: str,
+                    source_label: str = None) -> CypherQuery:
+        clauses = self._source_clauses(source_clause, source_variable, source_label)
+        clauses.append(ProjectionClause('RETURN', count_clause))
+        return CypherQuery(clauses)
+
+    def build_aggregate(self,
+                        source_clause: str,
+                        source_variable: str,
+                        return_clause: str,
+                        link_clause: str = '',
+                        source_label: str = None) -> CypherQuery:
+        """
+        It builds the cypher query tree of an aggregation.
+        Aggregations are computed over the page of source nodes, if any, and their connected nodes.
+        """
+        clauses = self._source_clauses(source_clause, source_variable, source_label)
+
+        page = PageClause(skip=bool(self.skip), limit=self.limit is not None)
+        if page.compile():
+            clauses.append(ProjectionClause('WITH', source_variable, OrderClause(self.order), page))
+
+        clauses.append(RawClause(link_clause))
+        clauses.append(ProjectionClause('RETURN', return_clause))
+        return CypherQuery(clauses)
+
+    def build(self,
+              source_clause: str,
+              source_variable: str,
+              return_clause: str,
+              link_clause: str = '',
+              tie_breaker: str = None,
+              source_label: str = None) -> CypherQuery:
+        """
+        It builds the cypher query tree.
+
+        :param source_clause: The source node pattern
+        :param source_variable: The source node variable
+        :param return_clause: The projection of the return clause
+        :param link_clause: The clauses matching the connected nodes, if any
+        :param tie_breaker: An additional sorting item of the returned rows that keeps the rows of each source
+        node contiguous, if any
+        :param source_label: The source node label, which is required by full-text searches
+        :return: The cypher query tree
+        """
+        page = PageClause(skip=bool(self.skip), limit=self.limit is not None)
+
+        order = list(self.order)
+        return_order = list(order)
+        if tie_breaker and tie_breaker not in return_order:
+            return_order.append(tie_breaker)
+
+        clauses = self._source_clauses(source_clause, source_variable, source_label)
+
+        if not link_clause:
+            clauses.append(ProjectionClause('RETURN', return_clause, OrderClause(return_order), page))
+            return CypherQuery(clauses)
+
+        # the source nodes are paged before matching the connected nodes
+        if page.compile():
+            clauses.append(ProjectionClause('WITH', source_variable, OrderClause(order), page))
+
+        clauses.append(RawClause(link_clause))
+        clauses.append(ProjectionClause('RETURN', return_clause, OrderClause(return_order)))
+        return CypherQuery(clauses)
+
+
+def is_memory_backend() -> bool:
+    return getattr(settings, 'PROTREND_DB_BACKEND', 'neo4j') == 'memory'
+
+
+def get_backend() -> Union[MemoryGraph, QueryReplayer, 'DriverBackend', Any]:
+    """
+    It returns the object running the cypher queries according to the PROTREND_DB_BACKEND setting:
+    the neomodel connection (neo4j) or the in-memory property graph (memory).
+    If the PROTREND_QUERY_DRIVER option is enabled, the read queries to neo4j are run by the neo4j driver directly
+    (see DriverBackend).
+    The recorded query results are served instead while replaying queries (see domain.neo.recording)
+    """
+    replayer = get_query_replayer()
+    if replayer is not None:
+        return replayer
+
+    if is_memory_backend():
+        return get_memory_graph()
+
+    options = getattr(settings, 'PROTREND_QUERY_DRIVER', {})
+    if options.get('ENABLED', False):
+        return DriverBackend(fetch_size=options.get('FETCH_SIZE', 1000))
+
+    return db
+
+
+def query_db(query: str,
+             params: Dict[str, Any] = None,
+             cache: bool = True,
+             origin: str = None) -> Tuple[List[str], List[str]]:
+    """
+    It runs the cypher query in the database backend (see get_backend).
+    The results of read queries are served from the query cache if it is enabled,
+    whereas write queries always invalidate the cached queries of the labels they match.
+
+    The wall time and number of rows of every query are recorded in the query log of the current request.
+    The query and its results are also written to the fixture file of the recording session, if any.
+
+    :param query: The cypher query
+    :param params: The cypher query parameters
+    :param cache: Whether the results of a read query can be served from the query cache
+    :param origin: The name of the query set class or function that issued the query
+    :return: The result rows and the result keys
+    """
+    start = time.perf_counter()
+
+    backend = get_backend()
+    query_cache = get_query_cache()
+
+    cached = False
+
+    if query_cache is None:
+        results = backend.cypher_query(query, params)
+
+    elif not is_read_query(query):
+        results = backend.cypher_query(query, params)
+        query_cache.invalidate(*query_labels(query))
+
+    elif not cache:
+        results = backend.cypher_query(query, params)
+
+    else:
+        key = query_cache.make_key(query, params)
+        results = query_cache.get(key)
+        cached = results is not None
+
+        if not cached:
+            results = backend.cypher_query(query, params)
+            query_cache.set(key, results)
+
+    record_query(query, params, start=start, rows=len(results[0]), origin=origin, cached=cached)
+
+    # cached results are recorded as well, so that the fixture holds every query of the session
+    recorder = get_query_recorder()
+    if recorder is not None:
+        recorder.record(query, params, results)
+
+    return results
+
+
+_driver = None
+
+
+def get_driver():
+    """
+    It returns the neo4j driver of the neomodel connection.
+    The neomodel database object is thread-local, so the driver is kept at the module level
+    to share a single connection pool across threads.
+    """
+    global _driver
+
+    if _driver is None:
+        if getattr(db, 'driver', None) is None:
+            db.set_connection(config.DATABASE_URL)
+
+        _driver = db.driver
+
+    return _driver
+
+
+def in_transaction() -> bool:
+    """
+    It returns whether the calling thread runs an explicit neomodel transaction,
+    which is not visible to queries issued by other threads
+    """
+    return getattr(db, '_active_transaction', None) is not None
+
+
+def connection_initializer() -> Callable[[], None]:
+    """
+    It returns an initializer of worker threads (or green threads) that shares the neomodel connection
+    of the calling thread. The neomodel database object is thread-local,
+    so that worker threads would otherwise open a new driver with its own connection pool.
+    """
+    if is_memory_backend():
+        # the in-memory graph is shared by all threads
+        return lambda: None
+
+    driver = get_driver()
+    url = getattr(db, 'url', None) or config.DATABASE_URL
+
+    def initializer():
+        db.driver = driver
+        db.url = url
+
+    return initializer
+
+
+def get_session(**kwargs):
+    database = getattr(db, '_database_name', None)
+    if database:
+        kwargs['database'] = database
+
+    return get_driver().session(**kwargs)
+
+
+class DriverBackend:
+
+    def __init__(self, fetch_size: int = 1000):
+        """
+        The DriverBackend runs the read cypher queries with the neo4j driver directly,
+        rather than with the neomodel cypher_query, which wraps every record in neomodel's generic result handling.
+        Read queries run in read transactions of read-mode sessions, which are routed to the read replicas
+        of a cluster and retried by the driver upon transient errors.
+        The records are plain tuples, so the rows are copied straight into tuples.
+
+        Write queries and queries issued within an explicit neomodel transaction are run by neomodel,
+        so that the neomodel error handling and transaction semantics are kept.
+
+        :param fetch_size: The number of records pulled from the server per batch
+        """
+        self.fetch_size = fetch_size
+
+    def cypher_query(self, query: str, params: Dict[str, Any] = None, **kwargs) -> Tuple[List[tuple], List[str]]:
+        if kwargs or in_transaction() or not is_read_query(query):
+            return db.cypher_query(query, params, **kwargs)
+
+        def work(tx):
+            result = tx.run(query, params)
+            return [tuple(record) for record in result], list(result.keys())
+
+        with get_session(default_access_mode=READ_ACCESS, fetch_size=self.fetch_size) as session:
+            return session.read_transaction(work)
+
+
+@contextmanager
+def stream_db(query: str,
+              params: Dict[str, Any] = None,
+              fetch_size: int = 1000,
+              origin: str = None) -> Iterator[Tuple[Iterator[tuple], List[str]]]:
+    """
+    It runs the query in a new session and provides a lazy iterator over the result rows,
+    together with the result keys. The driver pulls the records from the server in batches of fetch_size,
+    so only a batch of records is held in memory at once.
+    The session is only open within the context, and thus the rows must be consumed within the context.
+
+    Usage:
+        with stream_db(query, params) as (rows, meta):
+            for row in rows:
+                ...
+
+    :param query: The cypher query
+    :param params: The cypher query parameters
+    :param fetch_size: The number of records pulled from the server per batch
+    :param origin: The name of the query set class or function that issued the query
+    :return: A context manager of a lazy iterator of rows and the result keys
+    """
+    start = time.perf_counter()
+
+    if get_query_recorder() is not None or get_query_replayer() is not None:
+        # the whole result is fetched, so that it is recorded or served from the fixture as a single query
+        results, meta = query_db(query, params, cache=False, origin=origin)
+        yield iter(results), meta
+        return
+
+    if is_memory_backend():
+        results, meta = get_memory_graph().cypher_query(query, params)
+        record_query(query, params, start=start, rows=len(results), origin=origin)
+        yield iter(results), meta
+        return
+
+    n_rows = 0
+
+    with get_session(fetch_size=fetch_size) as session:
+        result = session.run(query, params)
+
+        def rows():
+            nonlocal n_rows
+
+            for record in result:
+                n_rows += 1
+                yield tuple(record)
+
+        try:
+            yield rows(), list(result.keys())
+        finally:
+            record_query(query, params, start=start, rows=n_rows, origin=origin)
+
+
+def write_db(query: str, batches: Iterable[Dict[str, Any]], origin: str = None) -> int:
+    """
+    It runs a write query once per batch of parameters, each batch in its own explicit write transaction.
+    Write transactions are retried by the driver upon transient errors, such as deadlocks between concurrent writers,
+    so that a batch is either fully written or not written at all.
+    The cached queries of the labels matched by the query are invalidated afterwards.
+    Write queries are not run while replaying queries, as the replayed database is read-only.
+
+    :param query: The cypher query, which usually unwinds the rows parameter
+    :param batches: The cypher query parameters of each batch
+    :param origin: The name of the function that issued the query
+    :return: The number of rows written
+    """
+
+    def work(tx, params):
+        return tx.run(query, params).consume()
+
+    if get_query_replayer() is not None:
+        return sum(len(params.get('rows', ())) for params in batches)
+
+    # the in-memory graph has no transactions, so that each batch is run as a single query
+    graph = get_memory_graph() if is_memory_backend() else None
+
+    n_rows = 0
+    try:
+        with nullcontext() if graph is not None else get_session() as session:
+            for params in batches:
+                start = time.perf_counter()
+
+                if graph is not None:
+                    graph.cypher_query(query, params)
+                else:
+                    session.write_transaction(work, params)
+
+                rows = len(params.get('rows', ()))
+                record_query(query, params, start=start, rows=rows, origin=origin)
+                n_rows += rows
 
+    finally:
+        invalidate_labels(list(query_labels(query)))
 
-def query_db(query: str) -> Tuple[List[str], List[str]]:
-    return db.cypher_query(query)
+    return n_rows
 
 
 def parse_query_meta(meta, source_variable='', relationship_variable='', target_variable=''):
@@ -1,12 +1,48 @@
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from itertools import groupby
-from typing import Type, List, Union, Dict, Iterable
+from typing import Type, List, Union, Dict, Iterable, Any, Tuple, Iterator, Callable
 
+import pandas as pd
+from django.conf import settings
 from django_neomodel import DjangoNode
+from neomodel import StringProperty
 
 from set_list import SetList
+from .columns import column_dtype, rows_to_frame
 from .node import NeoNodeMeta, node_factory, NeoNode
-from .query import CYPHER_OPERATORS, parse_query_meta, query_db
+from .query import (CYPHER_OPERATORS, CASE_INSENSITIVE_OPERATORS, parse_query_meta, query_db, stream_db,
+                    search_index_name, fulltext_index_exists, connection_initializer, in_transaction, QueryBuilder,
+                    CypherQuery, Aggregate, Count)
+
+
+def get_target_class(source: Type[DjangoNode], target: str) -> Type[DjangoNode]:
+    relationship = getattr(source, target)
+
+    if 'node_class' not in relationship.definition:
+        # noinspection PyProtectedMember
+        relationship._lookup_node_class()
+
+    return relationship.definition['node_class']
+
+
+def get_target_label(source: Type[DjangoNode], target: str) -> str:
+    return get_target_class(source, target).__label__
+
+
+# the pattern arrows of the neomodel relationship directions (INCOMING, EITHER and OUTGOING)
+_DIRECTIONS = {-1: ('<-', '-'), 0: ('-', '-'), 1: ('-', '->')}
+
+
+def get_relationship_pattern(source: Type[DjangoNode], target: str, variable: str = '') -> str:
+    """
+    It returns the relationship pattern of a relationship attribute of the model type, such as -[:HAS]->.
+    The relationship type and direction are read from the relationship definition (RelationshipTo or RelationshipFrom),
+    so that Neo4j only expands the relationships of that type rather than all relationships of the source node.
+    """
+    definition = getattr(source, target).definition
+    left, right = _DIRECTIONS[definition['direction']]
+    return f'{left}[{variable}:{definition["relation_type"]}]{right}'
 
 
 class NeoQuerySet:
@@ -21,21 +57,20 @@ class NeoQuerySet:
 
         self.source = source
         self.fields = fields
-        self.limit = 1
-        self.skip = 0
         self._data = []
-        self._query = ''
+        self._builder = QueryBuilder()
+        self._values: List[str] = []
 
     # -------------------------------------------------------------
     # BASE DYNAMIC PROPERTIES
     # -------------------------------------------------------------
     @property
-    def query(self):
-        if self._query:
-            return self._query
+    def query(self) -> str:
+        return self._build().compile()
 
-        self.all()
-        return self._query
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self._builder.query_params
 
     @property
     def data(self) -> List[NeoNode]:
@@ -45,7 +80,6 @@ class NeoQuerySet:
         return self.fetch()
 
     @property
-    @lru_cache()
     def node_cls(self) -> Union[type, NeoNodeMeta, Type[NeoNode]]:
         fields = getattr(self, 'fields', None)
         target = getattr(self, 'target', None)
@@ -85,14 +119,46 @@ class NeoQuerySet:
     def copy(self) -> 'NeoQuerySet':
         instance = self.__class__.__new__(self.__class__)
         instance.__dict__.update(self.__dict__)
+        instance._builder = self._builder.copy()
         return instance
 
     def fetch(self) -> List[NeoNode]:
-        results, meta = query_db(self.query)
+        results, meta = query_db(self.query, self.params, origin=self.__class__.__name__)
         data = self.parse(results=results, meta=meta)
         self._data = data
         return self._data
 
+    def _chunk_key(self, meta: List[str]) -> Union[None, Callable]:
+        return
+
+    def iterator(self, chunk_size: int = 1000) -> Iterator[NeoNode]:
+        """
+        It streams the query results from the database and yields the parsed NeoNode instances lazily.
+        Records are parsed in chunks, and thus memory is bounded by the chunk size rather than the number of nodes.
+        The data of the query set is not cached.
+        The database session is opened by the first iteration and closed once the iterator is exhausted or closed.
+
+        :param chunk_size: The number of records fetched from the database and parsed at once
+        :return: An iterator of NeoNode instances
+        """
+        stream = stream_db(self.query, self.params, fetch_size=chunk_size, origin=self.__class__.__name__)
+
+        with stream as (records, meta):
+            key_fn = self._chunk_key(meta)
+
+            chunk = []
+            for record in records:
+
+                # rows of the same source node must be parsed together
+                if len(chunk) >= chunk_size and (key_fn is None or key_fn(record) != key_fn(chunk[-1])):
+                    yield from self.parse(results=chunk, meta=meta)
+                    chunk = []
+
+                chunk.append(record)
+
+            if chunk:
+                yield from self.parse(results=chunk, meta=meta)
+
     # get method is only base to all query sets because it only calls the filter method, which is rather specific
     def get(self, **kwargs):
         kwargs = {f'{key}__exact': value for key, value in kwargs.items()}
@@ -114,42 +180,154 @@ class NeoQuerySet:
         if not hasattr(obj, 'protrend_id'):
             raise ValueError('Expecting Protrend source saved instance')
 
-        for node in self:
+        data = self.data
+        if isinstance(data, SetList) and data.key == 'protrend_id':
+            return obj.protrend_id in data
+
+        for node in data:
             if node.protrend_id == obj.protrend_id:
                 return True
 
         return False
 
-    def _where_clauses(self, **kwargs):
+    def _where_clauses(self, **kwargs) -> Tuple[List[str], Dict[str, Any]]:
         where_clauses = []
+        params = {}
         for key, value in kwargs.items():
             field, operator = key.split('__')
+
+            factor = getattr(self.source, f'{field}_factor', None)
+            if operator in CASE_INSENSITIVE_OPERATORS and isinstance(factor, StringProperty):
+                # the indexed and lower-cased factor property serves case-insensitive lookups
+                field, operator = f'{field}_factor', 'factor_contains'
+
             left_operand = f'{self.source_variable}.{field}'
             right_operand = value
+            parameter = self._builder.parameter(f'{field}_{operator}', reserved=params)
 
             operator = CYPHER_OPERATORS[operator]
-            clause = operator(left_operand=left_operand, right_operand=right_operand)
+            clause, param = operator(left_operand=left_operand, right_operand=right_operand, parameter=parameter)
             where_clauses.append(clause)
+            params.update(param)
 
-        return where_clauses
+        return where_clauses, params
 
-    def _set_item(self, key):
+    @staticmethod
+    def _slice_bounds(key) -> Tuple[int, Union[None, int]]:
         if isinstance(key, slice):
-            if key.stop and key.start:
-                self.limit = key.stop - key.start
-                self.skip = key.start
-            elif key.stop:
-                self.limit = key.stop
-            elif key.start:
-                self.skip = key.start
+            if key.step is not None:
+                raise ValueError("Slicing with step is not supported")
+
+            start = key.start or 0
+            if start < 0 or (key.stop is not None and key.stop < 0):
+                raise ValueError("Negative indexing is not supported")
+
+            if key.stop is None:
+                return start, None
+
+            return start, max(key.stop - start, 0)
 
         elif isinstance(key, int):
-            self.skip = key
-            self.limit = 1
+            if key < 0:
+                raise ValueError("Negative indexing is not supported")
+
+            return key, 1
 
         else:
             raise ValueError("Expecting slice or int")
 
+    def _link_clauses(self) -> Tuple[str, str]:
+        return '', self.source_return
+
+    def _tie_breaker(self) -> Union[None, str]:
+        return
+
+    def _build(self, builder: QueryBuilder = None) -> CypherQuery:
+        if builder is None:
+            builder = self._builder
+
+        link_clause, return_clause = self._link_clauses()
+        return builder.build(source_clause=self.source_clause,
+                             source_variable=self.source_variable,
+                             return_clause=return_clause,
+                             link_clause=link_clause,
+                             tie_breaker=self._tie_breaker(),
+                             source_label=self.source_label)
+
+    def _field_variables(self) -> Dict[str, str]:
+        return {}
+
+    def _field_models(self) -> Dict[str, Type[DjangoNode]]:
+        return {}
+
+    def _field_link_clause(self) -> str:
+        return ''
+
+    def _field_expression(self, field: Union[None, str]) -> Union[None, str]:
+        if field is None:
+            return
+
+        name, _, prop = field.partition('__')
+        variables = self._field_variables()
+
+        if name in variables:
+            if prop:
+                return f'{variables[name]}.{prop}'
+
+            return variables[name]
+
+        return f'{self.source_variable}.{field}'
+
+    def _field_dtypes(self, fields: List[str]) -> Dict[str, str]:
+        models = self._field_models()
+
+        dtypes = {}
+        for field in fields:
+            name, _, prop = field.partition('__')
+
+            if name in models:
+                model = models[name]
+            else:
+                model, prop = self.source, field
+
+            properties = model.defined_properties(aliases=False, rels=False)
+            dtype = column_dtype(properties.get(prop))
+            if dtype is not None:
+                dtypes[field] = dtype
+
+        return dtypes
+
+    def _fetch_rows(self, fields: List[str]) -> Tuple[List[List[Any]], List[str]]:
+        projection = ', '.join(f'{self._field_expression(field)} AS {field}' for field in fields)
+        query = self._builder.build(source_clause=self.source_clause,
+                                    source_variable=self.source_variable,
+                                    return_clause=projection,
+                                    link_clause=self._field_link_clause(),
+                                    source_label=self.source_label)
+        return query_db(query.compile(), self._builder.query_params, origin=self.__class__.__name__)
+
+    def _aggregate(self, keys: List[str], aggregates: Dict[str, Aggregate]) -> List[Dict[str, Any]]:
+        projections = [f'{self._field_expression(key)} AS {key}' for key in keys]
+        projections.extend(f'{aggregate.compile(self._field_expression(aggregate.field))} AS {alias}'
+                           for alias, aggregate in aggregates.items())
+
+        return_clause = ', '.join(projections)
+        if not aggregates:
+            return_clause = f'DISTINCT {return_clause}'
+
+        query = self._builder.build_aggregate(source_clause=self.source_clause,
+                                              source_variable=self.source_variable,
+                                              return_clause=return_clause,
+                                              link_clause=self._field_link_clause(),
+                                              source_label=self.source_label)
+        results, meta = query_db(query.compile(), self._builder.query_params, origin=self.__class__.__name__)
+        return [dict(zip(meta, row)) for row in results]
+
+    def _fetch(self, builder: QueryBuilder) -> List[NeoNode]:
+        results, meta = query_db(self._build(builder).compile(), builder.query_params,
+                                 origin=self.__class__.__name__)
+        return self.parse(results=results, meta=meta)
+
     # -------------------------------------------------------------
     # SOURCE SPECIFIC/CUSTOM METHODS
     # -------------------------------------------------------------
@@ -166,58 +344,232 @@ class NeoQuerySet:
             return SetList(nodes)
         return nodes
 
+    # -------------------------------------------------------------
+    # QUERY BUILDING METHODS
+    # -------------------------------------------------------------
+    # filter, order_by and slicing accumulate in the query builder,
+    # which is compiled to a single cypher query only when the data is needed
     def all(self):
-        self._query = f'MATCH {self.source_clause} RETURN {self.source_return}'
+        self._builder = QueryBuilder()
         self._data = []
         return self
 
     def order_by(self, *args, ascending=True, key=None):
-        order_clause = ', '.join(f'{self.source_variable}.{field}' for field in args)
+        direction = 'ASC' if ascending else 'DESC'
+        self._builder.order_by([f'{self.source_variable}.{field} {direction}' for field in args])
 
-        if ascending:
-            self._query = f'MATCH {self.source_clause} RETURN {self.source_return} ORDER BY {order_clause} ASC'
+        if key is not None:
+            skip, limit = self._slice_bounds(key)
+            self._builder.slice(skip=skip, limit=limit)
 
-        else:
-            self._query = f'MATCH {self.source_clause} RETURN {self.source_return} ORDER BY {order_clause} DESC'
+        self._data = []
+        return self
 
-        if key:
-            self._set_item(key)
-            self._query += f' SKIP {self.skip} LIMIT {self.limit}'
+    def values_list(self, *fields: str, flat: bool = False) -> List[Any]:
+        """
+        It retrieves the fields of the query set nodes as tuples, without instantiating NeoNodes.
+        For linked query sets, a tuple is returned per source-target pair.
 
-        self._data = []
+        :param fields: The source node properties or properties of linked targets (e.g. gene__locus_tag).
+        It defaults to the fields of the query set
+        :param flat: Whether the values of a single field are returned rather than 1-tuples
+        :return: A list of tuples or values
+        """
+        fields = list(fields) or list(self.fields)
+
+        if flat and len(fields) != 1:
+            raise ValueError('flat values_list requires a single field')
+
+        results, _ = self._fetch_rows(fields)
+
+        if flat:
+            return [row[0] for row in results]
+
+        return [tuple(row) for row in results]
+
+    def to_frame(self, *fields: str) -> pd.DataFrame:
+        """
+        It retrieves the fields of the query set nodes as a pandas DataFrame, without instantiating NeoNodes.
+        Integer, float and boolean properties (e.g. start, stop or ncbi_taxonomy) are typed columns
+        of pandas nullable dtypes.
+
+        :param fields: The source node properties or properties of linked targets (e.g. gene__locus_tag).
+        It defaults to the fields of the query set
+        :return: A DataFrame with a column per field
+        """
+        fields = list(fields) or list(self.fields)
+
+        results, _ = self._fetch_rows(fields)
+        return rows_to_frame(results, fields, self._field_dtypes(fields))
+
+    def values(self, *fields: str):
+        """
+        It sets the grouping keys of the annotate aggregations (see annotate)
+
+        :param fields: The source node properties, linked targets or properties of linked targets (e.g. gene__locus_tag)
+        """
+        self._values = list(fields)
         return self
 
+    def annotate(self, **aggregates: Aggregate) -> List[Dict[str, Any]]:
+        """
+        It computes the aggregations in the database for each group of the values() keys.
+        For instance, query_set.values('mechanism').annotate(count=Count()) returns the number of nodes
+        per mechanism, whereas query_set.values('mechanism').annotate() returns the distinct mechanisms.
+
+        :param aggregates: The alias and the aggregation function (Count, Collect, Min, Max, Sum or Avg) pairs
+        :return: A dictionary of keys and aggregations per group
+        """
+        return self._aggregate(self._values, aggregates)
+
+    def aggregate(self, **aggregates: Aggregate) -> Dict[str, Any]:
+        """
+        It computes the aggregations in the database over all nodes of the query set.
+        For instance, query_set.aggregate(first=Min('start'), last=Max('stop')).
+
+        :param aggregates: The alias and the aggregation function (Count, Collect, Min, Max, Sum or Avg) pairs
+        :return: A dictionary of aggregations
+        """
+        results = self._aggregate([], aggregates)
+        if results:
+            return results[0]
+
+        return {}
+
     def count(self) -> int:
-        count_query = f'MATCH {self.source_clause} RETURN {self.count_source}'
-        results, _ = query_db(count_query)
+        count_query = self._builder.build_count(source_clause=self.source_clause,
+                                                source_variable=self.source_variable,
+                                                count_clause=self.count_source,
+                                                source_label=self.source_label)
+        results, _ = query_db(count_query.compile(), dict(self._builder.params), origin=self.__class__.__name__)
         return int(results[0][0])
 
+    def search(self, value: Any, fields: List[str] = None):
+        """
+        Full-text search of the source nodes. The source nodes are looked up in the full-text index of the source label
+        (see the protrend_indexes command), and only the nodes having all words of the value as word prefixes
+        in any of the indexed properties are kept.
+
+        If the full-text index was not created, the nodes containing the value in any of the fields are kept instead.
+        A blank value has no search terms, so the query set is not filtered.
+
+        :param value: The search terms
+        :param fields: The fields searched by the contains lookups if the full-text index is missing.
+        It defaults to the searchable fields of the model type or, otherwise, to the query set fields
+        """
+        value = str(value).strip()
+        if not value:
+            return self
+
+        index = search_index_name(self.source_label)
+
+        if fulltext_index_exists(index):
+            self._builder.search(index, value)
+            self._data = []
+            return self
+
+        fields = fields or getattr(self.source, 'searchable_fields', ()) or self.fields
+        return self.filter_any(**{f'{field}__contains': value for field in fields})
+
+    def unwind(self, ids: Iterable[Any], key: str = 'protrend_id'):
+        """
+        It matches the source nodes having one of the identifiers in a single query.
+        Note that the nodes are not returned in the order of the identifiers (see dpi.get_objects_by_ids).
+
+        :param ids: The identifiers of the source nodes
+        :param key: The node property holding the identifiers
+        """
+        self._builder.unwind(ids, key=key)
+        self._data = []
+        return self
+
     def filter(self, **kwargs):
-        where_clauses = self._where_clauses(**kwargs)
-        where_clause = ' AND '.join(where_clauses)
+        search = kwargs.pop('search', None)
+        if search:
+            self.search(search)
 
-        if where_clause:
-            self._query = f'MATCH {self.source_clause} WHERE {where_clause} RETURN {self.source_return}'
-        else:
-            self._query = f'MATCH {self.source_clause} RETURN {self.source_return}'
+        where_clauses, params = self._where_clauses(**kwargs)
+        self._builder.where(where_clauses, params)
+        self._data = []
+        return self
+
+    def filter_any(self, **kwargs):
+        """
+        Unlike filter, the lookups are combined with OR, so that nodes matching any of the lookups are kept.
+        """
+        where_clauses, params = self._where_clauses(**kwargs)
+        if where_clauses:
+            self._builder.where([f'({" OR ".join(where_clauses)})'], params)
 
         self._data = []
         return self
 
     def __getitem__(self, key):
-        self._set_item(key)
+        skip, limit = self._slice_bounds(key)
 
-        skip = int(self.skip)
-        limit = int(self.limit)
-        query = f'MATCH {self.source_clause} RETURN {self.source_return} SKIP {skip} LIMIT {limit}'
-        results, meta = query_db(query)
-        data = self.parse(results=results, meta=meta)
+        builder = self._builder.copy().slice(skip=skip, limit=limit)
+        data = self._fetch(builder)
 
         if isinstance(key, int):
-            return data[key]
+            return data[0]
 
         return data
 
+    def after(self,
+              cursor: Any = None,
+              limit: int = 50,
+              key: str = 'protrend_id',
+              ascending: bool = True) -> List[NeoNode]:
+        """
+        Keyset (cursor) pagination. It retrieves the page of nodes that follows the cursor according to the key order,
+        so that the database seeks the cursor position in the key index rather than skipping all previous nodes.
+        Filters previously applied to the query set are kept.
+
+        If the key is not the protrend identifier, the protrend identifier is used as a tie-breaker,
+        and thus the cursor must be a (key value, protrend identifier) pair.
+
+        :param cursor: The key value of the last node of the previous page or None for the first page
+        :param limit: The maximum number of nodes in the page
+        :param key: The node property used to sort the nodes
+        :param ascending: The sorting direction
+        :return: A list of NeoNode instances
+        """
+        builder = self._builder.copy()
+        where_clauses = []
+        params = {}
+
+        operator = '>' if ascending else '<'
+        direction = 'ASC' if ascending else 'DESC'
+        key_variable = f'{self.source_variable}.{key}'
+
+        if key == 'protrend_id':
+            order_clause = f'{key_variable} {direction}'
+
+            if cursor is None:
+                where_clauses.append(f'{key_variable} IS NOT NULL')
+            else:
+                where_clauses.append(f'{key_variable} {operator} $cursor')
+                params['cursor'] = cursor
+
+        else:
+            order_clause = f'{key_variable} {direction}, {self.source_variable}.protrend_id {direction}'
+
+            if cursor is None:
+                where_clauses.append(f'{key_variable} IS NOT NULL')
+            else:
+                cursor_key, cursor_id = cursor
+                where_clauses.append(f'({key_variable} {operator} $cursor OR '
+                                     f'({key_variable} = $cursor AND '
+                                     f'{self.source_variable}.protrend_id {operator} $cursor_id))')
+                params['cursor'] = cursor_key
+                params['cursor_id'] = cursor_id
+
+        builder.where(where_clauses, params)
+        builder.order_by([order_clause])
+        builder.skip = None
+        builder.limit = int(limit)
+        return self._fetch(builder)
+
 
 class NeoLinkedQuerySet(NeoQuerySet):
 
@@ -225,8 +577,21 @@ class NeoLinkedQuerySet(NeoQuerySet):
                  source: Type[DjangoNode],
                  fields: List[str] = None,
                  target: str = None,
-                 target_fields: List[str] = None):
-
+                 target_fields: List[str] = None,
+                 collect: bool = True):
+        """
+        A NeoLinkedQuerySet retrieves the source nodes and the nodes connected to them by the target relationship.
+
+        In the collect mode (default), the connected nodes are grouped by Neo4j using collect(),
+        so that a single row holding a list of target maps is returned per source node.
+        Otherwise, a row is returned per source-target pair and the rows are grouped afterwards in Python.
+
+        :param source: A neomodel structured node type
+        :param fields: A list of fields that will be used to fetch the node properties
+        :param target: The relationship attribute name that will be used to fetch the connected nodes
+        :param target_fields: A list of fields that will be used to fetch the connected nodes' properties
+        :param collect: Whether the connected nodes should be collected by Neo4j into a single row per source node
+        """
         super().__init__(source, fields)
 
         if not target:
@@ -240,20 +605,15 @@ class NeoLinkedQuerySet(NeoQuerySet):
 
         self.target = target
         self.target_fields = target_fields
+        self.collect = collect
+        self._target_label = get_target_label(source, target)
 
     # -------------------------------------------------------------
     # TARGET PROPERTIES
     # -------------------------------------------------------------
     @property
-    @lru_cache()
     def target_label(self) -> str:
-        relationship = getattr(self.source, self.target)
-
-        if 'node_class' not in relationship.definition:
-            # noinspection PyProtectedMember
-            relationship._lookup_node_class()
-
-        return relationship.definition['node_class'].__label__
+        return self._target_label
 
     @property
     def target_variable(self) -> str:
@@ -267,14 +627,69 @@ class NeoLinkedQuerySet(NeoQuerySet):
     def target_return(self) -> str:
         return ', '.join(f'{self.target_variable}.{field}' for field in self.target_fields)
 
+    @property
+    def target_projection(self) -> str:
+        projection = ', '.join(f'.{field}' for field in self.target_fields)
+        return f'{self.target_variable} {{{projection}}}'
+
     @property
     def count_target(self) -> str:
         return f'count({self.target_variable})'
 
+    @property
+    def relationship_clause(self) -> str:
+        return get_relationship_pattern(self.source, self.target)
+
+    # -------------------------------------------------------------
+    # LINK PROPERTIES
+    # -------------------------------------------------------------
+    @property
+    def collect_variable(self) -> str:
+        return f'{self.target_variable}_collection'
+
+    @property
+    def link_clause(self) -> str:
+        clause = f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause}'
+
+        if self.collect:
+            clause += f' WITH {self.source_variable}, collect({self.target_projection}) AS {self.collect_variable}'
+
+        return clause
+
+    @property
+    def link_return(self) -> str:
+        if self.collect:
+            return f'{self.source_return}, {self.collect_variable}'
+
+        return f'{self.source_return}, {self.target_return}'
+
     # -------------------------------------------------------------
     # TARGET SPECIFIC/CUSTOM METHODS
     # -------------------------------------------------------------
+    def _parse_collection(self, results: List[str], meta: List[str]) -> List[DjangoNode]:
+        source_meta = [key.split('.')[1] for key in meta if key != self.collect_variable]
+
+        n_source = len(source_meta)
+
+        nodes = []
+        for row in results:
+            kwargs = {attr: field for attr, field in zip(source_meta, row)}
+
+            target_kwargs = row[n_source]
+            if 'protrend_id' in self.target_fields:
+                target_kwargs = SetList(target_kwargs)
+
+            kwargs[self.target] = target_kwargs
+
+            node_instance = self.node_cls(**kwargs)
+            nodes.append(node_instance)
+
+        return nodes
+
     def parse(self, results: List[str], meta: List[str]) -> List[DjangoNode]:
+        if self.collect:
+            return self._parse_collection(results=results, meta=meta)
+
         source_meta, _, link_meta, key_fn = parse_query_meta(meta,
                                                              source_variable=self.source_variable,
                                                              relationship_variable='',
@@ -284,13 +699,13 @@ class NeoLinkedQuerySet(NeoQuerySet):
 
         nodes = []
 
-        results = sorted(results, key=key_fn)
-
+        # the rows of each source node are contiguous, as the query is sorted by the source identifier,
+        # so that the rows can be grouped while keeping the order of the query
         for fields, group in groupby(results, key_fn):
             kwargs = {attr: field for attr, field in zip(source_meta, fields)}
 
             target_kwargs = []
-            for value in list(group):
+            for value in group:
                 target_values = value[n_source:]
 
                 if target_values[0] is None:
@@ -309,70 +724,45 @@ class NeoLinkedQuerySet(NeoQuerySet):
 
         return nodes
 
-    def all(self):
-        self._query = f'MATCH {self.source_clause} ' \
-                      f'OPTIONAL MATCH ({self.source_variable})-[]->{self.target_clause} ' \
-                      f'RETURN {self.source_return}, {self.target_return}'
-        self._data = []
-        return self
-
-    @staticmethod
-    def _group_by_count(query: str):
-        results, _ = query_db(query)
+    def _field_variables(self) -> Dict[str, str]:
+        return {self.target: self.target_variable}
 
-        def key_fn(x):
-            return x[0]
+    def _field_models(self) -> Dict[str, Type[DjangoNode]]:
+        return {self.target: get_target_class(self.source, self.target)}
 
-        results = sorted(results, key=key_fn)
-
-        nodes = {}
-        for protrend_id, group in groupby(results, key_fn):
-            group = list(zip(*group))
-            count = group[1][0]
-            nodes[protrend_id] = count
-        return nodes
+    def _field_link_clause(self) -> str:
+        return f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause}'
 
     def group_by_count(self, field: str = None) -> Dict[str, int]:
+        """
+        It counts the connected nodes of each source node in the database
+
+        :param field: The source node property used as key. It defaults to the first field of the query set
+        :return: A dictionary of key-count pairs
+        """
         if not field:
             field = self.fields[0]
 
-        query = f'MATCH {self.source_clause} ' \
-                f'OPTIONAL MATCH ({self.source_variable})-[]->{self.target_clause} ' \
-                f'RETURN {self.source_variable}.{field}, {self.count_target}'
-        return self._group_by_count(query)
+        results = self.copy().values(field).annotate(count=Count(self.target))
+        return {row[field]: row['count'] for row in results}
 
-    def filter(self, **kwargs):
-        where_clauses = self._where_clauses(**kwargs)
-        where_clause = ' AND '.join(where_clauses)
+    def _link_clauses(self) -> Tuple[str, str]:
+        return self.link_clause, self.link_return
 
-        if where_clause:
-            self._query = f'MATCH {self.source_clause} WHERE {where_clause} ' \
-                          f'OPTIONAL MATCH ({self.source_variable})-[]->{self.target_clause} ' \
-                          f'RETURN {self.source_return}, {self.target_return}'
-        else:
-            self._query = f'MATCH {self.source_clause} ' \
-                          f'OPTIONAL MATCH ({self.source_variable})-[]->{self.target_clause} ' \
-                          f'RETURN {self.source_return}, {self.target_return}'
-
-        self._data = []
-        return self
-
-    def __getitem__(self, key):
-        self._set_item(key)
-
-        skip = int(self.skip)
-        limit = int(self.limit)
-        query = f'MATCH {self.source_clause} ' \
-                f'WITH {self.source_variable} SKIP {skip} LIMIT {limit} ' \
-                f'OPTIONAL MATCH ({self.source_variable})-[]->{self.target_clause} ' \
-                f'RETURN {self.source_return}, {self.target_return}'
-        results, meta = query_db(query)
-        data = self.parse(results=results, meta=meta)
+    def _tie_breaker(self) -> Union[None, str]:
+        # the rows of each source node must be contiguous while parsing and streaming,
+        # and the source nodes are returned in a stable order if the query set is not ordered
+        return f'{self.source_variable}.protrend_id'
 
-        if isinstance(key, int):
-            return data[key]
+    def _chunk_key(self, meta: List[str]) -> Union[None, Callable]:
+        if self.collect:
+            return
 
-        return data
+        *_, key_fn = parse_query_meta(meta,
+                                      source_variable=self.source_variable,
+                                      relationship_variable=getattr(self, 'relationship_variable', ''),
+                                      target_variable=self.target_variable)
+        return key_fn
 
 
 class NeoHyperLinkedQuerySet(NeoLinkedQuerySet):
@@ -382,12 +772,14 @@ class NeoHyperLinkedQuerySet(NeoLinkedQuerySet):
                  fields: List[str] = None,
                  target: str = None,
                  target_fields: List[str] = None,
-                 relationship_fields: List[str] = None):
+                 relationship_fields: List[str] = None,
+                 collect: bool = True):
 
         super().__init__(source=source,
                          fields=fields,
                          target=target,
-                         target_fields=target_fields)
+                         target_fields=target_fields,
+                         collect=collect)
 
         if not relationship_fields:
             raise ValueError('Relationship fields cannot be empty for NeoHyperLinkedQuerySet')
@@ -403,20 +795,43 @@ class NeoHyperLinkedQuerySet(NeoLinkedQuerySet):
 
     @property
     def relationship_clause(self) -> str:
-        return f'-[{self.relationship_variable}]->'
+        return get_relationship_pattern(self.source, self.target, self.relationship_variable)
 
     @property
     def relationship_return(self) -> str:
         return ', '.join(f'{self.relationship_variable}.{field}' for field in self.relationship_fields)
 
+    @property
+    def relationship_projection(self) -> str:
+        projection = ', '.join(f'.{field}' for field in self.relationship_fields)
+        return f'{self.relationship_variable} {{{projection}}}'
+
+    @property
+    def target_projection(self) -> str:
+        projection = ', '.join(f'.{field}' for field in self.target_fields)
+        return f'{self.target_variable} {{{projection}, relationship_: {self.relationship_projection}}}'
+
     @property
     def count_relationship(self) -> str:
         return f'count({self.target_variable})'
 
+    # -------------------------------------------------------------
+    # LINK PROPERTIES
+    # -------------------------------------------------------------
+    @property
+    def link_return(self) -> str:
+        if self.collect:
+            return f'{self.source_return}, {self.collect_variable}'
+
+        return f'{self.source_return}, {self.relationship_return}, {self.target_return}'
+
     # -------------------------------------------------------------
     # TARGET SPECIFIC/CUSTOM METHODS
     # -------------------------------------------------------------
     def parse(self, results: List[str], meta: List[str]) -> List[DjangoNode]:
+        if self.collect:
+            return self._parse_collection(results=results, meta=meta)
+
         source_meta, rel_meta, link_meta, key_fn = parse_query_meta(meta,
                                                                     source_variable=self.source_variable,
                                                                     relationship_variable=self.relationship_variable,
@@ -427,15 +842,13 @@ class NeoHyperLinkedQuerySet(NeoLinkedQuerySet):
 
         nodes = []
 
-        results = sorted(results, key=key_fn)
-
+        # the rows of each source node are contiguous, as the query is sorted by the source identifier,
+        # so that the rows can be grouped while keeping the order of the query
         for fields, group in groupby(results, key_fn):
             kwargs = {attr: field for attr, field in zip(source_meta, fields)}
 
-            values = list(group)
-
             target_kwargs = []
-            for value in values:
+            for value in group:
                 relationship_values = value[n_source:n_source_rel]
                 target_values = value[n_source_rel:]
 
@@ -459,52 +872,203 @@ class NeoHyperLinkedQuerySet(NeoLinkedQuerySet):
 
         return nodes
 
-    def all(self):
-        self._query = f'MATCH {self.source_clause} ' \
-                      f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause} ' \
-                      f'RETURN {self.source_return}, {self.relationship_return}, {self.target_return}'
-        self._data = []
-        return self
+    def group_by_count(self, field: str = 'protrend_id') -> Dict[str, int]:
+        return super().group_by_count(field=field)
 
-    def group_by_count(self) -> Dict[str, int]:
-        query = f'MATCH {self.source_clause} ' \
-                f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause} ' \
-                f'RETURN {self.source_variable}.protrend_id, {self.count_relationship}'
 
-        return self._group_by_count(query)
+class NeoMultiLinkedQuerySet(NeoQuerySet):
 
-    def filter(self, **kwargs):
-        where_clauses = self._where_clauses(**kwargs)
-        where_clause = ' AND '.join(where_clauses)
+    def __init__(self,
+                 source: Type[DjangoNode],
+                 fields: List[str] = None,
+                 targets: Dict[str, List[str]] = None,
+                 relationships: Dict[str, List[str]] = None):
+        """
+        A NeoMultiLinkedQuerySet retrieves the source nodes and all requested targets in a single cypher query.
+        Each target is matched with an OPTIONAL MATCH and collected into a list of maps right away,
+        so that the following target is matched against one row per source node.
+        The connected relationships' properties are collected into the target maps if requested.
+
+        The parsed NeoNode instances are equivalent to the ones obtained by merging one NeoLinkedQuerySet
+        or NeoHyperLinkedQuerySet per target with the add_query_sets function.
+
+        :param source: A neomodel structured node type
+        :param fields: A list of fields that will be used to fetch the node properties
+        :param targets: A dictionary of target-fields pairs that will be used to fetch the connected nodes' properties
+        :param relationships: A dictionary of relationship-fields pairs that will be used to fetch
+        the connected relationships' properties
+        """
+        super().__init__(source, fields)
 
-        if where_clause:
-            self._query = f'MATCH {self.source_clause} WHERE {where_clause} ' \
-                          f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause} ' \
-                          f'RETURN {self.source_return}, {self.relationship_return}, {self.target_return}'
-        else:
-            self._query = f'MATCH {self.source_clause} ' \
-                          f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause} ' \
-                          f'RETURN {self.source_return}, {self.relationship_return}, {self.target_return}'
+        if not targets:
+            raise ValueError('targets cannot be empty for NeoMultiLinkedQuerySets')
 
-        self._data = []
-        return self
+        if not relationships:
+            relationships = {}
 
-    def __getitem__(self, key):
-        self._set_item(key)
-
-        skip = int(self.skip)
-        limit = int(self.limit)
-        query = f'MATCH {self.source_clause} ' \
-                f'WITH {self.source_variable} SKIP {skip} LIMIT {limit} ' \
-                f'OPTIONAL MATCH ({self.source_variable}){self.relationship_clause}{self.target_clause} ' \
-                f'RETURN {self.source_return}, {self.relationship_return}, {self.target_return}'
-        results, meta = query_db(query)
-        data = self.parse(results=results, meta=meta)
+        self.targets = {}
+        for target, target_fields in targets.items():
+            if not target_fields:
+                target_fields = ['protrend_id']
+            elif 'protrend_id' not in target_fields:
+                target_fields = ['protrend_id'] + list(target_fields)
 
-        if isinstance(key, int):
-            return data[key]
+            self.targets[target] = target_fields
 
-        return data
+        self.relationships = {target: relationship_fields
+                              for target, relationship_fields in relationships.items()
+                              if relationship_fields and target in self.targets}
+
+        self._target_labels = {target: get_target_label(source, target) for target in self.targets}
+
+    # -------------------------------------------------------------
+    # BASE DYNAMIC PROPERTIES
+    # -------------------------------------------------------------
+    @property
+    def node_classes(self) -> Dict[str, Union[type, NeoNodeMeta, Type[NeoNode]]]:
+        return {target: node_factory(fields=self.fields,
+                                     target=target,
+                                     target_fields=target_fields,
+                                     relationship_fields=self.relationships.get(target))
+                for target, target_fields in self.targets.items()}
+
+    # -------------------------------------------------------------
+    # TARGETS PROPERTIES
+    # -------------------------------------------------------------
+    @property
+    def target_labels(self) -> Dict[str, str]:
+        return self._target_labels
+
+    @staticmethod
+    def target_variable(target: str) -> str:
+        return f'target_{target}'
+
+    @staticmethod
+    def relationship_variable(target: str) -> str:
+        return f'relationship_{target}'
+
+    def target_projection(self, target: str) -> str:
+        projection = ', '.join(f'.{field}' for field in self.targets[target])
+
+        relationship_fields = self.relationships.get(target)
+        if relationship_fields:
+            relationship_projection = ', '.join(f'.{field}' for field in relationship_fields)
+            projection += f', relationship_: {self.relationship_variable(target)} {{{relationship_projection}}}'
+
+        return f'{self.target_variable(target)} {{{projection}}}'
+
+    @property
+    def targets_clause(self) -> str:
+        clauses = []
+        variables = [self.source_variable]
+        for target in self.targets:
+            target_variable = self.target_variable(target)
+            target_clause = f'({target_variable}:{self.target_labels[target]})'
+
+            if target in self.relationships:
+                relationship_clause = get_relationship_pattern(self.source, target, self.relationship_variable(target))
+            else:
+                relationship_clause = get_relationship_pattern(self.source, target)
+
+            clauses.append(f'OPTIONAL MATCH ({self.source_variable}){relationship_clause}{target_clause} '
+                           f'WITH {", ".join(variables)}, '
+                           f'collect({self.target_projection(target)}) AS {target_variable}')
+            variables.append(target_variable)
+
+        return ' '.join(clauses)
+
+    @property
+    def targets_return(self) -> str:
+        return ', '.join(self.target_variable(target) for target in self.targets)
+
+    # -------------------------------------------------------------
+    # TARGETS SPECIFIC/CUSTOM METHODS
+    # -------------------------------------------------------------
+    def parse(self, results: List[str], meta: List[str]) -> List[DjangoNode]:
+        target_variables = {self.target_variable(target): target for target in self.targets}
+
+        columns = []
+        for key in meta:
+            if key in target_variables:
+                columns.append((target_variables[key], True))
+            else:
+                _, field = key.split('.')
+                columns.append((field, False))
+
+        nodes = []
+        for row in results:
+            kwargs = {}
+            targets_kwargs = {}
+            for (attr, is_target), value in zip(columns, row):
+                if is_target:
+                    targets_kwargs[attr] = SetList(value)
+                else:
+                    kwargs[attr] = value
+
+            node_instance = None
+            for target, target_kwargs in targets_kwargs.items():
+                target_instance = self.node_classes[target](**kwargs, **{target: target_kwargs})
+
+                if node_instance is None:
+                    node_instance = target_instance
+                else:
+                    node_instance = node_instance.add(target_instance)
+
+            nodes.append(node_instance)
+
+        return nodes
+
+    def _link_clauses(self) -> Tuple[str, str]:
+        return self.targets_clause, f'{self.source_return}, {self.targets_return}'
+
+    def _tie_breaker(self) -> Union[None, str]:
+        # the source nodes are returned in a stable order if the query set is not ordered
+        return f'{self.source_variable}.protrend_id'
+
+
+def query_concurrency() -> int:
+    """
+    It returns the maximum number of query sets fetched concurrently according to the PROTREND_QUERY_CONCURRENCY
+    settings, or 1 if concurrent fetching is disabled
+    """
+    options = getattr(settings, 'PROTREND_QUERY_CONCURRENCY', {})
+    if not options.get('ENABLED', False):
+        return 1
+
+    return max(int(options.get('MAX_WORKERS', 8)), 1)
+
+
+def fetch_query_sets(*query_sets: Union[NeoQuerySet,
+                                        NeoLinkedQuerySet,
+                                        NeoHyperLinkedQuerySet],
+                     max_workers: int = None):
+    """
+    It fetches the data of independent query sets concurrently using a pool of threads,
+    which are green threads if the worker is monkey patched by eventlet.
+    The threads share the neomodel driver, and thus its connection pool (NEOMODEL_MAX_CONNECTION_POOL_SIZE).
+    Query sets already holding data are not fetched again,
+    and query sets are fetched sequentially within a transaction.
+
+    :param query_sets: The query sets
+    :param max_workers: The maximum number of query sets fetched at once. It defaults to the query concurrency settings
+    """
+    if max_workers is None:
+        max_workers = query_concurrency()
+
+    pending = [query_set for query_set in query_sets if not query_set._data]
+
+    if max_workers < 2 or len(pending) < 2 or in_transaction():
+        for query_set in pending:
+            query_set.fetch()
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending)),
+                            initializer=connection_initializer()) as executor:
+        # the queries are recorded in the query log of the calling context
+        futures = [executor.submit(copy_context().run, query_set.fetch) for query_set in pending]
+
+        for future in futures:
+            future.result()
 
 
 def add_query_sets(*query_sets: Union[NeoQuerySet,
@@ -512,6 +1076,8 @@ def add_query_sets(*query_sets: Union[NeoQuerySet,
                                       NeoHyperLinkedQuerySet]) -> Union[NeoQuerySet,
                                                                         NeoLinkedQuerySet,
                                                                         NeoHyperLinkedQuerySet]:
+    fetch_query_sets(*query_sets)
+
     query_set = query_sets[0]
 
     data = {obj.protrend_id: obj for obj in query_set.data}
@@ -520,7 +1086,7 @@ def add_query_sets(*query_sets: Union[NeoQuerySet,
         for obj in query_set_.data:
             if obj.protrend_id in data:
                 data_obj = data[obj.protrend_id]
-                data_obj.add(obj)
+                data[obj.protrend_id] = data_obj.add(obj)
             else:
                 data[obj.protrend_id] = obj
 
@@ -0,0 +1,217 @@
+import atexit
+import gzip
+import os
+import pickle
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, List, Tuple, Union, Hashable, Iterator, Deque
+
+from django.conf import settings
+
+from .cache import cache_key
+
+
+FIXTURE_SUFFIX = '.pickle.gz'
+
+
+class QueryReplayError(LookupError):
+    pass
+
+
+class QueryRecorder:
+
+    def __init__(self, path: str):
+        """
+        The QueryRecorder writes the cypher queries run by query_db, together with their parameters,
+        result rows and result keys, to a fixture file. Fixture files are gzip-compressed streams of pickled records,
+        so that records are written as soon as the queries run.
+
+        :param path: The path of the fixture file
+        """
+        self.path = path
+        self.count = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = gzip.open(path, 'wb')
+        self._lock = Lock()
+
+    def record(self, query: str, params: Dict[str, Any], results: Tuple[List[Any], List[str]]):
+        rows, meta = results
+        record = {'query': query, 'params': params or {}, 'rows': rows, 'meta': meta}
+
+        with self._lock:
+            if self._file is None:
+                return
+
+            pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_fixture(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    It reads the records of a fixture file written by the QueryRecorder.
+    Fixture files are pickles, so that only trusted fixture files must be read.
+    """
+    with gzip.open(path, 'rb') as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def fixture_files(path: str) -> List[str]:
+    """
+    The fixture files of a path, which can be a fixture file or a directory of fixture files
+    """
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(FIXTURE_SUFFIX))
+
+    return [path]
+
+
+class QueryReplayer:
+
+    def __init__(self, path: str):
+        """
+        The QueryReplayer serves the recorded results of the cypher queries, keyed by the query and its parameters,
+        so that the query sets and views can be profiled offline against real data shapes.
+        It replaces the database backend (see get_backend).
+
+        A query recorded more than once is served its results in the recorded order,
+        and the last results are served once the recorded ones are exhausted.
+
+        :param path: The path of a fixture file or a directory of fixture files
+        """
+        self.path = path
+        self._results: Dict[Hashable, Deque[Tuple[List[Any], List[str]]]] = {}
+        self._lock = Lock()
+
+        for file in fixture_files(path):
+            for record in read_fixture(file):
+                key = cache_key(record['query'], record['params'])
+                self._results.setdefault(key, deque()).append((record['rows'], record['meta']))
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    # noinspection PyUnusedLocal
+    def cypher_query(self, query: str, params: Dict[str, Any] = None, **kwargs) -> Tuple[List[Any], List[str]]:
+        key = cache_key(query, params)
+
+        with self._lock:
+            results = self._results.get(key)
+
+            if not results:
+                raise QueryReplayError(f'The query was not recorded in {self.path}: {query} {params or {}}')
+
+            if len(results) > 1:
+                rows, meta = results.popleft()
+            else:
+                rows, meta = results[0]
+
+        # the callers can modify the rows
+        return [list(row) for row in rows], list(meta)
+
+
+_session: ContextVar[Union[None, QueryRecorder, QueryReplayer]] = ContextVar('protrend_query_recording',
+                                                                            default=None)
+_settings_session = None
+
+
+def _get_settings_session() -> Union[None, QueryRecorder, QueryReplayer]:
+    """
+    It returns the process-wide recording session according to the PROTREND_QUERY_RECORDING settings.
+    Each process records to its own fixture file in the PATH directory,
+    whereas the replay mode reads the fixture file or all fixture files of the PATH directory.
+    """
+    global _settings_session
+
+    options = getattr(settings, 'PROTREND_QUERY_RECORDING', {})
+    mode = options.get('MODE')
+    if not mode:
+        return
+
+    if _settings_session is None:
+        path = options.get('PATH', 'fixtures')
+
+        if mode == 'record':
+            file = os.path.join(path, f'queries-{time.strftime("%Y%m%d%H%M%S")}-{os.getpid()}{FIXTURE_SUFFIX}')
+            _settings_session = QueryRecorder(file)
+            atexit.register(_settings_session.close)
+
+        elif mode == 'replay':
+            _settings_session = QueryReplayer(path)
+
+        else:
+            raise ValueError(f'Unknown query recording mode {mode}')
+
+    return _settings_session
+
+
+def _get_session() -> Union[None, QueryRecorder, QueryReplayer]:
+    session = _session.get()
+
+    if session is None:
+        return _get_settings_session()
+
+    return session
+
+
+def get_query_recorder() -> Union[None, QueryRecorder]:
+    session = _get_session()
+
+    if isinstance(session, QueryRecorder):
+        return session
+
+
+def get_query_replayer() -> Union[None, QueryReplayer]:
+    session = _get_session()
+
+    if isinstance(session, QueryReplayer):
+        return session
+
+
+@contextmanager
+def record_queries(path: str) -> Iterator[QueryRecorder]:
+    """
+    It records the cypher queries run by query_db in the current context to a fixture file
+
+    :param path: The path of the fixture file
+    """
+    recorder = QueryRecorder(path)
+    token = _session.set(recorder)
+
+    try:
+        yield recorder
+    finally:
+        _session.reset(token)
+        recorder.close()
+
+
+@contextmanager
+def replay_queries(path: str) -> Iterator[QueryReplayer]:
+    """
+    It serves the cypher queries run by query_db in the current context from recorded fixture files
+
+    :param path: The path of a fixture file or a directory of fixture files
+    """
+    replayer = QueryReplayer(path)
+    token = _session.set(replayer)
+
+    try:
+        yield replayer
+    finally:
+        _session.reset(token)
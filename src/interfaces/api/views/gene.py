@@ -7,6 +7,7 @@ from rest_framework_xml.renderers import XMLRenderer
 import data
 from interfaces import views, permissions
 from interfaces.api import serializers
+from interfaces.pagination import NeoCursorPagination
 from interfaces.renderers import NucleotideFastaRenderer, AminoAcidFastaRenderer, \
     NucleotideGenBankRenderer, AminoAcidGenBankRenderer
 
@@ -25,6 +26,7 @@ class GeneList(views.APIListView, generics.GenericAPIView):
     """
     serializer_class = serializers.GeneListSerializer
     permission_classes = [permissions.SuperUserOrReadOnly]
+    pagination_class = NeoCursorPagination
     model = data.models.Gene
     fields = ['protrend_id', 'locus_tag', 'uniprot_accession', 'name', 'synonyms']
 
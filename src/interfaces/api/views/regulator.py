@@ -7,6 +7,7 @@ from rest_framework_xml.renderers import XMLRenderer
 import data
 from interfaces import views, permissions
 from interfaces.api import serializers
+from interfaces.pagination import NeoCursorPagination
 from interfaces.renderers import NucleotideFastaRenderer, AminoAcidFastaRenderer, \
     NucleotideGenBankRenderer, AminoAcidGenBankRenderer
 
@@ -26,6 +27,7 @@ class RegulatorList(views.APIListView, generics.GenericAPIView):
     """
     serializer_class = serializers.RegulatorListSerializer
     permission_classes = [permissions.SuperUserOrReadOnly]
+    pagination_class = NeoCursorPagination
     model = data.models.Regulator
     fields = ['protrend_id', 'locus_tag', 'uniprot_accession', 'name', 'synonyms', 'mechanism']
 
@@ -5,6 +5,7 @@ from rest_framework import generics
 import data
 from interfaces import views, permissions
 from interfaces.api import serializers
+from interfaces.pagination import NeoCursorPagination
 from utils import get_header
 
 
@@ -27,6 +28,7 @@ class InteractionsList(views.APIListView, generics.GenericAPIView):
     """
     serializer_class = serializers.RegulatoryInteractionListSerializer
     permission_classes = [permissions.SuperUserOrReadOnly]
+    pagination_class = NeoCursorPagination
     model = data.models.RegulatoryInteraction
     fields = ['protrend_id', 'organism', 'regulator', 'gene', 'tfbs', 'effector', 'regulatory_effect']
 
@@ -0,0 +1 @@
+from .query_instrumentation import QueryInstrumentationMiddleware
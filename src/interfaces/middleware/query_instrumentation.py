@@ -0,0 +1,42 @@
+import logging
+
+from django.conf import settings
+
+from domain.neo.instrumentation import start_query_log, stop_query_log
+
+
+logger = logging.getLogger('protrend.queries')
+
+
+class QueryInstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        """
+        The QueryInstrumentationMiddleware records the cypher queries issued while handling each request.
+        The number of queries and their total wall time are logged per request and,
+        if the HEADERS option is set, returned in the X-Query-Count and X-Query-Time response headers.
+        The number of queries per query set class helps to find N+1 query patterns in the views.
+
+        :param get_response: The next middleware or view
+        """
+        self.get_response = get_response
+
+        options = getattr(settings, 'PROTREND_QUERY_INSTRUMENTATION', {})
+        self.headers = options.get('HEADERS', False)
+
+    def __call__(self, request):
+        token = start_query_log()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            query_log = stop_query_log(token)
+
+        logger.debug('%s %s: %d queries in %.3f s %s',
+                     request.method, request.path, query_log.count, query_log.duration, query_log.by_origin())
+
+        if self.headers:
+            response['X-Query-Count'] = str(query_log.count)
+            response['X-Query-Time'] = f'{query_log.duration:.6f}'
+
+        return response
@@ -0,0 +1 @@
+from .cursor import NeoCursorPagination
@@ -0,0 +1,115 @@
+import json
+from typing import Any, List, Union
+
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+from domain.neo import NeoNode, NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet
+
+
+class NeoCursorPagination(pagination.CursorPagination):
+    """
+    Custom cursor pagination for the ProTReND query sets.
+    Pages are fetched with the keyset pagination of the query sets (query_set.after),
+    so that fetching a deep page costs the same as fetching the first page.
+    The cursor holds the ordering key of the first or last node of the current page.
+
+    Requests using the page query parameter (without a cursor) are still served by page number pagination,
+    so that existing clients keep working.
+    """
+    ordering = 'protrend_id'
+    page_query_param = 'page'
+
+    def __init__(self):
+        self.page_number_pagination = None
+
+    def paginate_queryset(self,
+                          queryset: Union[NeoQuerySet, NeoLinkedQuerySet, NeoHyperLinkedQuerySet],
+                          request,
+                          view=None) -> Union[None, List[NeoNode]]:
+        if self.page_query_param in request.query_params and self.cursor_query_param not in request.query_params:
+            self.page_number_pagination = pagination.PageNumberPagination()
+            return self.page_number_pagination.paginate_queryset(queryset, request, view=view)
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            position = None
+            reverse = False
+        else:
+            position = self._load_position(self.cursor.position)
+            reverse = self.cursor.reverse
+
+        page = queryset.after(cursor=position,
+                              limit=self.page_size + 1,
+                              key=self.ordering,
+                              ascending=not reverse)
+
+        has_more = len(page) > self.page_size
+        page = list(page[:self.page_size])
+
+        if reverse:
+            page = list(reversed(page))
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if page:
+            self.next_position = self._dump_position(page[-1])
+            self.previous_position = self._dump_position(page[0])
+        else:
+            self.next_position = None
+            self.previous_position = None
+
+        self.page = page
+        return self.page
+
+    def _dump_position(self, node: NeoNode) -> str:
+        if self.ordering == 'protrend_id':
+            return node.protrend_id
+
+        return json.dumps([getattr(node, self.ordering), node.protrend_id])
+
+    def _load_position(self, position: Union[None, str]) -> Any:
+        if position is None or self.ordering == 'protrend_id':
+            return position
+
+        try:
+            key, protrend_id = json.loads(position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return key, protrend_id
+
+    def get_paginated_response(self, data):
+        if self.page_number_pagination is not None:
+            return self.page_number_pagination.get_paginated_response(data)
+
+        return super(NeoCursorPagination, self).get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.page_number_pagination is not None:
+            return self.page_number_pagination.get_html_context()
+
+        return super(NeoCursorPagination, self).get_html_context()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        cursor = pagination.Cursor(offset=0, reverse=False, position=self.next_position)
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        cursor = pagination.Cursor(offset=0, reverse=True, position=self.previous_position)
+        return self.encode_cursor(cursor)
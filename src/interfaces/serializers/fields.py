@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from rest_framework import serializers
 
 from constants import help_text, choices
@@ -18,6 +20,23 @@ class NestedField(serializers.Serializer):
         return attribute
 
 
+def relationship_representation(serializer: serializers.Serializer, instance, data: OrderedDict, fields) -> OrderedDict:
+    """
+    It overlays the properties of the relationship to the connected node (relationship_) on the node representation.
+    NeoNodes have no instance dict, so that the relationship properties cannot be set on the node itself.
+    """
+    relationship = getattr(instance, 'relationship_', None)
+    if relationship is None:
+        return data
+
+    for field in fields:
+        value = getattr(relationship, field, None)
+        if value:
+            data[field] = serializer.fields[field].to_representation(value)
+
+    return OrderedDict((name, data[name]) for name in serializer.fields if name in data)
+
+
 # ----------------------------------------------------------
 # URL Field
 # ----------------------------------------------------------
@@ -46,15 +65,8 @@ class SourceField(serializers.Serializer):
         pass
 
     def to_representation(self, instance):
-        if hasattr(instance, 'relationship_'):
-            url = getattr(instance.relationship_, 'url', None)
-            if url:
-                setattr(instance, 'url', url)
-
-            external_id = getattr(instance.relationship_, 'external_identifier', None)
-            if external_id:
-                setattr(instance, 'external_identifier', external_id)
-        return super(SourceField, self).to_representation(instance)
+        data = super(SourceField, self).to_representation(instance)
+        return relationship_representation(self, instance, data, ('url', 'external_identifier'))
 
 
 # ----------------------------------------------------------
@@ -75,11 +87,5 @@ class MotifTFBSField(serializers.Serializer):
         pass
 
     def to_representation(self, instance):
-        if hasattr(instance, 'relationship_'):
-
-            for _field in ('sequence', 'strand', 'start', 'stop'):
-                val = getattr(instance.relationship_, _field, None)
-                if val:
-                    setattr(instance, _field, val)
-
-        return super(MotifTFBSField, self).to_representation(instance)
+        data = super(MotifTFBSField, self).to_representation(instance)
+        return relationship_representation(self, instance, data, ('sequence', 'strand', 'start', 'stop'))
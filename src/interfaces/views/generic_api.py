@@ -1,15 +1,17 @@
 from abc import abstractmethod
 from typing import Union
 
+from django.http import StreamingHttpResponse
 from neomodel import NodeSet
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework_csv.renderers import CSVStreamingRenderer
 
 from domain import dpi
 from domain.neo import NeoLinkedQuerySet, NeoQuerySet, NeoHyperLinkedQuerySet
 from exceptions import ProtrendException
-from utils import ExportFileMixin
+from utils import ExportFileMixin, get_header
 
 
 def is_api(request) -> bool:
@@ -17,6 +19,8 @@ def is_api(request) -> bool:
         return True
     if request.query_params.get('page', False):
         return True
+    if request.query_params.get('cursor', False):
+        return True
 
     return False
 
@@ -30,14 +34,37 @@ class APIListView(ExportFileMixin):
     """
     model = None
     fields = []
+    chunk_size = 1000
 
     def get_queryset(self):
         return dpi.get_objects(cls=self.model, fields=self.fields)
 
+    def get_streaming_response(self: Union['APIListView', generics.GenericAPIView], queryset):
+        """
+        Stream the CSV export, so that only a chunk of database records is held in memory at once.
+        """
+        serializer_cls = self.get_serializer_class()
+        context = self.get_serializer_context()
+        header, _ = get_header(serializer_cls=serializer_cls)
+
+        rows = (serializer_cls(obj, context=context).data for obj in queryset.iterator(chunk_size=self.chunk_size))
+
+        renderer = CSVStreamingRenderer()
+        response = StreamingHttpResponse(renderer.render(rows, renderer_context={'header': header}),
+                                         content_type=renderer.media_type)
+        response["content-disposition"] = f"attachment; filename={self.csv_filename}"
+        return response
+
     # noinspection PyUnusedLocal
     def get(self: Union['APIListView', generics.GenericAPIView], request, *args, **kwargs):
         queryset = self.get_queryset()
 
+        # pages of the CSV export are rendered by the paginator rather than streamed
+        paginated = any(param in request.query_params for param in ('cursor', 'page'))
+
+        if request.accepted_renderer.format == 'csv' and not paginated:
+            return self.get_streaming_response(queryset)
+
         if is_api(request):
             page = self.paginate_queryset(queryset)
 
@@ -101,12 +128,17 @@ class APIRetrieveView(ExportFileMixin):
     fields = []
     targets = {}
     relationships = {}
+    # the object and its targets are fetched by a single compiled query.
+    # compiled = False fetches each target by an independent query instead,
+    # which run concurrently if the PROTREND_QUERY_CONCURRENCY option is enabled
+    compiled = True
 
     def get_queryset(self: Union['APIRetrieveView', generics.GenericAPIView]):
         return dpi.get_object(cls=self.model,
                               fields=self.fields,
                               targets=self.targets,
                               relationships=self.relationships,
+                              compiled=self.compiled,
                               **self.kwargs)
 
     def get_object(self: Union['APIRetrieveView', generics.GenericAPIView]):
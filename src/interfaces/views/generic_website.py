@@ -101,12 +101,17 @@ class WebsiteDetailView(GenericWebsiteView):
     Detail view for a ProTReND database object.
     """
     _context_objects_key = 'object'
+    # the object and its targets are fetched by a single compiled query.
+    # compiled = False fetches each target by an independent query instead,
+    # which run concurrently if the PROTREND_QUERY_CONCURRENCY option is enabled
+    compiled = True
 
     def get_queryset(self: Union['WebsiteDetailView', generic.DetailView]):
         return dpi.get_object(cls=self.model,
                               fields=self.fields,
                               targets=self.targets,
                               relationships=self.relationships,
+                              compiled=self.compiled,
                               **self.kwargs)
 
     def get_object(self, queryset=None):
@@ -13,56 +13,29 @@ def regulators_page(request):
     limit = int(request.GET.get('limit', 15))
     offset = int(request.GET.get('offset', 0))
     sort = request.GET.get('sort', 'protrend_id')
+    if sort not in Regulator.sortable_fields:
+        sort = 'protrend_id'
     order = request.GET.get('order', 'asc')
     if order == 'desc':
         reversed = True
     else:
         reversed = False
 
-    search = request.GET.get('search')
-    if search:
-        data = {
-            'total': 0,
-            "totalNotFiltered": 0,
-            'rows': []
-        }
-
-        visited_ids = set()
-
-        for field in fields:
-            kwargs = {f'{field}__contains': str(search)}
-            query_set = dpi.filter_objects(cls=Regulator, fields=fields, **kwargs)
-
-            for object_ in query_set:
-                if object_.protrend_id not in visited_ids:
-                    regulator_url = regulator_base_url.replace('regulator_id', object_.protrend_id)
-                    data['rows'].append({
-                        'protrend_id': object_.protrend_id,
-                        'locus_tag': object_.locus_tag,
-                        'name': object_.name,
-                        'mechanism': object_.mechanism,
-                        'detail': f'<a role="button" class="btn rounded-pill btn-outline-success" href="{regulator_url}"><i class="bi bi-journal-plus pe-2"></i>detail</a>'
-                    })
-
-                visited_ids.add(object_.protrend_id)
+    search = request.GET.get('search', '').strip()
 
-        data['total'] = len(data['rows'])
-        data['totalNotFiltered'] = len(data['rows'])
-
-        data['rows'] = sorted(data['rows'], reverse=reversed, key=lambda k: k[sort])
-
-        if data['total'] > limit:
-            data['rows'] = data['rows'][offset:offset + limit]
+    # filtering, sorting and paging are compiled into a single cypher query
+    query_set = dpi.get_query_set(cls=Regulator, fields=fields)
+    total_not_filtered = query_set.count()
 
-        return JsonResponse(data)
+    if search:
+        # full-text index lookup rather than a scan of all regulators (see the protrend_indexes command)
+        query_set.search(search)
 
-    # special case using the order by of neo4j cypher query
-    query_set = dpi.get_query_set(cls=Regulator, fields=fields)
     query_set.order_by(sort, ascending=not reversed, key=slice(offset, offset + limit))
 
     data = {
-        'total': query_set.count(),
-        "totalNotFiltered": query_set.count(),
+        'total': query_set.count() if search else total_not_filtered,
+        "totalNotFiltered": total_not_filtered,
         'rows': []
     }
 
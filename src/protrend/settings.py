@@ -58,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'interfaces.middleware.QueryInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'protrend.urls'
@@ -194,6 +195,90 @@ NEOMODEL_SIGNALS = True
 NEOMODEL_FORCE_TIMEZONE = False
 NEOMODEL_MAX_CONNECTION_POOL_SIZE = 50
 
+# ProTReND database backend settings
+# neo4j runs the cypher queries in the Neo4j server, whereas memory runs them in an in-memory property graph,
+# which allows profiling the query sets and views without a server (see domain.neo.memory)
+PROTREND_DB_BACKEND = Configuration.db_backend
+
+# ProTReND query cache settings
+# if enabled, read queries are cached for TTL seconds. Write queries run by query_db and write_db, saving or deleting
+# a node and connecting or disconnecting its relationships invalidate the cached queries of the labels involved.
+# Writes issued directly to the database (e.g. neomodel db.cypher_query) are only seen after TTL seconds.
+# the local backend keeps up to MAX_SIZE queries in the worker memory (LRU eviction).
+# the django backend keeps the queries in the ALIAS cache of the CACHES settings, which is shared by all workers
+PROTREND_QUERY_CACHE = {
+    'ENABLED': False,
+    'BACKEND': 'local',
+    'TTL': 300,
+    'MAX_SIZE': 1024,
+    'ALIAS': 'protrend',
+}
+
+# ProTReND query concurrency settings
+# if enabled, the independent per-target query sets of a request (compiled=False) are fetched concurrently
+# by up to MAX_WORKERS threads (green threads under eventlet) sharing the neomodel connection pool
+PROTREND_QUERY_CONCURRENCY = {
+    'ENABLED': False,
+    'MAX_WORKERS': 8,
+}
+
+# ProTReND query driver settings
+# if enabled, read queries are run by the neo4j driver directly in read-mode sessions, pulling FETCH_SIZE records
+# per batch, rather than by the neomodel cypher_query. Write queries are always run by neomodel
+PROTREND_QUERY_DRIVER = {
+    'ENABLED': False,
+    'FETCH_SIZE': 1000,
+}
+
+# ProTReND query instrumentation settings
+# queries slower than SLOW_QUERY_THRESHOLD seconds are written to the protrend.queries log.
+# HEADERS adds the X-Query-Count and X-Query-Time headers to every response
+PROTREND_QUERY_INSTRUMENTATION = {
+    'SLOW_QUERY_THRESHOLD': 0.5,
+    'HEADERS': DEBUG,
+}
+
+# ProTReND query recording settings
+# the record mode writes every cypher query and its results to a fixture file per process in the PATH directory.
+# the replay mode serves the recorded results instead of running the queries (the fixture file or directory at PATH),
+# so that the views can be profiled offline against real data shapes
+PROTREND_QUERY_RECORDING = {
+    'MODE': None,
+    'PATH': os.path.join(BASE_DIR, 'fixtures', 'queries'),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'protrend.queries': {
+            'handlers': ['console'],
+            'level': 'DEBUG' if DEBUG else 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# django cache settings
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'protrend': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.cache', 'protrend'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
 # django admin interface by GRAPPELLI
 GRAPPELLI_ADMIN_TITLE = 'ProTReND Admin Area'
 GRAPPELLI_SWITCH_USER = True
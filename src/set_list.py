@@ -1,5 +1,5 @@
 from collections import UserList
-from typing import Sequence, Any, Iterator, Union, List, TypeVar
+from typing import Sequence, Any, Iterator, Union, List, TypeVar, Dict
 
 
 T = TypeVar('T')
@@ -8,12 +8,23 @@ T = TypeVar('T')
 class SetList(UserList, List[T]):
 
     def __init__(self, sequence: Union[Iterator, Sequence] = None, key: str = 'protrend_id'):
+        """
+        A SetList is a list that only holds unique elements according to a key.
+        If the key is set, the uniqueness of the elements is verified by the element's key attribute or item.
+        Otherwise, the element itself is used as key, and thus it must be hashable.
+
+        The SetList keeps a hash index of key to position,
+        so that appending and membership testing by element or by key are constant-time operations.
+
+        :param sequence: A sequence of elements
+        :param key: The name of the element's attribute or item to be used as unique key
+        """
         if sequence is None:
             sequence = []
 
         super().__init__()
 
-        self._unique = []
+        self._index: Dict[Any, int] = {}
         self.key = key
 
         for element in sequence:
@@ -30,26 +41,94 @@ class SetList(UserList, List[T]):
         hash(element)
         return element
 
+    def _lookup_key(self, item: Any):
+        # membership and lookups accept either an element or the key itself
+        if not self.key:
+            return item
+
+        if isinstance(item, dict):
+            return item[self.key]
+
+        return getattr(item, self.key, item)
+
+    def _reindex(self, start: int = 0):
+        for i in range(start, len(self.data)):
+            self._index[self._get_element_key(self.data[i])] = i
+
+    def _reset(self, sequence: Sequence):
+        self._index = {}
+        self.data = []
+
+        for element in sequence:
+            self._add_element(element)
+
     def _add_element(self, element: Any):
         key = self._get_element_key(element)
 
-        if key not in self._unique:
-            self._unique.append(key)
+        if key not in self._index:
+            self._index[key] = len(self.data)
             self.data.append(element)
 
     def _insert_element(self, i: int, element: Any):
         key = self._get_element_key(element)
 
-        if key not in self._unique:
-            self._unique[i] = element
-            self.data[i] = element
+        if key in self._index:
+            return
+
+        if i < 0:
+            i = max(len(self.data) + i, 0)
+        i = min(i, len(self.data))
+
+        self.data.insert(i, element)
+        self._index[key] = i
+        self._reindex(i + 1)
+
+    def _set_element(self, i: int, element: Any):
+        key = self._get_element_key(element)
+        old_key = self._get_element_key(self.data[i])
+
+        if key != old_key and key in self._index:
+            return
+
+        if i < 0:
+            i = len(self.data) + i
+
+        del self._index[old_key]
+        self._index[key] = i
+        self.data[i] = element
+
+    def __contains__(self, item) -> bool:
+        return self._lookup_key(item) in self._index
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.__class__(self.data[i], key=self.key)
+
+        return self.data[i]
 
     def __setitem__(self, i, item):
-        self._insert_element(i, item)
+        if isinstance(i, slice):
+            data = list(self.data)
+            data[i] = item
+            self._reset(data)
+            return
+
+        self._set_element(i, item)
 
     def __delitem__(self, i):
-        del self._unique[i]
+        if isinstance(i, slice):
+            data = list(self.data)
+            del data[i]
+            self._reset(data)
+            return
+
+        element = self.data[i]
+        if i < 0:
+            i = len(self.data) + i
+
         del self.data[i]
+        del self._index[self._get_element_key(element)]
+        self._reindex(i)
 
     def __add__(self, other: Sequence):
 
@@ -60,8 +139,8 @@ class SetList(UserList, List[T]):
 
     def __radd__(self, other: Sequence):
 
-        new_instance = self.copy()
-        new_instance.extend(other)
+        new_instance = self.__class__(other, key=self.key)
+        new_instance.extend(self)
 
         return new_instance
 
@@ -69,14 +148,83 @@ class SetList(UserList, List[T]):
         self.extend(other)
         return self
 
+    def __mul__(self, n: int):
+        # the repeated elements are duplicates, and thus repeating a SetList either keeps or clears its elements
+        if n <= 0:
+            return self.__class__(key=self.key)
+
+        return self.copy()
+
+    __rmul__ = __mul__
+
+    def __imul__(self, n: int):
+        if n <= 0:
+            self.clear()
+
+        return self
+
     def append(self, item):
         self._add_element(item)
 
     def insert(self, i, item):
         self._insert_element(i, item)
 
+    def pop(self, i=-1):
+        element = self.data[i]
+        self.__delitem__(i)
+        return element
+
+    def remove(self, item):
+        key = self._lookup_key(item)
+
+        if key not in self._index:
+            raise ValueError(f'{key} not in SetList')
+
+        self.__delitem__(self._index[key])
+
+    def clear(self):
+        self._index.clear()
+        self.data.clear()
+
+    def index(self, item, *args):
+        key = self._lookup_key(item)
+
+        if key not in self._index:
+            raise ValueError(f'{key} not in SetList')
+
+        if args:
+            return self.data.index(self.data[self._index[key]], *args)
+
+        return self._index[key]
+
+    def count(self, item):
+        return int(item in self)
+
+    def sort(self, *args, **kwargs):
+        self.data.sort(*args, **kwargs)
+        self._reindex()
+
+    def reverse(self):
+        self.data.reverse()
+        self._reindex()
+
+    def get(self, key: Any, default: Any = None):
+        """
+        Get an element by its key in constant-time
+
+        :param key: The element's key
+        :param default: The value to be returned if the key is not present
+        :return: The element or the default value
+        """
+        i = self._index.get(key)
+
+        if i is None:
+            return default
+
+        return self.data[i]
+
     def copy(self) -> 'SetList':
-        return self.__class__(self)
+        return self.__class__(self, key=self.key)
 
     def extend(self, other: Sequence):
         for element in other:
@@ -40,6 +40,10 @@ class ExportFileMixin:
         """
         response = super(ExportFileMixin, self).finalize_response(request, response, *args, **kwargs)
 
+        # streaming responses are rendered by the view and set their own content disposition
+        if not hasattr(response, 'accepted_renderer'):
+            return response
+
         if response.accepted_renderer.format == 'json':
             filename = self.json_filename
             response["content-disposition"] = f"attachment; filename={filename}"
@@ -0,0 +1,266 @@
+"""
+Synthetic ProTReND graph generator.
+
+It generates organisms, regulators, genes, TFBS, motifs and regulatory interactions having the properties
+and relationships of the data.models.protrend_database models, and writes them with the dpi bulk functions,
+so that the graph can be generated in Neo4j or in the in-memory graph (PROTREND_DB_BACKEND setting).
+
+The graph size is controlled by a GraphProfile: the number of organisms and the fan-out distribution
+of each relationship (e.g. genes per organism, targets per regulator), which are scaled altogether.
+
+Usage (see views_benchmark.py):
+    from protrend_graph import GraphProfile, generate_graph
+    counts = generate_graph(GraphProfile().scale(10), seed=0)
+"""
+import random
+from typing import Dict, List, NamedTuple, Any
+
+
+class FanOut(NamedTuple):
+    mean: float
+    distribution: str = 'poisson'
+    maximum: int = None
+
+    def sample(self, rng: random.Random) -> int:
+        """
+        It samples the number of connected nodes: fixed, poisson (most nodes close to the mean)
+        or geometric (a long tail of hub nodes, as observed for global regulators)
+        """
+        if self.distribution == 'fixed':
+            value = int(round(self.mean))
+
+        elif self.distribution == 'geometric':
+            value = 0
+            p = 1 / (self.mean + 1)
+            while rng.random() > p:
+                value += 1
+
+        elif self.mean > 30:
+            # normal approximation of the poisson distribution for large means
+            value = int(round(rng.gauss(self.mean, self.mean ** 0.5)))
+
+        else:
+            # Knuth's algorithm
+            value = -1
+            product = 1.0
+            threshold = 2.718281828459045 ** -self.mean
+            while product > threshold:
+                value += 1
+                product *= rng.random()
+
+        if self.maximum is not None:
+            value = min(value, self.maximum)
+
+        return max(value, 0)
+
+
+class GraphProfile(NamedTuple):
+    """
+    The profile of the base scale resembles the current ProTReND database per organism
+    """
+    organisms: int = 5
+    regulators_per_organism: FanOut = FanOut(20)
+    genes_per_organism: FanOut = FanOut(300)
+    targets_per_regulator: FanOut = FanOut(8, 'geometric', maximum=250)
+    tfbs_per_interaction: float = 0.6
+    sequence_length: FanOut = FanOut(900, maximum=3000)
+
+    def scale(self, factor: int) -> 'GraphProfile':
+        """
+        The graph is scaled by the number of organisms, so that the fan-out distributions are kept
+        """
+        return self._replace(organisms=self.organisms * factor)
+
+
+_NUCLEOTIDES = 'ACGT'
+_AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+_GENERA = ('Escherichia', 'Bacillus', 'Pseudomonas', 'Streptomyces', 'Mycobacterium', 'Salmonella',
+           'Staphylococcus', 'Vibrio', 'Clostridium', 'Lactobacillus', 'Shewanella', 'Corynebacterium')
+_SPECIES = ('coli', 'subtilis', 'aeruginosa', 'coelicolor', 'tuberculosis', 'enterica', 'aureus', 'cholerae',
+            'difficile', 'plantarum', 'oneidensis', 'glutamicum')
+_MECHANISMS = ('transcription factor', 'transcription factor', 'transcription factor', 'sigma factor',
+               'small RNA (sRNA)', 'transcription attenuator', 'unknown')
+_EFFECTS = ('activation', 'repression', 'repression', 'dual', 'unknown')
+_STRANDS = ('forward', 'reverse')
+
+
+def _protrend_id(entity: str, i: int) -> str:
+    return f'PRT.{entity}.{i:07}'
+
+
+def _sequence(rng: random.Random, alphabet: str, length: int) -> str:
+    return ''.join(rng.choices(alphabet, k=length))
+
+
+def _gene_properties(rng: random.Random, profile: GraphProfile, i: int, locus_tag: str, name: str) -> Dict[str, Any]:
+    length = max(profile.sequence_length.sample(rng), 90)
+    start = rng.randint(1, 5_000_000)
+    # uniprot accessions are unique (TrEMBL-like accessions)
+    accession = f'A0A{i:07}'
+
+    return dict(locus_tag=locus_tag,
+                locus_tag_factor=locus_tag.lower(),
+                uniprot_accession=accession,
+                uniprot_accession_factor=accession.lower(),
+                name=name,
+                synonyms=[name.lower(), locus_tag.lower()],
+                function=f'{name} protein',
+                ncbi_gene=rng.randint(900_000, 9_000_000),
+                ncbi_protein=rng.randint(10_000_000, 900_000_000),
+                genbank_accession=f'AAC{rng.randint(70_000, 79_999)}.1',
+                refseq_accession=f'NP_{rng.randint(400_000, 499_999)}.1',
+                gene_sequence=_sequence(rng, _NUCLEOTIDES, length),
+                protein_sequence=_sequence(rng, _AMINO_ACIDS, length // 3),
+                strand=rng.choice(_STRANDS),
+                start=start,
+                stop=start + length)
+
+
+class _GraphRows:
+
+    def __init__(self):
+        self.nodes: Dict[str, List[Dict[str, Any]]] = {}
+        self.links: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    def node(self, model: str, row: Dict[str, Any]):
+        self.nodes.setdefault(model, []).append(row)
+
+    def link(self, source: str, target: str, reverse: str, source_id: str, target_id: str, target_model: str):
+        # the ProTReND loaders connect both ends, as every model declares its own outgoing relationships
+        self.links.setdefault((source, target), []).append(dict(source=source_id, target=target_id))
+        self.links.setdefault((target_model, reverse), []).append(dict(source=target_id, target=source_id))
+
+
+def build_graph_rows(profile: GraphProfile, seed: int = 0) -> _GraphRows:
+    """
+    It generates the node and relationship rows of a synthetic ProTReND graph
+    """
+    rng = random.Random(seed)
+    rows = _GraphRows()
+    counters = {}
+
+    def next_id(entity: str) -> str:
+        counters[entity] = counters.get(entity, 0) + 1
+        return _protrend_id(entity, counters[entity])
+
+    for i in range(1, profile.organisms + 1):
+        genus, species = rng.choice(_GENERA), rng.choice(_SPECIES)
+        organism_name = f'{genus} {species} str. {i}'
+        organism_id = next_id('ORG')
+        prefix = f'{genus[0]}{species[0]}{i}'.upper()
+        rows.node('Organism', dict(protrend_id=organism_id,
+                                   name=organism_name,
+                                   name_factor=organism_name.lower(),
+                                   ncbi_taxonomy=100_000 + i,
+                                   ncbi_taxonomy_factor=100_000 + i,
+                                   species=f'{genus} {species}',
+                                   strain=f'str. {i}',
+                                   refseq_accession=f'GCF_{i:09}.1',
+                                   genbank_accession=f'GCA_{i:09}.1',
+                                   ncbi_assembly=i))
+
+        genes = []
+        for j in range(1, max(profile.genes_per_organism.sample(rng), 1) + 1):
+            gene_id = next_id('GEN')
+            rows.node('Gene', dict(protrend_id=gene_id,
+                                   **_gene_properties(rng, profile, counters['GEN'], f'{prefix}_G{j:05}', f'gen{j}')))
+            rows.link('Organism', 'gene', 'organism', organism_id, gene_id, 'Gene')
+            genes.append(gene_id)
+
+        for j in range(1, profile.regulators_per_organism.sample(rng) + 1):
+            regulator_id = next_id('REG')
+            locus_tag = f'{prefix}_R{j:05}'
+            rows.node('Regulator', dict(protrend_id=regulator_id,
+                                        mechanism=rng.choice(_MECHANISMS),
+                                        **_gene_properties(rng, profile, counters['REG'], locus_tag, f'reg{j}')))
+            rows.link('Organism', 'regulator', 'organism', organism_id, regulator_id, 'Regulator')
+
+            targets = rng.sample(genes, min(profile.targets_per_regulator.sample(rng), len(genes)))
+            sites = []
+            for gene_id in targets:
+                rows.link('Regulator', 'gene', 'regulator', regulator_id, gene_id, 'Gene')
+
+                tfbs_id = None
+                if rng.random() < profile.tfbs_per_interaction:
+                    tfbs_id = next_id('TBS')
+                    sequence = _sequence(rng, _NUCLEOTIDES, rng.randint(12, 30))
+                    start = rng.randint(1, 5_000_000)
+                    strand = rng.choice(_STRANDS)
+                    rows.node('TFBS', dict(protrend_id=tfbs_id,
+                                           site_hash=f'{organism_id}_{sequence}_{strand}_{start}',
+                                           site_hash_factor=f'{organism_id}_{sequence}_{strand}_{start}'.lower(),
+                                           organism=organism_id,
+                                           sequence=sequence,
+                                           strand=strand,
+                                           start=start,
+                                           stop=start + len(sequence),
+                                           length=len(sequence)))
+                    rows.link('TFBS', 'data_organism', 'tfbs', tfbs_id, organism_id, 'Organism')
+                    rows.link('Regulator', 'tfbs', 'regulator', regulator_id, tfbs_id, 'TFBS')
+                    rows.link('TFBS', 'gene', 'tfbs', tfbs_id, gene_id, 'Gene')
+                    sites.append((tfbs_id, sequence))
+
+                effect = rng.choice(_EFFECTS)
+                interaction_hash = '_'.join([organism_id, regulator_id, gene_id, tfbs_id or '', effect])
+                interaction_id = next_id('RIN')
+                rows.node('RegulatoryInteraction', dict(protrend_id=interaction_id,
+                                                        interaction_hash=interaction_hash,
+                                                        interaction_hash_factor=interaction_hash.lower(),
+                                                        organism=organism_id,
+                                                        regulator=regulator_id,
+                                                        gene=gene_id,
+                                                        tfbs=tfbs_id,
+                                                        regulatory_effect=effect))
+                rows.link('RegulatoryInteraction', 'data_organism', 'regulatory_interaction',
+                          interaction_id, organism_id, 'Organism')
+                rows.link('RegulatoryInteraction', 'data_regulator', 'regulatory_interaction',
+                          interaction_id, regulator_id, 'Regulator')
+                rows.link('RegulatoryInteraction', 'data_gene', 'regulatory_interaction',
+                          interaction_id, gene_id, 'Gene')
+                if tfbs_id is not None:
+                    rows.link('RegulatoryInteraction', 'data_tfbs', 'regulatory_interaction',
+                              interaction_id, tfbs_id, 'TFBS')
+
+            if sites:
+                motif_id = next_id('MOT')
+                rows.node('Motif', dict(protrend_id=motif_id,
+                                        locus_tag=locus_tag,
+                                        locus_tag_factor=locus_tag.lower(),
+                                        regulator=regulator_id,
+                                        tfbs=[tfbs_id for tfbs_id, _ in sites],
+                                        sequences=[sequence for _, sequence in sites],
+                                        consensus_sequence=sites[0][1]))
+                rows.link('Motif', 'data_regulator', 'motif', motif_id, regulator_id, 'Regulator')
+                rows.link('Motif', 'organism', 'motif', motif_id, organism_id, 'Organism')
+                for tfbs_id, _ in sites:
+                    rows.link('Motif', 'data_tfbs', 'motif', motif_id, tfbs_id, 'TFBS')
+
+    return rows
+
+
+def generate_graph(profile: GraphProfile = None, seed: int = 0, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    It generates a synthetic ProTReND graph and writes it to the database backend with the dpi bulk functions
+
+    :param profile: The graph profile. It defaults to the base scale profile
+    :param seed: The seed of the random generator, so that the same graph is generated for the same profile
+    :param batch_size: The number of nodes or relationships written per transaction
+    :return: The number of nodes per model and the number of relationships
+    """
+    from data import models
+    from domain import dpi
+
+    if profile is None:
+        profile = GraphProfile()
+
+    rows = build_graph_rows(profile, seed=seed)
+
+    counts = {}
+    for model, nodes in rows.nodes.items():
+        counts[model] = dpi.bulk_create(getattr(models, model), nodes, batch_size=batch_size)
+
+    counts['relationships'] = 0
+    for (model, target), links in rows.links.items():
+        counts['relationships'] += dpi.bulk_connect(getattr(models, model), target, links, batch_size=batch_size)
+
+    return counts
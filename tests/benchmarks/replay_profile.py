@@ -0,0 +1,80 @@
+"""
+Offline profile of a REST API view replaying recorded query results.
+
+The query results are recorded during a live session with the record mode of the PROTREND_QUERY_RECORDING settings
+(or the domain.neo.record_queries context manager). The view is then run with cProfile while the queries are
+served from the fixture files, so that the Python-side cost of parsing, serializing and rendering is measured
+without the database. The views must request the same queries (e.g. the same url and parameters) as recorded.
+
+Usage: python tests/benchmarks/replay_profile.py fixtures/queries /api/organisms/PRT.ORG.0000001/ [--repeat 5]
+(from the repository root)
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'protrend.settings')
+
+import django
+
+django.setup()
+
+from django.test.utils import override_settings
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory
+
+from domain.neo import replay_queries
+from interfaces.api.urls import router
+from tests.utils_test_db import disable_throttling
+
+
+def run_view(url: str, params: dict):
+    match = resolve(url)
+    request = APIRequestFactory().get(url, params)
+    response = match.func(request, *match.args, **match.kwargs)
+
+    if hasattr(response, 'render'):
+        response.render()
+
+    return response
+
+
+def main(fixture: str, url: str, params: dict, repeat: int = 5, sort: str = 'cumulative', limit: int = 40):
+    disable_throttling(router)
+
+    with override_settings(PROTREND_QUERY_CACHE={'ENABLED': False}), replay_queries(fixture) as replayer:
+        print(f'{len(replayer)} recorded queries')
+
+        # warm-up run, which also checks that every query of the view was recorded
+        response = run_view(url, params)
+        print(f'{url}: status {response.status_code}, {len(response.content)} bytes')
+
+        times = []
+        profile = cProfile.Profile()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            profile.runcall(run_view, url, params)
+            times.append(time.perf_counter() - start)
+
+    print(f'min {min(times) * 1e3:.2f} ms, max {max(times) * 1e3:.2f} ms over {repeat} runs')
+    pstats.Stats(profile).strip_dirs().sort_stats(sort).print_stats(limit)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline profile of a REST API view replaying recorded queries')
+    parser.add_argument('fixture', help='A fixture file or a directory of fixture files')
+    parser.add_argument('url', help='The url of the view, e.g. /api/organisms/PRT.ORG.0000001/')
+    parser.add_argument('--format', default='json')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sort', default='cumulative')
+    parser.add_argument('--limit', type=int, default=40)
+    args = parser.parse_args()
+
+    main(args.fixture, args.url, {'format': args.format}, repeat=args.repeat, sort=args.sort, limit=args.limit)
@@ -0,0 +1,41 @@
+"""
+Microbenchmark of the SetList construction and membership testing.
+
+The SetList is used to hold the unique connected nodes of each node fetched from the database.
+Building a SetList of n elements and testing the membership of n keys should scale linearly.
+
+Usage: python tests/benchmarks/set_list_benchmark.py (from the repository root)
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from set_list import SetList
+
+
+def build(elements):
+    return SetList(elements)
+
+
+def contains(set_list, keys):
+    return sum(key in set_list for key in keys)
+
+
+def main(sizes=(500, 1000, 2000, 4000, 8000), number=5):
+    print(f'{"n":>8} {"build (ms)":>12} {"contains (ms)":>14} {"build/n (us)":>14}')
+
+    for n in sizes:
+        elements = [{'protrend_id': f'PRT.GEN.{i:07}'} for i in range(n)]
+        keys = [element['protrend_id'] for element in elements]
+        set_list = build(elements)
+
+        build_time = timeit.timeit(lambda: build(elements), number=number) / number
+        contains_time = timeit.timeit(lambda: contains(set_list, keys), number=number) / number
+
+        print(f'{n:>8} {build_time * 1e3:>12.2f} {contains_time * 1e3:>14.2f} {build_time / n * 1e6:>14.3f}')
+
+
+if __name__ == '__main__':
+    main()
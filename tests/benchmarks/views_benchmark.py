@@ -0,0 +1,204 @@
+"""
+Scale benchmark of the REST API list and detail views.
+
+A synthetic ProTReND graph (see protrend_graph.py) is generated at each scale, and the stages of the views
+are timed separately: the cypher query (query_db), the parsing of the records into NeoNodes, the dpi functions
+(get_objects, get_object and filter_objects), the serializers, the renderers and the whole view.
+The results are written to a JSON file, so that runs before and after an optimization can be compared.
+
+The benchmark runs in the in-memory graph by default. The neo4j backend runs against the configured Neo4j server,
+whose database is CLEARED before generating each scale.
+
+Usage: python tests/benchmarks/views_benchmark.py [--scales 1 10 100] [--backend memory] [--output results.json]
+[--no-driver] (from the repository root)
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'protrend.settings')
+
+import django
+
+django.setup()
+
+from django.test.utils import override_settings
+from neomodel import clear_neo4j_database, db
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework_csv.renderers import CSVRenderer
+
+from data import models
+from domain import dpi
+from domain.neo import get_memory_graph, query_db
+from interfaces.api import views
+from interfaces.api.urls import router
+from tests.utils_test_db import disable_throttling
+from protrend_graph import GraphProfile, generate_graph
+
+
+LIST_VIEWS = (('organisms', views.OrganismList),
+              ('regulators', views.RegulatorList),
+              ('genes', views.GeneList),
+              ('binding-sites', views.BindingSitesList),
+              ('interactions', views.InteractionsList))
+
+# detail views are timed for the hub node of the target relationship
+DETAIL_VIEWS = (('organisms', views.OrganismDetail, 'gene'),
+                ('regulators', views.RegulatorDetail, 'gene'),
+                ('genes', views.GeneDetail, 'regulator'))
+
+
+def clear_graph(backend: str):
+    if backend == 'memory':
+        get_memory_graph().clear()
+    else:
+        clear_neo4j_database(db)
+
+
+def make_view(view_cls, request, **kwargs):
+    view = view_cls()
+    view.setup(request, **kwargs)
+    view.request = view.initialize_request(request)
+    view.format_kwarg = None
+    return view
+
+
+def hub_node(cls, target: str) -> str:
+    """
+    The node having the largest number of connected nodes, which is the worst case of a detail view
+    """
+    counts = dpi.get_query_set(cls, target=target).group_by_count()
+    return max(counts, key=counts.get)
+
+
+class Benchmark:
+
+    def __init__(self, scale: int, counts: dict, repeat: int):
+        self.scale = scale
+        self.counts = counts
+        self.repeat = repeat
+        self.results = []
+
+    def time(self, benchmark: str, stage: str, function):
+        times = timeit.repeat(function, number=1, repeat=self.repeat)
+        result = {'scale': self.scale,
+                  'benchmark': benchmark,
+                  'stage': stage,
+                  'min': min(times),
+                  'median': statistics.median(times),
+                  'repeat': self.repeat}
+        self.results.append(result)
+        print(f'{self.scale:>6} {benchmark:<36} {stage:<12} {result["min"] * 1e3:>10.2f} {result["median"] * 1e3:>10.2f}')
+
+    def list_view(self, prefix: str, view_cls):
+        factory = APIRequestFactory()
+        request = factory.get(f'/api/{prefix}/', {'format': 'json'})
+        view = make_view(view_cls, request)
+
+        query_set = view.get_queryset()
+        results, meta = query_db(query_set.query, query_set.params)
+        objects = query_set.parse(results=results, meta=meta)
+        data = view.get_serializer(objects, many=True).data
+
+        name = view_cls.__name__
+        self.time(name, 'query', lambda: query_db(query_set.query, query_set.params))
+        self.time(name, 'parse', lambda: query_set.parse(results=results, meta=meta))
+        self.time(name, 'dpi', lambda: list(dpi.get_objects(view_cls.model, fields=list(view_cls.fields))))
+        self.time(name, 'serialize', lambda: view.get_serializer(objects, many=True).data)
+        self.time(name, 'json', lambda: JSONRenderer().render(data))
+        self.time(name, 'csv', lambda: CSVRenderer().render(data))
+        self.time(name, 'view', lambda: view_cls.as_view()(factory.get(f'/api/{prefix}/', {'format': 'json'})).render())
+
+    def detail_view(self, prefix: str, view_cls, target: str):
+        protrend_id = hub_node(view_cls.model, target=target)
+
+        factory = APIRequestFactory()
+        request = factory.get(f'/api/{prefix}/{protrend_id}/', {'format': 'json'})
+        view = make_view(view_cls, request, protrend_id=protrend_id)
+
+        obj = view.get_object()
+        data = view.get_serializer(obj).data
+
+        name = view_cls.__name__
+        self.time(name, 'dpi', lambda: view.get_object())
+        self.time(name, 'serialize', lambda: view.get_serializer(obj).data)
+        self.time(name, 'json', lambda: JSONRenderer().render(data))
+        self.time(name, 'view', lambda: view_cls.as_view()(factory.get(f'/api/{prefix}/{protrend_id}/',
+                                                                          {'format': 'json'}),
+                                                             protrend_id=protrend_id).render())
+
+    def filter_objects(self):
+        fields = ['protrend_id', 'locus_tag', 'name', 'mechanism']
+        self.time('filter_objects(Regulator)', 'dpi',
+                  lambda: list(dpi.filter_objects(models.Regulator, fields=list(fields),
+                                                  mechanism__exact='sigma factor')))
+        self.time('filter_objects(Gene, targets)', 'dpi',
+                  lambda: list(dpi.filter_objects(models.Gene, fields=['protrend_id', 'locus_tag'],
+                                                  targets={'regulator': ['protrend_id']},
+                                                  locus_tag__contains='_G0001')))
+
+
+def main(scales=(1, 10, 100), backend='memory', output='benchmark_results.json', repeat=5, seed=0, driver=True):
+    disable_throttling(router)
+
+    results = []
+    environment = {'backend': backend,
+                   'driver': driver,
+                   'seed': seed,
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+    with override_settings(PROTREND_DB_BACKEND=backend,
+                           PROTREND_QUERY_CACHE={'ENABLED': False},
+                           PROTREND_QUERY_DRIVER={'ENABLED': driver}):
+        for scale in scales:
+            clear_graph(backend)
+
+            start = time.perf_counter()
+            counts = generate_graph(GraphProfile().scale(scale), seed=seed)
+            print(f'scale {scale}: {counts} generated in {time.perf_counter() - start:.1f} s')
+            print(f'{"scale":>6} {"benchmark":<36} {"stage":<12} {"min (ms)":>10} {"median (ms)":>10}')
+
+            benchmark = Benchmark(scale=scale, counts=counts, repeat=repeat)
+            for prefix, view_cls in LIST_VIEWS:
+                benchmark.list_view(prefix, view_cls)
+
+            for prefix, view_cls, target in DETAIL_VIEWS:
+                benchmark.detail_view(prefix, view_cls, target)
+
+            benchmark.filter_objects()
+
+            results.append({'scale': scale, 'counts': counts, 'timings': benchmark.results})
+
+        clear_graph(backend)
+
+    with open(output, 'w') as file:
+        json.dump({'environment': environment, 'results': results}, file, indent=2)
+
+    print(f'results written to {output}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scale benchmark of the REST API list and detail views')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--backend', choices=['memory', 'neo4j'], default='memory')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-driver', dest='driver', action='store_false',
+                        help='run the read queries to neo4j with the neomodel cypher_query')
+    args = parser.parse_args()
+
+    main(scales=args.scales, backend=args.backend, output=args.output, repeat=args.repeat, seed=args.seed,
+         driver=args.driver)
@@ -1,7 +1,7 @@
 import unittest
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from neomodel import clear_neo4j_database, db
 
@@ -11,6 +11,7 @@ from interfaces.api.urls import router
 from ..utils_test_db import disable_throttling
 
 
+@override_settings(PROTREND_QUERY_CACHE={'ENABLED': False})
 class ApiTest(TestCase):
 
     def setUp(self) -> None:
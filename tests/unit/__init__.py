@@ -1,2 +1,6 @@
 from .data_test import DataTest
 from .domain_test import DomainTest
+from .set_list_test import SetListTest
+from .cache_test import QueryCacheTest
+from .memory_test import MemoryGraphTest
+from .recording_test import QueryRecordingTest
@@ -0,0 +1,155 @@
+import time
+import unittest
+
+from django.test import TestCase, override_settings
+from neomodel import clear_neo4j_database, db
+
+from data.models import Regulator, Gene
+import domain.dpi as dpi
+from domain.neo import clear_query_cache, get_memory_graph
+from domain.neo.cache import QueryCache, DjangoQueryCache, query_labels, is_read_query
+
+
+GENES = 'MATCH (gene:Gene) RETURN gene.name'
+REGULATORS = 'MATCH (regulator:Regulator) RETURN regulator.name'
+ORGANISMS = 'MATCH (organism:Organism) RETURN organism.name'
+
+LOCAL_MEMORY_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'protrend-query-cache-test'}}
+
+
+class QueryCacheTest(TestCase):
+
+    def test_labels(self):
+        """
+        Test the parsing of the labels and the type of cypher queries.
+        """
+        query = 'MATCH (regulator:Regulator) OPTIONAL MATCH (regulator)-[]->(gene:Gene) RETURN regulator.protrend_id'
+        self.assertEqual(query_labels(query), {'Regulator', 'Gene'})
+        self.assertTrue(is_read_query(query))
+        self.assertFalse(is_read_query('MATCH (gene:Gene) SET gene.name = $name'))
+
+        query = 'CALL db.index.fulltext.queryNodes($search_index, $search) YIELD node AS gene WHERE gene:Gene ' \
+                'RETURN gene.name'
+        self.assertEqual(query_labels(query), {'Gene'})
+        self.assertTrue(is_read_query(query))
+
+    def test_lru(self):
+        """
+        Test the least recently used eviction of the query cache.
+        """
+        cache = QueryCache(ttl=60, max_size=2)
+        cache.set(cache.make_key(GENES), 1)
+        cache.set(cache.make_key(REGULATORS), 2)
+
+        self.assertEqual(cache.get(cache.make_key(GENES)), 1)
+
+        cache.set(cache.make_key(ORGANISMS), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(cache.make_key(REGULATORS)))
+        self.assertEqual(cache.get(cache.make_key(GENES)), 1)
+
+    def test_ttl_invalidation(self):
+        """
+        Test the expiration and the invalidation by label of the query cache.
+        """
+        cache = QueryCache(ttl=0.05, max_size=10)
+        cache.set(cache.make_key(GENES, {'name': 'thrA'}), 1)
+        self.assertEqual(cache.get(cache.make_key(GENES, {'name': 'thrA'})), 1)
+        self.assertIsNone(cache.get(cache.make_key(GENES, {'name': 'thrB'})))
+
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(cache.make_key(GENES, {'name': 'thrA'})))
+
+        cache = QueryCache(ttl=60, max_size=10)
+        cache.set(cache.make_key(GENES), 1)
+        cache.set(cache.make_key(REGULATORS), 2)
+        cache.invalidate('Gene')
+        self.assertIsNone(cache.get(cache.make_key(GENES)))
+        self.assertEqual(cache.get(cache.make_key(REGULATORS)), 2)
+
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    def test_django_cache(self):
+        """
+        Test the versioned invalidation of the django query cache.
+        """
+        cache = DjangoQueryCache(alias='default', ttl=60)
+        rows = ([['PRT.GEN.0000001', 'thrA']], ['gene.protrend_id', 'gene.name'])
+
+        cache.set(cache.make_key(GENES), rows)
+        cache.set(cache.make_key(REGULATORS), rows)
+        self.assertEqual(cache.get(cache.make_key(GENES)), rows)
+
+        cache.invalidate('Gene')
+        self.assertIsNone(cache.get(cache.make_key(GENES)))
+        self.assertEqual(cache.get(cache.make_key(REGULATORS)), rows)
+
+        cache.clear()
+        self.assertIsNone(cache.get(cache.make_key(REGULATORS)))
+
+    @override_settings(PROTREND_QUERY_CACHE={'ENABLED': True, 'BACKEND': 'local', 'TTL': 60, 'MAX_SIZE': 16})
+    def test_relationship_invalidation(self):
+        """
+        Test the invalidation of the query cache by connecting and disconnecting nodes.
+        """
+        clear_neo4j_database(db)
+        clear_query_cache()
+
+        regulator = Regulator(protrend_id='PRT.REG.0000001',
+                              locus_tag='b0001',
+                              locus_tag_factor='b0001',
+                              mechanism='transcription factor').save()
+        gene = Gene(protrend_id='PRT.GEN.0000001',
+                    locus_tag='b1001',
+                    locus_tag_factor='b1001').save()
+
+        def regulator_genes():
+            regulators = dpi.get_objects(Regulator, fields=['protrend_id'], targets={'gene': ['protrend_id']})
+            return [target.protrend_id for target in regulators[0].gene]
+
+        self.assertEqual(regulator_genes(), [])
+
+        regulator.gene.connect(gene)
+        self.assertEqual(regulator_genes(), ['PRT.GEN.0000001'])
+
+        regulator.gene.disconnect(gene)
+        self.assertEqual(regulator_genes(), [])
+
+        clear_neo4j_database(db)
+        clear_query_cache()
+
+    @override_settings(PROTREND_DB_BACKEND='memory',
+                       PROTREND_QUERY_CACHE={'ENABLED': True, 'BACKEND': 'local', 'TTL': 60, 'MAX_SIZE': 16})
+    def test_bulk_invalidation(self):
+        """
+        Test the invalidation of the query cache by the bulk writes against the in-memory graph.
+        """
+        get_memory_graph().clear()
+        clear_query_cache()
+
+        dpi.bulk_create(Regulator, [dict(protrend_id='PRT.REG.0000001',
+                                         locus_tag='b0001',
+                                         locus_tag_factor='b0001',
+                                         mechanism='transcription factor')])
+        dpi.bulk_create(Gene, [dict(protrend_id='PRT.GEN.0000001',
+                                    locus_tag='b1001',
+                                    locus_tag_factor='b1001')])
+
+        def regulator_genes():
+            regulators = dpi.get_objects(Regulator, fields=['protrend_id'], targets={'gene': ['locus_tag']})
+            return [target.locus_tag for target in regulators[0].gene]
+
+        self.assertEqual(regulator_genes(), [])
+
+        dpi.bulk_connect(Regulator, 'gene', [dict(source='PRT.REG.0000001', target='PRT.GEN.0000001')])
+        self.assertEqual(regulator_genes(), ['b1001'])
+
+        dpi.bulk_update(Gene, [dict(protrend_id='PRT.GEN.0000001', locus_tag='b1002', locus_tag_factor='b1002')])
+        self.assertEqual(regulator_genes(), ['b1002'])
+
+        get_memory_graph().clear()
+        clear_query_cache()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,27 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from neomodel import clear_neo4j_database, db
 
-from data import *
+from data.models import (Effector, Evidence, Gene, Operon, Organism, Publication, Regulator, RegulatoryInteraction,
+                         Source, TFBS)
 import domain.dpi as dpi
+from domain.dpi.identifiers import COUNTER_LABEL
+from domain.dpi.validation import find_duplicates, duplicates_validation
+from exceptions import ProtrendException
+from transformers import to_str, lower, rstrip, lstrip
+from domain.neo import NeoLinkedQuerySet, node_factory, Count, Collect, Min, Max, Sum
+from domain.neo.instrumentation import start_query_log, stop_query_log
+from domain.neo.query import search_index_name, connection_initializer, _fulltext_indexes as fulltext_indexes
+from domain.neo.query_set import get_relationship_pattern
+from interfaces.serializers.fields import MotifTFBSField, SourceField
+from data.management.commands.protrend_indexes import (Index, server_version, existing_indexes,
+                                                       create_statement, create_fulltext_statement)
 from ..utils_test_db import populate_db
 
 
+@override_settings(PROTREND_QUERY_CACHE={'ENABLED': False})
 class DomainTest(TestCase):
 
     def setUp(self) -> None:
@@ -266,6 +280,471 @@ class DomainTest(TestCase):
         self.assertEqual(len(interaction_obj.publication),
                          len(publication_obj.regulatory_interaction))
 
+    def test_multi_linked_query_set(self):
+        """
+        Test the single query retrieval of multiple targets.
+        """
+        clear_neo4j_database(db)
+        populate_db()
+
+        regulator_obj = Regulator.nodes.get(protrend_id='PRT.REG.0000001')
+        organism_obj = Organism.nodes.get(protrend_id='PRT.ORG.0000001')
+        gene_obj = Gene.nodes.get(protrend_id='PRT.GEN.0000001')
+        regulator_obj.organism.connect(organism_obj)
+        regulator_obj.gene.connect(gene_obj)
+
+        targets = {'organism': ['protrend_id', 'name'],
+                   'gene': ['protrend_id', 'locus_tag'],
+                   'effector': ['protrend_id']}
+
+        compiled = dpi.get_object(Regulator, fields=['protrend_id', 'name'], targets=targets,
+                                  protrend_id='PRT.REG.0000001')
+        merged = dpi.get_object(Regulator, fields=['protrend_id', 'name'], targets=targets, compiled=False,
+                                protrend_id='PRT.REG.0000001')
+
+        compiled_obj = compiled.data[0]
+        merged_obj = merged.data[0]
+        self.assertEqual(compiled_obj.protrend_id, merged_obj.protrend_id)
+        self.assertEqual(compiled_obj.organism[0].name, merged_obj.organism[0].name)
+        self.assertEqual(compiled_obj.gene[0].locus_tag, merged_obj.gene[0].locus_tag)
+        self.assertEqual(len(compiled_obj.effector), 0)
+
+    def test_concurrent_query_sets(self):
+        """
+        Test the concurrent fetching of the per-target query sets.
+        """
+        clear_neo4j_database(db)
+        populate_db()
+
+        regulator_obj = Regulator.nodes.get(protrend_id='PRT.REG.0000001')
+        regulator_obj.organism.connect(Organism.nodes.get(protrend_id='PRT.ORG.0000001'))
+        regulator_obj.gene.connect(Gene.nodes.get(protrend_id='PRT.GEN.0000001'))
+
+        targets = {'organism': ['protrend_id', 'name'],
+                   'gene': ['protrend_id', 'locus_tag'],
+                   'effector': ['protrend_id']}
+
+        with override_settings(PROTREND_QUERY_CONCURRENCY={'ENABLED': False}):
+            sequential = dpi.get_object(Regulator, fields=['protrend_id', 'name'], targets=targets, compiled=False,
+                                        protrend_id='PRT.REG.0000001')
+
+        token = start_query_log()
+        with override_settings(PROTREND_QUERY_CONCURRENCY={'ENABLED': True, 'MAX_WORKERS': 3}):
+            concurrent = dpi.get_object(Regulator, fields=['protrend_id', 'name'], targets=targets, compiled=False,
+                                        protrend_id='PRT.REG.0000001')
+        query_log = stop_query_log(token)
+
+        self.assertEqual(query_log.count, 3)
+
+        sequential_obj = sequential.data[0]
+        concurrent_obj = concurrent.data[0]
+        self.assertEqual(sequential_obj.organism[0].name, concurrent_obj.organism[0].name)
+        self.assertEqual(sequential_obj.gene[0].locus_tag, concurrent_obj.gene[0].locus_tag)
+        self.assertEqual(len(concurrent_obj.effector), 0)
+
+    def test_reserve_ids(self):
+        """
+        Test the allocation of protrend identifiers by the counter nodes.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 4):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}').save()
+
+        self.assertEqual(dpi.get_last_object(Gene).protrend_id, 'PRT.GEN.0000003')
+
+        counter_index = Index(None, COUNTER_LABEL, 'label', 'unique', 'id allocation')
+        db.cypher_query(create_statement(counter_index, server_version()))
+
+        # the first reservations race to create the counter node, which is seeded with the last protrend identifier
+        with ThreadPoolExecutor(max_workers=4, initializer=connection_initializer()) as executor:
+            blocks = list(executor.map(lambda _: dpi.reserve_ids(Gene, size=5), range(4)))
+
+        reserved = [i for block in blocks for i in block]
+        self.assertEqual(sorted(reserved), list(range(4, 24)))
+
+        counters, _ = db.cypher_query(f'MATCH (counter:{COUNTER_LABEL} {{label: $label}}) RETURN counter.value',
+                                      {'label': Gene.__label__})
+        self.assertEqual(counters, [[23]])
+
+        self.assertEqual(dpi.allocate_protrend_ids(Gene, header='PRT', entity='GEN', size=2),
+                         ['PRT.GEN.0000024', 'PRT.GEN.0000025'])
+
+    def test_duplicates_validation(self):
+        """
+        Test the validation of duplicated factors in a single query.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 4):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}').save()
+
+        values = [f' B000{i}' for i in range(10)]
+        transformers = [to_str, lower, rstrip, lstrip]
+
+        token = start_query_log()
+        duplicates = find_duplicates(values, transformers=transformers, node_cls=Gene, key='locus_tag_factor')
+        query_log = stop_query_log(token)
+
+        self.assertEqual(query_log.count, 1)
+        self.assertEqual(duplicates, {'b0001': ['PRT.GEN.0000001'],
+                                      'b0002': ['PRT.GEN.0000002'],
+                                      'b0003': ['PRT.GEN.0000003']})
+
+        with self.assertRaises(ProtrendException):
+            duplicates_validation(values, transformers=transformers, node_cls=Gene, key='locus_tag_factor')
+
+        duplicates_validation(['b0004'], transformers=transformers, node_cls=Gene, key='locus_tag_factor')
+
+    def test_bulk_writes(self):
+        """
+        Test the creation, update and connection of nodes in batches.
+        """
+        clear_neo4j_database(db)
+
+        organisms = [dict(protrend_id='PRT.ORG.0000001', name='Escherichia coli', name_factor='escherichia coli')]
+        genes = [dict(protrend_id=f'PRT.GEN.000000{i}', locus_tag=f'b000{i}', locus_tag_factor=f'b000{i}', start=i)
+                 for i in range(1, 6)]
+
+        self.assertEqual(dpi.bulk_create(Organism, organisms), 1)
+        self.assertEqual(dpi.bulk_create(Gene, genes, batch_size=2), 5)
+        self.assertEqual(dpi.count_objects(Gene), 5)
+
+        dpi.bulk_update(Gene, [dict(protrend_id='PRT.GEN.0000001', name='thrL', start=None)])
+        gene = Gene.nodes.get(protrend_id='PRT.GEN.0000001')
+        self.assertEqual(gene.name, 'thrL')
+        self.assertIsNone(gene.start)
+        self.assertIsNotNone(gene.uid)
+
+        links = [dict(source=gene['protrend_id'], target='PRT.ORG.0000001') for gene in genes]
+        dpi.bulk_connect(Gene, 'organism', links)
+        dpi.bulk_connect(Gene, 'organism', links)
+        self.assertEqual(len(Gene.nodes.get(protrend_id='PRT.GEN.0000002').organism.all()), 1)
+
+        with self.assertRaises(ProtrendException):
+            dpi.bulk_create(Gene, [dict(protrend_id='PRT.GEN.0000006')])
+
+    def test_aggregate(self):
+        """
+        Test the aggregations computed in the database.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 6):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}',
+                 strand='forward' if i % 2 else 'reverse',
+                 start=i * 100).save()
+
+        query_set = dpi.get_query_set(Gene)
+        self.assertEqual(query_set.aggregate(n=Count(), first=Min('start'), last=Max('start'), total=Sum('start')),
+                         {'n': 5, 'first': 100, 'last': 500, 'total': 1500})
+
+        strands = dpi.get_query_set(Gene).values('strand').annotate(count=Count())
+        self.assertEqual({row['strand']: row['count'] for row in strands}, {'forward': 3, 'reverse': 2})
+
+        strands = dpi.get_query_set(Gene).filter(start__gt=100).values('strand').annotate()
+        self.assertEqual(sorted(row['strand'] for row in strands), ['forward', 'reverse'])
+
+        organism = Organism(protrend_id='PRT.ORG.0000001', name='Escherichia coli',
+                            name_factor='escherichia coli').save()
+        for gene in Gene.nodes.all()[:2]:
+            organism.gene.connect(gene)
+
+        query_set = dpi.get_query_set(Organism, target='gene')
+        self.assertEqual(query_set.group_by_count(field='name'), {'Escherichia coli': 2})
+        rows = query_set.values('protrend_id').annotate(genes=Collect('gene__locus_tag'))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(sorted(rows[0]['genes']), sorted(gene.locus_tag for gene in organism.gene.all()))
+
+    def test_to_frame(self):
+        """
+        Test the columnar result modes of the query sets.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 4):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}',
+                 start=i * 100 if i < 3 else None).save()
+
+        query_set = dpi.get_query_set(Gene).order_by('protrend_id')
+        self.assertEqual(query_set.values_list('locus_tag', flat=True), ['b0001', 'b0002', 'b0003'])
+        self.assertEqual(query_set.values_list('locus_tag', 'start'),
+                         [('b0001', 100), ('b0002', 200), ('b0003', None)])
+
+        df = dpi.get_query_set(Gene).order_by('protrend_id').to_frame('locus_tag', 'start')
+        self.assertEqual(list(df.columns), ['locus_tag', 'start'])
+        self.assertEqual(str(df['start'].dtype), 'Int64')
+        self.assertEqual(df['start'].sum(), 300)
+        self.assertTrue(df['start'].isna().iloc[2])
+
+    def test_query_builder(self):
+        """
+        Test the composition of filters, sorting and paging into a single query.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 6):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}',
+                 name=f'gene{i}').save()
+
+        query_set = dpi.get_query_set(Gene, fields=['protrend_id', 'locus_tag'])
+        query_set.filter(locus_tag__startswith='b000').filter(protrend_id__ne='PRT.GEN.0000005')
+        query_set.order_by('locus_tag', ascending=False, key=slice(1, 3))
+
+        self.assertEqual(query_set.count(), 4)
+        self.assertEqual([obj.locus_tag for obj in query_set], ['b0003', 'b0002'])
+        self.assertEqual(query_set[1].locus_tag, 'b0002')
+
+        query_set = dpi.get_query_set(Gene, fields=['protrend_id', 'locus_tag'])
+        query_set.filter_any(locus_tag__exact='b0001', name__exact='gene2').order_by('locus_tag')
+        self.assertEqual([obj.locus_tag for obj in query_set], ['b0001', 'b0002'])
+
+    def test_query_parameters(self):
+        """
+        Test that the filter, paging and identifier values are sent as query parameters rather than inlined.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 6):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}').save()
+
+        query_set = dpi.get_query_set(Gene, fields=['protrend_id', 'locus_tag'])
+        query_set.filter(protrend_id__startswith='PRT.GEN', locus_tag__in=['b0001', 'b0002', 'b0003'])
+        query_set.order_by('protrend_id', key=slice(1, 3))
+
+        for parameter in ('$protrend_id_startswith', '$locus_tag_in', '$skip', '$limit'):
+            self.assertIn(parameter, query_set.query)
+
+        for value in ('PRT.GEN', 'b0001', 'SKIP 1', 'LIMIT 2'):
+            self.assertNotIn(value, query_set.query)
+
+        self.assertEqual(query_set.params, {'protrend_id_startswith': 'PRT.GEN',
+                                            'locus_tag_in': ['b0001', 'b0002', 'b0003'],
+                                            'skip': 1,
+                                            'limit': 2})
+        self.assertEqual([obj.locus_tag for obj in query_set], ['b0002', 'b0003'])
+
+        ids = ['PRT.GEN.0000004', 'PRT.GEN.0000001']
+        query_set = dpi.get_query_set(Gene, fields=['protrend_id'])
+        query_set.unwind(ids)
+        self.assertIn('UNWIND $ids', query_set.query)
+        self.assertNotIn('PRT.GEN.0000004', query_set.query)
+        self.assertEqual(query_set.params, {'ids': ids})
+        self.assertEqual(sorted(obj.protrend_id for obj in query_set), sorted(ids))
+
+    def test_linked_query_set_modes(self):
+        """
+        Test that the collect mode of the linked query sets returns the same nodes as a row per link.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 4):
+            Regulator(protrend_id=f'PRT.REG.000000{i}',
+                      locus_tag=f'r000{i}',
+                      locus_tag_factor=f'r000{i}',
+                      name=f'regulator{i}',
+                      mechanism='transcription factor').save()
+
+        genes = [Gene(protrend_id=f'PRT.GEN.000000{i}',
+                      locus_tag=f'b000{i}',
+                      locus_tag_factor=f'b000{i}').save()
+                 for i in range(1, 4)]
+        regulators = [Regulator.nodes.get(protrend_id=f'PRT.REG.000000{i}') for i in range(1, 4)]
+        regulators[0].gene.connect(genes[0])
+        regulators[0].gene.connect(genes[1])
+        regulators[1].gene.connect(genes[2])
+
+        def fetch(collect):
+            query_set = NeoLinkedQuerySet(source=Regulator, fields=['protrend_id', 'name'], target='gene',
+                                          target_fields=['protrend_id', 'locus_tag'], collect=collect)
+            query_set.order_by('protrend_id')
+            return [(regulator.protrend_id, regulator.name, sorted(gene.locus_tag for gene in regulator.gene))
+                    for regulator in query_set]
+
+        collected = fetch(collect=True)
+        self.assertEqual(collected, fetch(collect=False))
+        self.assertEqual(collected, [('PRT.REG.0000001', 'regulator1', ['b0001', 'b0002']),
+                                     ('PRT.REG.0000002', 'regulator2', ['b0003']),
+                                     ('PRT.REG.0000003', 'regulator3', [])])
+
+    def test_relationship_pattern(self):
+        """
+        Test the typed and directed relationship patterns of the linked query sets.
+        """
+        self.assertEqual(get_relationship_pattern(Regulator, 'gene'), '-[:HAS]->')
+        self.assertEqual(get_relationship_pattern(Regulator, 'data_source', 'relationship'),
+                         '-[relationship:OWNER]->')
+
+        query_set = dpi.get_query_set(Regulator, target='gene')
+        self.assertIn('(regulator)-[:HAS]->(gene:Gene)', query_set.query)
+
+        query_set = dpi.get_query_set(Regulator, target='data_source', relationship_fields=['url'])
+        self.assertIn('-[relationship_variable:OWNER]->(source:Source)', query_set.query)
+
+        query_set = dpi.get_objects(Regulator, targets={'gene': ['protrend_id'], 'data_source': ['name']},
+                                    relationships={'data_source': ['url']})
+        self.assertIn('-[:HAS]->(target_gene:Gene)', query_set.query)
+        self.assertIn('-[relationship_data_source:OWNER]->(target_data_source:Source)', query_set.query)
+
+    def test_contains_lookup(self):
+        """
+        Test the case-insensitive contains lookups and the full-text search.
+        """
+        clear_neo4j_database(db)
+
+        for i, name in enumerate(('LexA', 'lexB', 'AraC'), start=1):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'B000{i}',
+                 locus_tag_factor=f'b000{i}',
+                 name=name).save()
+
+        query_set = dpi.filter_objects(Gene, fields=['protrend_id', 'locus_tag'], locus_tag__contains='b000')
+        self.assertIn('locus_tag_factor CONTAINS', query_set.query)
+        self.assertEqual(query_set.count(), 3)
+
+        query_set = dpi.filter_objects(Gene, fields=['protrend_id', 'name'], name__contains='LEX')
+        self.assertEqual(sorted(obj.name for obj in query_set), ['LexA', 'lexB'])
+
+        version = server_version()
+        if not any(index['name'] == search_index_name('Gene') for index in existing_indexes()):
+            indexes = [Index(Gene, 'Gene', field, 'fulltext', 'search') for field in ('locus_tag', 'name')]
+            db.cypher_query(create_fulltext_statement(indexes, version))
+        db.cypher_query('CALL db.awaitIndexes()')
+
+        # the full-text index names are looked up again
+        fulltext_indexes['expires'] = 0.0
+
+        query_set = dpi.filter_objects(Gene, fields=['protrend_id', 'name'], search='ara')
+        self.assertIn('db.index.fulltext.queryNodes', query_set.query)
+        self.assertEqual([obj.name for obj in query_set], ['AraC'])
+        self.assertEqual(query_set.count(), 1)
+
+        # searches fall back to the contains lookups if the full-text index is missing
+        fulltext_indexes.update(expires=float('inf'), names=frozenset())
+        try:
+            query_set = dpi.get_query_set(Gene, fields=['protrend_id', 'name']).search('ARA', fields=['name'])
+            self.assertNotIn('db.index.fulltext.queryNodes', query_set.query)
+            self.assertEqual([obj.name for obj in query_set], ['AraC'])
+        finally:
+            fulltext_indexes['expires'] = 0.0
+
+    def test_get_objects_by_ids(self):
+        """
+        Test the retrieval of multiple nodes by their identifiers in a single query.
+        """
+        clear_neo4j_database(db)
+
+        for i in range(1, 4):
+            Gene(protrend_id=f'PRT.GEN.000000{i}',
+                 locus_tag=f'b000{i}',
+                 locus_tag_factor=f'b000{i}').save()
+
+        ids = ['PRT.GEN.0000003', 'PRT.GEN.0000009', 'PRT.GEN.0000001', 'PRT.GEN.0000003']
+
+        token = start_query_log()
+        objects, missing = dpi.get_objects_by_ids(Gene, ids, fields=['protrend_id', 'locus_tag'])
+        query_log = stop_query_log(token)
+
+        self.assertEqual(query_log.count, 1)
+        self.assertEqual([obj.locus_tag for obj in objects], ['b0003', 'b0001'])
+        self.assertEqual(missing, ['PRT.GEN.0000009'])
+
+    def test_driver_backend(self):
+        """
+        Test the read queries run by the neo4j driver directly against the neomodel cypher_query.
+        """
+        clear_neo4j_database(db)
+        populate_db()
+
+        regulator_obj = Regulator.nodes.get(protrend_id='PRT.REG.0000001')
+        regulator_obj.gene.connect(Gene.nodes.get(protrend_id='PRT.GEN.0000001'))
+
+        def fetch():
+            regulators = dpi.get_objects(Regulator, fields=['protrend_id', 'name'], targets={'gene': ['locus_tag']})
+            return [(regulator.protrend_id, regulator.name, [gene.locus_tag for gene in regulator.gene])
+                    for regulator in regulators]
+
+        with override_settings(PROTREND_QUERY_DRIVER={'ENABLED': False}):
+            expected = fetch()
+
+        with override_settings(PROTREND_QUERY_DRIVER={'ENABLED': True, 'FETCH_SIZE': 2}):
+            self.assertEqual(fetch(), expected)
+            self.assertEqual(dpi.count_objects(Regulator), len(expected))
+
+            # write queries are run by neomodel
+            obj = dpi.create_objects(Source, (dict(name='curation', type='curation'),))[0]
+            self.assertEqual(dpi.get_object(Source, protrend_id=obj.protrend_id).data[0].name, 'curation')
+
+    def test_query_log(self):
+        """
+        Test the recording of the queries issued by the query sets.
+        """
+        clear_neo4j_database(db)
+        populate_db()
+
+        token = start_query_log()
+        regulators = list(dpi.get_objects(Regulator, fields=['protrend_id', 'name']))
+        count = dpi.get_objects(Regulator, fields=['protrend_id']).count()
+        query_log = stop_query_log(token)
+
+        self.assertEqual(len(regulators), count)
+        self.assertEqual(query_log.count, 2)
+        self.assertEqual(query_log.by_origin(), {'NeoQuerySet': 2})
+        self.assertEqual(query_log.records[0].rows, len(regulators))
+
+    def test_node_factory(self):
+        """
+        Test the interning of NeoNode classes and the merging of NeoNode instances.
+        """
+        source_cls = node_factory(fields=['protrend_id', 'name'])
+        self.assertIs(source_cls, node_factory(fields=['protrend_id', 'name']))
+
+        linked_cls = node_factory(fields=['protrend_id'], target='gene', target_fields=['protrend_id'])
+        self.assertIs(linked_cls, node_factory(fields=['protrend_id'], target='gene', target_fields=['protrend_id']))
+
+        source = source_cls(protrend_id='PRT.REG.0000001', name='regulator')
+        linked = linked_cls(protrend_id='PRT.REG.0000001', gene=[{'protrend_id': 'PRT.GEN.0000001'}])
+        self.assertFalse(hasattr(source, '__dict__'))
+
+        merged = source.add(linked)
+        self.assertEqual(merged.name, 'regulator')
+        self.assertEqual(merged.gene[0].protrend_id, 'PRT.GEN.0000001')
+        self.assertIs(type(merged), type(source_cls(protrend_id='PRT.REG.0000002').add(linked)))
+
+    def test_relationship_serialization(self):
+        """
+        Test the serialization of the relationship properties of the connected nodes.
+        """
+        motif_cls = node_factory(fields=['protrend_id', 'sequences'], target='data_tfbs',
+                                 target_fields=['protrend_id'], relationship_fields=['sequence', 'strand'])
+        motif = motif_cls(protrend_id='PRT.MOT.0000001',
+                          sequences=['ACGT'],
+                          data_tfbs=[{'protrend_id': 'PRT.TBS.0000001',
+                                      'relationship_': {'sequence': 'ACGT', 'strand': 'forward'}}])
+
+        data = MotifTFBSField(motif.data_tfbs, many=True).data
+        self.assertEqual(dict(data[0]), {'protrend_id': 'PRT.TBS.0000001', 'sequence': 'ACGT', 'strand': 'forward'})
+
+        regulator_cls = node_factory(fields=['protrend_id'], target='data_source',
+                                     target_fields=['name'], relationship_fields=['url'])
+        regulator = regulator_cls(protrend_id='PRT.REG.0000001',
+                                  data_source=[{'name': 'regprecise', 'relationship_': {'url': 'https://regprecise'}}])
+
+        data = SourceField(regulator.data_source, many=True).data
+        self.assertEqual(list(data[0].items()), [('name', 'regprecise'), ('url', 'https://regprecise')])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,257 @@
+from urllib.parse import urlparse, parse_qs
+
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from data.models import Organism, Regulator, Gene
+import domain.dpi as dpi
+from domain.neo import NeoLinkedQuerySet, NeoMultiLinkedQuerySet, get_memory_graph, query_db, Count, Collect, Min, Max
+from interfaces.api.urls import router
+from interfaces.api.views import RegulatorList
+from interfaces.pagination import NeoCursorPagination
+from ..utils_test_db import disable_throttling
+
+
+@override_settings(PROTREND_DB_BACKEND='memory', PROTREND_QUERY_CACHE={'ENABLED': False})
+class MemoryGraphTest(TestCase):
+
+    def setUp(self) -> None:
+        get_memory_graph().clear()
+
+    def populate(self):
+        dpi.bulk_create(Organism, [dict(protrend_id='PRT.ORG.0000001',
+                                        name='Escherichia coli str. K-12 substr. MG1655',
+                                        name_factor='escherichia coli str. k-12 substr. mg1655')])
+
+        regulators = [dict(protrend_id=f'PRT.REG.000000{i}', locus_tag=f'b000{i}', locus_tag_factor=f'b000{i}',
+                           name=name, mechanism='transcription factor')
+                      for i, name in enumerate(('thrL', 'lacI', 'araC'), 1)]
+        dpi.bulk_create(Regulator, regulators)
+
+        genes = [dict(protrend_id=f'PRT.GEN.000000{i}', locus_tag=f'b100{i}', locus_tag_factor=f'b100{i}',
+                      start=i * 100)
+                 for i in range(1, 5)]
+        dpi.bulk_create(Gene, genes)
+
+        dpi.bulk_connect(Regulator, 'organism', [dict(source=f'PRT.REG.000000{i}', target='PRT.ORG.0000001')
+                                                 for i in range(1, 4)])
+        dpi.bulk_connect(Regulator, 'gene', [dict(source='PRT.REG.0000001', target='PRT.GEN.0000001'),
+                                             dict(source='PRT.REG.0000001', target='PRT.GEN.0000002'),
+                                             dict(source='PRT.REG.0000002', target='PRT.GEN.0000003')])
+
+    def test_query_sets(self):
+        """
+        Test the query sets against the in-memory graph.
+        """
+        self.populate()
+
+        self.assertEqual(dpi.count_objects(Regulator), 3)
+        self.assertEqual(dpi.get_query_set(Regulator, target='gene').group_by_count(),
+                         {'PRT.REG.0000001': 2, 'PRT.REG.0000002': 1, 'PRT.REG.0000003': 0})
+
+        regulators = dpi.get_objects(Regulator, fields=['protrend_id', 'name'])
+        self.assertEqual(sorted(regulator.name for regulator in regulators), ['araC', 'lacI', 'thrL'])
+
+        query_set = dpi.get_query_set(Regulator, fields=['protrend_id', 'name'])
+        regulators = query_set.filter(name__contains='LAC').order_by('protrend_id')
+        self.assertEqual([regulator.protrend_id for regulator in regulators], ['PRT.REG.0000002'])
+
+        regulators = dpi.get_query_set(Regulator).order_by('protrend_id', ascending=False, key=slice(1, 3))
+        self.assertEqual([regulator.protrend_id for regulator in regulators], ['PRT.REG.0000002', 'PRT.REG.0000001'])
+
+        regulator = dpi.get_object(Regulator, protrend_id='PRT.REG.0000001', targets={'gene': ['locus_tag']})[0]
+        self.assertEqual(sorted(gene.locus_tag for gene in regulator.gene), ['b1001', 'b1002'])
+
+        organisms = dpi.get_query_set(Organism).search('coli k')
+        self.assertEqual([organism.protrend_id for organism in organisms], ['PRT.ORG.0000001'])
+
+        regulators = dpi.get_query_set(Regulator, fields=['protrend_id']).search('  ')
+        self.assertEqual(len(regulators), 3)
+
+        nodes, missing = dpi.get_objects_by_ids(Gene, ['PRT.GEN.0000004', 'PRT.GEN.0000009', 'PRT.GEN.0000001'])
+        self.assertEqual([node.protrend_id for node in nodes], ['PRT.GEN.0000004', 'PRT.GEN.0000001'])
+        self.assertEqual(missing, ['PRT.GEN.0000009'])
+
+    def test_linked_query_set_order(self):
+        """
+        Test that the linked query sets return the source nodes by protrend identifier if no order is given.
+        """
+        regulators = [dict(protrend_id=f'PRT.REG.000000{i}', locus_tag=f'b000{i}', locus_tag_factor=f'b000{i}',
+                           mechanism='transcription factor')
+                      for i in (3, 1, 2)]
+        dpi.bulk_create(Regulator, regulators)
+        dpi.bulk_create(Gene, [dict(protrend_id='PRT.GEN.0000001', locus_tag='b1001', locus_tag_factor='b1001')])
+        dpi.bulk_connect(Regulator, 'gene', [dict(source='PRT.REG.0000003', target='PRT.GEN.0000001')])
+
+        expected = ['PRT.REG.0000001', 'PRT.REG.0000002', 'PRT.REG.0000003']
+        for collect in (True, False):
+            query_set = NeoLinkedQuerySet(source=Regulator, target='gene', collect=collect)
+            self.assertEqual([regulator.protrend_id for regulator in query_set], expected)
+
+        query_set = NeoMultiLinkedQuerySet(source=Regulator, targets={'gene': ['protrend_id']})
+        self.assertEqual([regulator.protrend_id for regulator in query_set], expected)
+
+    def test_aggregate(self):
+        """
+        Test the aggregations and the columnar modes against the in-memory graph.
+        """
+        self.populate()
+
+        self.assertEqual(dpi.get_query_set(Gene).aggregate(n=Count(), first=Min('start'), last=Max('start')),
+                         {'n': 4, 'first': 100, 'last': 400})
+
+        rows = dpi.get_query_set(Regulator, target='gene').values('protrend_id').annotate(genes=Collect('gene'))
+        self.assertEqual({row['protrend_id']: len(row['genes']) for row in rows},
+                         {'PRT.REG.0000001': 2, 'PRT.REG.0000002': 1, 'PRT.REG.0000003': 0})
+
+        self.assertEqual(dpi.get_query_set(Gene).order_by('start', ascending=False).values_list('start', flat=True),
+                         [400, 300, 200, 100])
+
+    def test_keyset_pagination(self):
+        """
+        Test the keyset pagination of the query sets, including ordering ties and the last page.
+        """
+        dpi.bulk_create(Gene, [dict(protrend_id=f'PRT.GEN.000000{i}', locus_tag=f'b100{i}', locus_tag_factor=f'b100{i}',
+                                    start=start)
+                               for i, start in enumerate((300, 100, 100, 200, 100), 1)])
+
+        query_set = dpi.get_query_set(Gene, fields=['protrend_id', 'start'])
+
+        page = query_set.after(limit=2)
+        self.assertEqual([gene.protrend_id for gene in page], ['PRT.GEN.0000001', 'PRT.GEN.0000002'])
+
+        page = query_set.after(cursor='PRT.GEN.0000004', limit=2)
+        self.assertEqual([gene.protrend_id for gene in page], ['PRT.GEN.0000005'])
+
+        page = query_set.after(cursor='PRT.GEN.0000005', limit=2)
+        self.assertEqual(list(page), [])
+
+        # ties of the ordering key are broken by the protrend identifier
+        pages = []
+        cursor = None
+        while True:
+            page = query_set.after(cursor=cursor, limit=2, key='start')
+            if not page:
+                break
+
+            pages.append([gene.protrend_id for gene in page])
+            cursor = (page[-1].start, page[-1].protrend_id)
+
+        self.assertEqual(pages, [['PRT.GEN.0000002', 'PRT.GEN.0000003'],
+                                 ['PRT.GEN.0000005', 'PRT.GEN.0000004'],
+                                 ['PRT.GEN.0000001']])
+
+        page = query_set.after(cursor=(200, 'PRT.GEN.0000004'), limit=2, key='start', ascending=False)
+        self.assertEqual([gene.protrend_id for gene in page], ['PRT.GEN.0000005', 'PRT.GEN.0000003'])
+
+    def test_cursor_pagination(self):
+        """
+        Test the cursor paginator of the API list views.
+        """
+        dpi.bulk_create(Gene, [dict(protrend_id=f'PRT.GEN.000000{i}', locus_tag=f'b100{i}', locus_tag_factor=f'b100{i}')
+                               for i in range(1, 6)])
+        factory = APIRequestFactory()
+
+        def paginate(params):
+            paginator = NeoCursorPagination()
+            paginator.page_size = 2
+            request = Request(factory.get('/api/genes/', params))
+            page = paginator.paginate_queryset(dpi.get_query_set(Gene), request)
+            return paginator, [gene.protrend_id for gene in page]
+
+        protrend_ids = []
+        params = {}
+        while True:
+            paginator, page = paginate(params)
+            protrend_ids.extend(page)
+
+            next_link = paginator.get_next_link()
+            if next_link is None:
+                break
+
+            params = {'cursor': parse_qs(urlparse(next_link).query)['cursor'][0]}
+
+        self.assertEqual(protrend_ids, [f'PRT.GEN.000000{i}' for i in range(1, 6)])
+        self.assertIsNone(paginator.get_next_link())
+        self.assertIsNotNone(paginator.get_previous_link())
+
+        with self.assertRaises(NotFound):
+            paginate({'cursor': 'invalid'})
+
+        # page numbers are still served by page number pagination
+        paginator, page = paginate({'page': 1})
+        self.assertEqual(page, [f'PRT.GEN.000000{i}' for i in range(1, 6)])
+        self.assertEqual(paginator.get_paginated_response([]).data['count'], 5)
+
+    def test_iterator(self):
+        """
+        Test streaming the query set results in chunks.
+        """
+        self.populate()
+
+        query_set = dpi.get_objects(Regulator, fields=['protrend_id', 'name'], targets={'gene': ['protrend_id']})
+        expected = sorted((regulator.protrend_id, len(regulator.gene)) for regulator in query_set)
+
+        # the rows of a regulator are parsed together regardless of the chunk size
+        regulators = query_set.iterator(chunk_size=1)
+        self.assertEqual(sorted((regulator.protrend_id, len(regulator.gene)) for regulator in regulators), expected)
+
+        # closing the iterator before exhausting it closes the stream
+        iterator = dpi.get_query_set(Regulator).iterator(chunk_size=1)
+        self.assertTrue(next(iterator).protrend_id.startswith('PRT.REG.'))
+        iterator.close()
+
+    def test_streaming_csv(self):
+        """
+        Test streaming the CSV export of the API list views.
+        """
+        self.populate()
+        disable_throttling(router)
+
+        factory = APIRequestFactory()
+        view = RegulatorList.as_view()
+
+        response = view(factory.get('/api/regulators/', {'format': 'csv'}))
+        self.assertTrue(response.streaming)
+
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 4)
+        self.assertIn('protrend_id', rows[0])
+
+        # pages of the CSV export are rendered by the paginator
+        response = view(factory.get('/api/regulators/', {'format': 'csv', 'page': 1}))
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.render().status_code, 200)
+
+    def test_cypher(self):
+        """
+        Test the cypher subset of the in-memory graph.
+        """
+        graph = get_memory_graph()
+        lac_i = graph.create_node(['Regulator'], {'protrend_id': 'PRT.REG.0000001', 'name': 'lacI'})
+        lac_z = graph.create_node(['Gene'], {'protrend_id': 'PRT.GEN.0000001', 'name': 'lacZ', 'start': None})
+        graph.create_relationship(lac_i, 'HAS', lac_z, {'weight': 1})
+
+        self.assertNotIn('start', lac_z.properties)
+
+        results, meta = query_db('MATCH (gene:Gene)<-[relationship:HAS]-(regulator:Regulator) '
+                                 'RETURN regulator.name AS regulator, relationship.weight, gene {.name}')
+        self.assertEqual(meta, ['regulator', 'relationship.weight', 'gene {.name}'])
+        self.assertEqual(results, [['lacI', 1, {'name': 'lacZ'}]])
+
+        results, _ = query_db('MATCH (n) WHERE n.name STARTS WITH $prefix AND n.start IS NULL '
+                              'RETURN n.name ORDER BY n.name DESC', {'prefix': 'lac'})
+        self.assertEqual(results, [['lacZ'], ['lacI']])
+
+        results, _ = query_db('MATCH (gene:Gene) OPTIONAL MATCH (gene)-[]->(target) RETURN count(target), count(*)')
+        self.assertEqual(results, [[0, 1]])
+
+        query_db('MATCH (regulator:Regulator {protrend_id: $id}) SET regulator.name = $name',
+                 {'id': 'PRT.REG.0000001', 'name': 'LacI'})
+        self.assertEqual(lac_i['name'], 'LacI')
+
+        query_db('MATCH (node) DETACH DELETE node')
+        self.assertEqual(graph.node_count, 0)
+        self.assertEqual(graph.relationship_count, 0)
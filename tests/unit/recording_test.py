@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from data.models import Regulator, Gene
+import domain.dpi as dpi
+from domain.neo import get_memory_graph, query_db, record_queries, replay_queries, QueryReplayError
+
+
+@override_settings(PROTREND_DB_BACKEND='memory', PROTREND_QUERY_CACHE={'ENABLED': False})
+class QueryRecordingTest(TestCase):
+
+    def setUp(self) -> None:
+        get_memory_graph().clear()
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.fixture = os.path.join(self.directory.name, 'queries.pickle.gz')
+
+    def tearDown(self) -> None:
+        get_memory_graph().clear()
+        self.directory.cleanup()
+
+    def test_record_replay(self):
+        """
+        Test replaying the recorded query results without the database.
+        """
+        dpi.bulk_create(Regulator, [dict(protrend_id='PRT.REG.0000001', locus_tag='b0001', locus_tag_factor='b0001',
+                                         name='lacI', mechanism='transcription factor'),
+                                    dict(protrend_id='PRT.REG.0000002', locus_tag='b0002', locus_tag_factor='b0002',
+                                         name='araC', mechanism='transcription factor')])
+        dpi.bulk_create(Gene, [dict(protrend_id='PRT.GEN.0000001', locus_tag='b1001', locus_tag_factor='b1001')])
+        dpi.bulk_connect(Regulator, 'gene', [dict(source='PRT.REG.0000001', target='PRT.GEN.0000001')])
+
+        with record_queries(self.fixture) as recorder:
+            regulators = dpi.get_objects(Regulator, fields=['protrend_id', 'name'], targets={'gene': ['locus_tag']})
+            expected = sorted((regulator.protrend_id, regulator.name, len(regulator.gene)) for regulator in regulators)
+            count = query_db('MATCH (n:Regulator) RETURN count(n)')
+
+        self.assertGreater(recorder.count, 0)
+
+        get_memory_graph().clear()
+
+        with replay_queries(self.fixture):
+            regulators = dpi.get_objects(Regulator, fields=['protrend_id', 'name'], targets={'gene': ['locus_tag']})
+            actual = sorted((regulator.protrend_id, regulator.name, len(regulator.gene)) for regulator in regulators)
+            self.assertEqual(actual, expected)
+            self.assertEqual(query_db('MATCH (n:Regulator) RETURN count(n)'), count)
+
+            with self.assertRaises(QueryReplayError):
+                query_db('MATCH (n:Gene) RETURN count(n)')
+
+        self.assertEqual(query_db('MATCH (n:Regulator) RETURN count(n)')[0], [[0]])
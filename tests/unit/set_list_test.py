@@ -0,0 +1,97 @@
+import unittest
+
+from django.test import TestCase
+
+from set_list import SetList
+
+
+class SetListTest(TestCase):
+
+    def test_unique(self):
+        """
+        Test the uniqueness of the set list elements by key.
+        """
+        elements = [{'protrend_id': 'PRT.GEN.0000001'},
+                    {'protrend_id': 'PRT.GEN.0000002'},
+                    {'protrend_id': 'PRT.GEN.0000001'}]
+        set_list = SetList(elements)
+
+        self.assertEqual(len(set_list), 2)
+        self.assertIn('PRT.GEN.0000001', set_list)
+        self.assertIn({'protrend_id': 'PRT.GEN.0000002'}, set_list)
+        self.assertNotIn('PRT.GEN.0000003', set_list)
+
+        set_list.append({'protrend_id': 'PRT.GEN.0000002'})
+        self.assertEqual(len(set_list), 2)
+
+        set_list = SetList([1, 2, 2, 3], key=None)
+        self.assertEqual(list(set_list), [1, 2, 3])
+
+    def test_insert_set_delete(self):
+        """
+        Test the insertion, replacement and deletion of set list elements.
+        """
+        set_list = SetList(['a', 'b', 'c'], key=None)
+
+        set_list.insert(0, 'd')
+        set_list.insert(1, 'a')
+        self.assertEqual(list(set_list), ['d', 'a', 'b', 'c'])
+        self.assertEqual(set_list.index('b'), 2)
+
+        set_list[1] = 'e'
+        set_list[2] = 'c'
+        self.assertEqual(list(set_list), ['d', 'e', 'b', 'c'])
+        self.assertNotIn('a', set_list)
+
+        del set_list[0]
+        self.assertEqual(list(set_list), ['e', 'b', 'c'])
+        self.assertEqual(set_list.index('c'), 2)
+        self.assertNotIn('d', set_list)
+
+        set_list.remove('b')
+        self.assertEqual(set_list.pop(), 'c')
+        self.assertEqual(list(set_list), ['e'])
+
+        set_list.append('d')
+        self.assertIn('d', set_list)
+        self.assertEqual(set_list.index('d'), 1)
+
+    def test_copy_slice(self):
+        """
+        Test that copies and slices keep the set list key.
+        """
+        elements = [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}]
+        set_list = SetList(elements, key='name')
+
+        self.assertEqual(set_list.copy().key, 'name')
+        self.assertEqual(set_list[1:].key, 'name')
+        self.assertIn('b', set_list[1:])
+        self.assertNotIn('a', set_list[1:])
+        self.assertEqual(len(set_list + [{'name': 'a'}, {'name': 'd'}]), 4)
+
+    def test_repeat(self):
+        """
+        Test that repeating a set list keeps its elements unique and indexed.
+        """
+        set_list = SetList([{'name': 'a'}, {'name': 'b'}], key='name')
+
+        repeated = set_list * 3
+        self.assertEqual(repeated.key, 'name')
+        self.assertEqual(list(repeated), list(set_list))
+        self.assertEqual(len(2 * set_list), 2)
+        self.assertEqual(len(set_list * 0), 0)
+
+        set_list *= 2
+        self.assertEqual(len(set_list), 2)
+        self.assertEqual(set_list.index('b'), 1)
+
+        set_list *= 0
+        self.assertEqual(len(set_list), 0)
+        self.assertNotIn('a', set_list)
+
+        set_list.append({'name': 'c'})
+        self.assertEqual(set_list.index('c'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
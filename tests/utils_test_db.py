@@ -7,16 +7,16 @@ def disable_throttling(router):
 
 
 def populate_db():
-    from data import (Source,
-                      Organism,
-                      Regulator,
-                      Gene,
-                      TFBS,
-                      Effector,
-                      Operon,
-                      Evidence,
-                      Publication,
-                      RegulatoryInteraction)
+    from data.models import (Source,
+                             Organism,
+                             Regulator,
+                             Gene,
+                             TFBS,
+                             Effector,
+                             Operon,
+                             Evidence,
+                             Publication,
+                             RegulatoryInteraction)
 
     Source(protrend_id='PRT.SRC.0000001',
            name='curation',